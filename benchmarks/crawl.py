@@ -0,0 +1,245 @@
+"""
+Бенчмарк обхода: YandexDiskPollingService целиком против фейкового API (benchmarks.fake_disk).
+
+Для каждого размера дерева сервис проходит четыре цикла:
+    cold   - первый запуск, манифеста нет, все файлы новые;
+    warm   - ничего не изменилось (инкрементальный обход);
+    upload - на диск загружено --upload файлов;
+    resync - плановый полный обход (сверка).
+
+Каждый размер запускается в отдельном процессе, поэтому пиковая память (RSS) не смешивается
+между размерами. Нужен Redis (лучше отдельная БД): ключи пишутся с префиксом bench:<uuid>
+и удаляются в конце. --redis memory - fakeredis в памяти, если он установлен.
+
+Запуск:
+    uv run python -m benchmarks.crawl --sizes 1k,10k,50k,200k --redis redis://localhost:6379/15
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from multiprocessing import get_context
+
+from benchmarks.fake_disk import API_PATH, FakeYandexDisk, SyntheticTree
+
+PHASES = ("cold", "warm", "upload", "resync")
+
+
+@dataclass
+class PhaseResult:
+    files: int
+    phase: str
+    wall: float  # Длительность цикла, с
+    requests: int  # Запросов к API (по счётчику сервера)
+    retries: int
+    received_mb: float  # Объём ответов API
+    tasks: int  # Файлов в задачах на уведомление, поставленных в очередь
+    peak_rss_mb: float  # Пиковый RSS процесса к концу фазы
+    tiers: str = ""  # Директорий по уровням HOT/WARM/COLD после цикла
+    heap_peak_mb: float | None = None  # Пик кучи Python за фазу (--tracemalloc)
+
+
+class _CountingNotifications:
+    """Приёмник задач вместо NotificationService: только считает"""
+
+    def __init__(self):
+        self.tasks = 0
+
+    async def enqueue_many(self, tasks, fence=None) -> None:
+        # Задача-пакет несёт несколько файлов: считаем файлы, а не сообщения
+        self.tasks += sum(len(task.files) for task in tasks)
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss - в килобайтах на Linux и в байтах на macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024 if os.uname().sysname == "Darwin" else 1024)
+
+
+def _make_redis(url: str):
+    if url == "memory":
+        try:
+            import fakeredis
+        except ImportError as e:
+            raise SystemExit("--redis memory требует пакет fakeredis (pip install fakeredis)") from e
+        return fakeredis.aioredis.FakeRedis()
+    from redis.asyncio import Redis
+
+    return Redis.from_url(url)
+
+
+async def _scenario(base_url: str, files: int, args: dict) -> list[dict]:
+    import aiohttp
+    from bot.application.services.long_poll import YandexDiskPollingService
+    from bot.domain.entities.mappings import CrawlTier
+    from bot.infrastructure.clients.yandex_disk import YandexDiskClient
+    from bot.infrastructure.repositories.crawl import RedisCrawlStateRepository
+    from bot.infrastructure.repositories.lease import RedisLeaseRepository
+    from bot.infrastructure.repositories.manifest import RedisManifestRepository
+    from bot.infrastructure.repositories.statistics import RedisStatisticsRepository
+
+    redis = _make_redis(args["redis"])
+    prefix = f"bench:{uuid.uuid4().hex[:8]}"
+    root_url = f"https://disk.yandex.ru/d/bench-{files}"
+    results: list[dict] = []
+
+    async with aiohttp.ClientSession() as http:
+        client = YandexDiskClient(
+            http,
+            http_timeout=30,
+            rate_limit=args["rate_limit"],
+            rate_burst=max(1, int(args["rate_limit"])),
+            backoff_base=0.05,
+            backoff_max=1.0,
+        )
+        client.API_URL = base_url + API_PATH
+        notifications = _CountingNotifications()
+        lease_repository = RedisLeaseRepository(redis, key_prefix=prefix)
+        service = YandexDiskPollingService(
+            bot=None,
+            user_service=None,
+            notification_service=notifications,
+            manifest_repository=RedisManifestRepository(redis, key_prefix=prefix),
+            crawl_state_repository=RedisCrawlStateRepository(redis, key_prefix=prefix),
+            lease_repository=lease_repository,
+            statistics_repository=RedisStatisticsRepository(redis, key_prefix=prefix, public_root_urls=[root_url]),
+            disk_client=client,
+            redis=redis,
+            public_root_urls=[root_url],
+            poll_interval=600,
+            http_timeout=30,
+            key_prefix=prefix,
+            crawl_concurrency=args["concurrency"],
+            full_resync_every=len(PHASES),  # cold - полный (состояния нет), resync - плановый
+            crawl_prune_unsubscribed=False,  # Пользователей нет: меряем обход всего дерева
+            bundle_window=0,  # Задачи считаются по файлам сразу, без ожидания конца загрузки
+        )
+        service._set_lease(await lease_repository.acquire(service.LEASE_NAME, service.instance_id, 3600))  # noqa: SLF001
+
+        try:
+            for phase in PHASES:
+                if phase == "upload":
+                    async with http.post(f"{base_url}/_bench/upload", params={"files": args["upload"]}) as resp:
+                        resp.raise_for_status()
+                async with http.get(f"{base_url}/_bench/counters") as resp:
+                    before = await resp.json()
+                tasks_before = notifications.tasks
+                if args["tracemalloc"]:
+                    tracemalloc.reset_peak()
+
+                started = time.perf_counter()
+                await service._check_for_new_files()  # noqa: SLF001
+                wall = time.perf_counter() - started
+
+                async with http.get(f"{base_url}/_bench/counters") as resp:
+                    after = await resp.json()
+                stats = next(iter(service.last_crawl_stats.values()))
+                tiers = "/".join(str(stats.tier_directories.get(tier, 0)) for tier in CrawlTier)
+                results.append(asdict(PhaseResult(
+                    files=files,
+                    phase=phase,
+                    wall=round(wall, 3),
+                    requests=after["requests"] - before["requests"],
+                    retries=stats.retries,
+                    received_mb=round((after["bytes_sent"] - before["bytes_sent"]) / 2 ** 20, 2),
+                    tasks=notifications.tasks - tasks_before,
+                    peak_rss_mb=round(_peak_rss_mb(), 1),
+                    tiers=tiers,
+                    heap_peak_mb=round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1) if args["tracemalloc"] else None,
+                )))
+        finally:
+            keys = [key async for key in redis.scan_iter(match=f"{prefix}:*")]
+            if keys:
+                await redis.delete(*keys)
+            await redis.aclose()
+    return results
+
+
+def run_scenario(base_url: str, files: int, args: dict) -> list[dict]:
+    """Точка входа дочернего процесса"""
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if args["tracemalloc"]:
+        tracemalloc.start()
+    return asyncio.run(_scenario(base_url, files, args))
+
+
+async def run_size(files: int, args: argparse.Namespace) -> list[dict]:
+    server = FakeYandexDisk(
+        SyntheticTree(files, args.files_per_dir, bump_ancestors=args.bump_ancestors),
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+    )
+    base_url = await server.start()
+    try:
+        # Свежий процесс на каждый размер: RSS и кэши не наследуются от предыдущего
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            return await asyncio.get_running_loop().run_in_executor(pool, run_scenario, base_url, files, vars(args))
+    finally:
+        await server.stop()
+
+
+def parse_size(value: str) -> int:
+    value = value.strip().lower()
+    if value.endswith("k"):
+        return int(float(value[:-1]) * 1000)
+    return int(value)
+
+
+def print_table(results: list[dict]) -> None:
+    header = (
+        f"{'files':>8} {'phase':<7} {'wall, s':>8} {'requests':>9} {'retries':>8} {'recv, MB':>9} {'tasks':>8} "
+        f"{'H/W/C dirs':>14} {'RSS, MB':>8} {'heap, MB':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        heap = f"{r['heap_peak_mb']:>9.1f}" if r["heap_peak_mb"] is not None else f"{'—':>9}"
+        print(
+            f"{r['files']:>8} {r['phase']:<7} {r['wall']:>8.2f} {r['requests']:>9} {r['retries']:>8} "
+            f"{r['received_mb']:>9.2f} {r['tasks']:>8} {r['tiers']:>14} {r['peak_rss_mb']:>8.1f} {heap}"
+        )
+
+
+async def main_async(args: argparse.Namespace) -> list[dict]:
+    results: list[dict] = []
+    for files in args.sizes:
+        results.extend(await run_size(files, args))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк обхода Я.Диска на синтетических деревьях")
+    parser.add_argument("--sizes", type=lambda v: [parse_size(s) for s in v.split(",")], default="1k,10k,50k,200k")
+    parser.add_argument("--redis", default="redis://localhost:6379/15", help="URL Redis или memory (fakeredis)")
+    parser.add_argument("--files-per-dir", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate-limit", type=float, default=1000.0, help="Запросов в секунду у клиента API")
+    parser.add_argument("--latency", type=float, default=0.01, help="Задержка ответа фейкового API, с")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Доля ответов 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Доля ответов 429")
+    parser.add_argument("--upload", type=int, default=100, help="Сколько файлов загрузить перед фазой upload")
+    parser.add_argument(
+        "--bump-ancestors",
+        action="store_true",
+        help="Загрузка поднимает modified всех предков папки (по умолчанию - только у самой папки)",
+    )
+    parser.add_argument("--tracemalloc", action="store_true", help="Замерять пик кучи Python (медленнее)")
+    parser.add_argument("--json", help="Сохранить результаты в JSON-файл")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Бенчмарк извлечения дат занятий из имён файлов и папок.
+
+Корпус - листинги синтетического дерева (benchmarks.fake_disk) с именами файлов в форматах,
+которые встречаются на диске: записи Zoom/OBS с ISO-временем, "ДД.ММ.ГГГГ", "ГГГГ.ММ.ДД",
+файлы без даты; у части папок дата в названии.
+
+Сравниваются:
+    reference - прежний разбор (три отдельных re.search на каждое имя и сегмент пути);
+    cold      - extract_date_from_filename/extract_date_from_path с пустым кэшем;
+    warm      - то же с заполненным кэшем (следующие циклы обхода).
+Перед замером результаты сверяются с reference.
+
+Запуск:
+    uv run python -m benchmarks.dates --files 100k
+"""
+import argparse
+import random
+import re
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.crawl import parse_size
+from benchmarks.fake_disk import TEACHERS, SyntheticTree
+from bot.common.utils.path_parser import (
+    _extract_datetime_from_text,
+    extract_date_from_filename,
+    extract_date_from_path,
+)
+
+
+def _reference_text(text: str):
+    """Прежний разбор даты: три паттерна по очереди, без компиляции и кэша"""
+    for pattern, order in (
+        (r'(\d{4})-(\d{2})-(\d{2})(?:[T _](\d{2})[:\-.](\d{2})(?:[:\-.](\d{2}))?Z?)?', (0, 1, 2)),
+        (r'(\d{2})[.-](\d{2})[.-](\d{4})(?:[T _](\d{2})[.:\-](\d{2})(?:[.:\-](\d{2}))?)?', (2, 1, 0)),
+        (r'(\d{4})[.-](\d{2})[.-](\d{2})(?:[T _](\d{2})[.:\-](\d{2})(?:[.:\-](\d{2}))?)?', (0, 1, 2)),
+    ):
+        match = re.search(pattern, text) if text else None
+        if match:
+            groups = match.groups()
+            y, m, d = (int(groups[i]) for i in order)
+            hh, mm, ss = (int(g) if g else 0 for g in groups[3:])
+            try:
+                return datetime(y, m, d, hh, mm, ss)
+            except ValueError:
+                pass
+    return None
+
+
+def _reference_file(directory: str, name: str):
+    dt = _reference_text(name)
+    if dt:
+        return dt
+    for segment in reversed([s for s in f"{directory}/{name}".split("/") if s]):
+        dt = _reference_text(segment)
+        if dt:
+            return dt
+    return None
+
+
+def _name(rng: random.Random, recorded: datetime) -> str:
+    teacher = rng.choice(TEACHERS)
+    kind = rng.random()
+    if kind < 0.55:
+        return f"{teacher} {recorded:%Y-%m-%dT%H-%M-%S}Z.mp4"
+    if kind < 0.7:
+        return f"Запись {recorded:%d.%m.%Y %H-%M}.mp4"
+    if kind < 0.8:
+        return f"{recorded:%Y.%m.%d} {teacher}.mp4"
+    if kind < 0.9:
+        return f"Лекция {rng.randint(1, 30)}. Пределы и непрерывность.mp4"
+    return f"video_{rng.randint(1, 9999)}.mp4"
+
+
+def build_listings(files: int, files_per_dir: int, seed: int = 7) -> list[tuple[str, list[str]]]:
+    rng = random.Random(seed)
+    tree = SyntheticTree(files, files_per_dir)
+    listings = []
+    for i, leaf in enumerate(tree.leaves.values()):
+        directory = leaf.path
+        if i % 4 == 0:
+            directory = f"{directory} {leaf.modified:%d.%m.%Y}"  # Часть папок с датой в названии
+        base = leaf.modified.replace(tzinfo=None)
+        listings.append((directory, [_name(rng, base + timedelta(hours=idx)) for idx in range(leaf.count)]))
+    return listings
+
+
+def run_separately(listings) -> None:
+    for directory, names in listings:
+        for name in names:
+            extract_date_from_filename(name) or extract_date_from_path(f"{directory}/{name}")
+
+
+def run_reference(listings) -> None:
+    for directory, names in listings:
+        for name in names:
+            _reference_file(directory, name)
+
+
+def timed(fn, listings) -> float:
+    started = time.perf_counter()
+    fn(listings)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк извлечения дат из имён файлов")
+    parser.add_argument("--files", type=parse_size, default="100k")
+    parser.add_argument("--files-per-dir", type=int, default=50)
+    args = parser.parse_args()
+
+    listings = build_listings(args.files, args.files_per_dir)
+    files = sum(len(names) for _, names in listings)
+    for directory, names in listings:
+        for name in names:
+            dt = extract_date_from_filename(name) or extract_date_from_path(f"{directory}/{name}")
+            if dt != _reference_file(directory, name):
+                raise SystemExit(f"Расхождение с прежним разбором: {directory}/{name}")
+
+    reference = timed(run_reference, listings)
+    _extract_datetime_from_text.cache_clear()
+    cold = timed(run_separately, listings)
+    warm = timed(run_separately, listings)
+
+    print(f"файлов: {files}, директорий: {len(listings)}")
+    header = f"{'вариант':<28} {'всего, с':>9} {'мкс/файл':>9} {'ускорение':>10}"
+    print(header)
+    print("-" * len(header))
+    for title, elapsed in (
+        ("прежний разбор", reference),
+        ("по файлам, без кэша", cold),
+        ("по файлам, с кэшем", warm),
+    ):
+        print(f"{title:<28} {elapsed:>9.3f} {elapsed / files * 1e6:>9.2f} {reference / elapsed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+Локальная замена публичного API Я.Диска (/v1/disk/public/resources) для бенчмарков.
+
+Дерево синтетическое и похоже на настоящее: курс / предмет / раздел (лекции, семинары, группы) /
+неделя / файлы записей. Файлы генерируются на лету по индексу, поэтому дерево на 200k файлов
+не держит в памяти 200k словарей.
+
+Даты разнесены по уровням частоты обхода: предметы текущего семестра менялись на этой неделе
+(HOT), прошлого - месяцы назад (WARM), архив - годы назад (COLD). Загрузка по умолчанию поднимает
+modified только у папки с файлом, как бывает у Я.Диска; --bump-ancestors - у всех предков.
+
+Запуск отдельно:
+    python -m benchmarks.fake_disk --files 10000 --port 8765
+"""
+import argparse
+import asyncio
+import json
+import random
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from aiohttp import web
+
+COURSES = {
+    "1 курс": ["БЖД", "ДМ", "История России", "ЛА", "МА", "Программирование на Python"],
+    "2 курс": ["АиСД2", "Алгебра", "МА2", "Теория вероятностей"],
+    "3 курс": ["Глубинное обучение 1", "Мат статистика 2", "Машинное обучение 1"],
+    "4 курс": ["Глубинное обучение 2", "ДОЦ Психология"],
+}
+SECTIONS = {
+    "1 курс": ["Лекция", "Семинар", "БКНАД251", "БКНАД252", "БКНАД253"],
+    "2 курс": ["Лекция", "Семинар", "БКНАД241", "БКНАД242"],
+    "3 курс": ["Лекция", "Семинар", "БКНАД231", "БКНАД232"],
+    "4 курс": ["Лекция", "БКНАД211", "БКНАД212"],
+}
+TEACHERS = ["Лобода А.А.", "Медведь Н.Ю.", "Овчинников С.А.", "Петрова Е.В.", "Смирнов К.Д."]
+
+BASE_TIME = datetime(2025, 9, 1, 9, 0, tzinfo=timezone.utc)
+API_PATH = "/v1/disk/public/resources"
+
+# Давность последних изменений предмета, дни: (доля предметов, от, до) - HOT, WARM и COLD
+# при CRAWL_HOT_DAYS=14 и CRAWL_WARM_DAYS=180 по умолчанию
+AGE_BUCKETS = ((0.2, 1, 10), (0.3, 20, 150), (0.5, 200, 900))
+
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat().replace("+00:00", "Z")
+
+
+def _h(value: str) -> int:
+    """Стабильный между запусками хэш (в отличие от hash())"""
+    return zlib.crc32(value.encode())
+
+
+@dataclass
+class _Leaf:
+    """Листовая папка с файлами: файлы с индексами [0, count)"""
+
+    path: str
+    count: int
+    modified: datetime
+    uploads: list[datetime] = field(default_factory=list)  # modified файлов, загруженных после создания
+    modified_at_creation: datetime = field(init=False)
+
+    def file_modified(self, idx: int) -> datetime:
+        initial = self.count - len(self.uploads)
+        if idx >= initial:
+            return self.uploads[idx - initial]
+        # Исходные файлы загружены по секунде друг за другом к моменту создания папки
+        return self.modified_at_creation - timedelta(seconds=initial - 1 - idx)
+
+    def __post_init__(self):
+        self.modified_at_creation = self.modified
+
+
+@dataclass
+class SyntheticTree:
+    """
+    Синтетическое дерево публичной папки
+
+    :param files: сколько файлов в дереве
+    :param files_per_dir: файлов в одной листовой папке (недели)
+    :param bump_ancestors: загрузка поднимает modified у всех предков папки, а не только у неё самой
+    """
+
+    files: int
+    files_per_dir: int = 50
+    bump_ancestors: bool = False
+    leaves: dict[str, _Leaf] = field(default_factory=dict)
+    dirs: dict[str, list[str]] = field(default_factory=dict)  # путь -> дочерние папки
+    dir_modified: dict[str, datetime] = field(default_factory=dict)
+
+    def __post_init__(self):
+        # Уровни считаются от текущего времени, поэтому и даты дерева - от него
+        self.now = datetime.now(timezone.utc).replace(microsecond=0)
+        combos = [(c, s, sec) for c, subjects in COURSES.items() for s in subjects for sec in SECTIONS[c]]
+        leaves = max(1, -(-self.files // self.files_per_dir))
+        remaining = self.files
+        for i in range(leaves):
+            course, subject, section = combos[i % len(combos)]
+            week = i // len(combos) + 1
+            path = f"/{course}/{subject}/{section}/Неделя {week}"
+            count = min(self.files_per_dir, remaining)
+            remaining -= count
+            self._add_leaf(path, count, self._subject_age(course, subject) - timedelta(minutes=i))
+
+    @staticmethod
+    def _subject_age(course: str, subject: str) -> timedelta:
+        """Давность последних изменений предмета: стабильная, по хэшу, в пределах AGE_BUCKETS"""
+        h = _h(f"{course}/{subject}")
+        point = (h % 1000) / 1000
+        for share, low, high in AGE_BUCKETS:
+            if point < share:
+                return timedelta(days=low + (high - low) * point / share)
+            point -= share
+        return timedelta(days=AGE_BUCKETS[-1][2])
+
+    def _add_leaf(self, path: str, count: int, age: timedelta) -> None:
+        # Более поздние недели созданы позже: age уменьшается с номером листа
+        modified = self.now - max(age, timedelta(hours=1))
+        self.leaves[path] = _Leaf(path=path, count=count, modified=modified)
+        # Создание папки меняет листинги всех предков, которые создавались вместе с ней
+        self._touch(path, modified, ancestors=True)
+        child = path
+        while child != "/":
+            parent = child.rsplit("/", 1)[0] or "/"
+            children = self.dirs.setdefault(parent, [])
+            if child not in children:
+                children.append(child)
+            child = parent
+
+    def _touch(self, path: str, modified: datetime, ancestors: bool) -> None:
+        """Поднять modified папки, а при ancestors - и всех её предков"""
+        while True:
+            if path not in self.dir_modified or self.dir_modified[path] < modified:
+                self.dir_modified[path] = modified
+            if path == "/" or not ancestors:
+                return
+            path = path.rsplit("/", 1)[0] or "/"
+
+    def upload(self, files: int, rng: random.Random) -> None:
+        """Смоделировать загрузку: новые файлы в случайные листовые папки предметов текущего семестра"""
+        now = max(self.now, *self.dir_modified.values()) + timedelta(minutes=1)
+        recent = self.now - timedelta(days=AGE_BUCKETS[0][2])
+        paths = [path for path, leaf in self.leaves.items() if leaf.modified >= recent] or list(self.leaves)
+        for i in range(files):
+            leaf = self.leaves[rng.choice(paths)]
+            leaf.count += 1
+            leaf.modified = now + timedelta(seconds=i)
+            leaf.uploads.append(leaf.modified)
+            self._touch(leaf.path, leaf.modified, ancestors=self.bump_ancestors)
+        self.files += files
+
+    def file_item(self, leaf: _Leaf, idx: int) -> dict:
+        """Элемент листинга файла в формате API (включая поля, которые обходчику не нужны)"""
+        recorded = (BASE_TIME + timedelta(hours=idx)).strftime("%Y-%m-%dT%H-%M-%S")
+        name = f"{TEACHERS[idx % len(TEACHERS)]} {recorded}Z.mp4"
+        path = f"{leaf.path}/{name}"
+        h = _h(path)
+        # Файл с большим индексом загружен позже: modified растёт с индексом, и -modified - обратный порядок
+        modified = _iso(leaf.file_modified(idx))
+        return {
+            "path": path,
+            "name": name,
+            "type": "file",
+            "resource_id": f"bench:{h:08x}:{idx}",
+            "md5": f"{h:08x}{idx:024x}",
+            "sha256": f"{h:08x}{idx:056x}",
+            "size": 100_000_000 + idx,
+            "mime_type": "video/mp4",
+            "media_type": "video",
+            "created": modified,
+            "modified": modified,
+            "file": f"https://downloader.disk.yandex.ru/disk/{h:08x}{idx}",
+            "preview": f"https://downloader.disk.yandex.ru/preview/{h:08x}{idx}",
+            "antivirus_status": "clean",
+            "revision": 1_700_000_000_000_000 + idx,
+            "comment_ids": {"private_resource": path, "public_resource": path},
+            "exif": {},
+        }
+
+    def dir_item(self, path: str) -> dict:
+        modified = _iso(self.dir_modified.get(path, BASE_TIME))
+        return {
+            "path": path,
+            "name": path.rsplit("/", 1)[-1],
+            "type": "dir",
+            "resource_id": f"bench:dir:{_h(path):08x}",
+            "created": _iso(BASE_TIME),
+            "modified": modified,
+            "comment_ids": {"private_resource": path, "public_resource": path},
+            "exif": {},
+        }
+
+    def listing(self, path: str, offset: int, limit: int, sort: str | None) -> list[dict] | None:
+        """Страница листинга; None - папки нет"""
+        leaf = self.leaves.get(path)
+        if leaf is not None:
+            total = leaf.count
+            if sort == "-modified":
+                indexes = range(total - 1 - offset, max(-1, total - 1 - offset - limit), -1)
+            else:
+                indexes = range(offset, min(total, offset + limit))
+            return [self.file_item(leaf, i) for i in indexes]
+        children = self.dirs.get(path)
+        if children is None:
+            return None
+        items = [self.dir_item(child) for child in children]
+        if sort:
+            key = sort.lstrip("-")
+            items.sort(key=lambda i: i.get(key) or "", reverse=sort.startswith("-"))
+        return items[offset:offset + limit]
+
+
+class FakeYandexDisk:
+    """
+    aiohttp-сервер с API публичных ресурсов поверх SyntheticTree
+
+    :param latency: задержка ответа, с (плюс до 50% случайного разброса)
+    :param error_rate: доля ответов 503
+    :param throttle_rate: доля ответов 429 (с Retry-After)
+    :param max_limit: верхняя граница limit, как у настоящего API
+    """
+
+    def __init__(
+        self,
+        tree: SyntheticTree,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 0.0,
+        max_limit: int = 1000,
+        seed: int = 42,
+    ):
+        self.tree = tree
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.max_limit = max_limit
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.bytes_sent = 0
+        self._runner: web.AppRunner | None = None
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get(API_PATH, self.handle_resources)
+        app.router.add_post("/_bench/upload", self.handle_upload)
+        app.router.add_get("/_bench/counters", self.handle_counters)
+        app.router.add_post("/_bench/reset", self.handle_reset)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Запустить сервер; port=0 - любой свободный. Возвращает базовый URL"""
+        self._runner = web.AppRunner(self.make_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # noqa: SLF001
+        return f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def handle_resources(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency * (1 + self.rng.random() * 0.5))
+
+        if self.throttle_rate and self.rng.random() < self.throttle_rate:
+            self.throttled += 1
+            return web.json_response(
+                {"error": "TooManyRequestsError"}, status=429, headers={"Retry-After": str(self.retry_after)}
+            )
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({"error": "ServiceUnavailable"}, status=503)
+
+        query = request.query
+        path = query.get("path") or "/"
+        offset = int(query.get("offset", 0))
+        limit = min(int(query.get("limit", 20)), self.max_limit)
+        items = self.tree.listing(path, offset, limit, query.get("sort"))
+        if items is None:
+            return web.json_response({"error": "DiskNotFoundError"}, status=404)
+
+        fields = query.get("fields")
+        if fields:
+            keep = {f.removeprefix("_embedded.items.") for f in fields.split(",") if f.startswith("_embedded.items.")}
+            body = {"_embedded": {"items": [{k: v for k, v in i.items() if k in keep} for i in items]}}
+        else:
+            body = {
+                **self.tree.dir_item(path),
+                "public_key": query.get("public_key"),
+                "_embedded": {"items": items, "limit": limit, "offset": offset, "path": path, "sort": query.get("sort", "")},
+            }
+        raw = json.dumps(body, ensure_ascii=False).encode()
+        self.bytes_sent += len(raw)
+        return web.Response(body=raw, content_type="application/json")
+
+    async def handle_upload(self, request: web.Request) -> web.Response:
+        files = int(request.query.get("files", 1))
+        self.tree.upload(files, self.rng)
+        return web.json_response({"files": self.tree.files})
+
+    async def handle_counters(self, request: web.Request) -> web.Response:
+        return web.json_response(self.counters())
+
+    async def handle_reset(self, request: web.Request) -> web.Response:
+        self.requests = self.errors = self.throttled = self.bytes_sent = 0
+        return web.json_response(self.counters())
+
+    def counters(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "throttled": self.throttled,
+            "bytes_sent": self.bytes_sent,
+            "files": self.tree.files,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Фейковый API публичных ресурсов Я.Диска")
+    parser.add_argument("--files", type=int, default=10_000)
+    parser.add_argument("--files-per-dir", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--bump-ancestors", action="store_true", help="Загрузка поднимает modified всех предков папки")
+    args = parser.parse_args()
+
+    server = FakeYandexDisk(
+        SyntheticTree(args.files, args.files_per_dir, bump_ancestors=args.bump_ancestors),
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+    )
+    web.run_app(server.make_app(), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
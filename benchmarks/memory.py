@@ -0,0 +1,129 @@
+"""
+Бенчмарк памяти на файл: словари листинга и pydantic-записи манифеста против FileRecord/ManifestEntry.
+
+Корпус - листинги синтетического дерева (benchmarks.fake_disk), спроецированные на поля
+обходчика (YandexDiskCrawler.ITEM_FIELDS) и разобранные из JSON по директориям, как ответы API:
+у каждого элемента свои объекты строк.
+
+Замеряется (tracemalloc, байт на файл) то, что держит цикл опроса до сохранения результатов:
+    листинг  - файлы завершённых директорий (фронт обхода) и очередь найденных файлов;
+    манифест - новые записи манифеста по итогам обхода (поверх листинга: общие строки не считаются);
+    из Redis - манифест прошлого обхода, загруженный из хеша.
+"до" - словари листинга и прежняя pydantic-модель записи манифеста с полным путём,
+"после" - FileRecord и ManifestEntry со слотами и интернированной директорией.
+
+Запуск:
+    uv run python -m benchmarks.memory --files 100k
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+from typing import Callable, Optional
+
+from pydantic import BaseModel
+
+from benchmarks.crawl import parse_size
+from benchmarks.fake_disk import SyntheticTree
+from bot.application.services.crawler import YandexDiskCrawler
+from bot.domain.entities.manifest import FileRecord, ManifestEntry
+
+
+class LegacyManifestEntry(BaseModel):
+    """Прежняя запись манифеста: pydantic-модель с полным путём"""
+
+    resource_id: str
+    path: str
+    md5: Optional[str] = None
+    modified: Optional[str] = None
+    size: Optional[int] = None
+
+    @classmethod
+    def from_item(cls, item: dict) -> "LegacyManifestEntry":
+        path = item.get("path", "")
+        return cls(
+            resource_id=item.get("resource_id") or path,
+            path=path,
+            md5=item.get("md5"),
+            modified=item.get("modified"),
+            size=item.get("size"),
+        )
+
+
+def build_payloads(files: int, files_per_dir: int) -> tuple[list[bytes], bytes]:
+    """JSON листингов директорий (ответы API) и хеш манифеста (значения HGETALL)"""
+    tree = SyntheticTree(files, files_per_dir)
+    fields = YandexDiskCrawler.ITEM_FIELDS
+    listings = []
+    manifest = {}
+    for leaf in tree.leaves.values():
+        items = [tree.file_item(leaf, idx) for idx in range(leaf.count)]
+        listings.append(json.dumps([{k: item[k] for k in fields if k in item} for item in items]).encode())
+        for item in items:
+            manifest[item["resource_id"]] = json.dumps(
+                {"path": item["path"], "md5": item["md5"], "modified": item["modified"], "size": item["size"]}
+            )
+    return listings, json.dumps(manifest).encode()
+
+
+def retained(build: Callable[[], object]) -> tuple[int, object]:
+    """Сколько байт занимает результат build() после сборки мусора"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, result
+
+
+def measure(listings: list[bytes], manifest: bytes, compact: bool) -> tuple[int, int, int]:
+    if compact:
+        def listing():
+            return [FileRecord.from_item(item) for payload in listings for item in json.loads(payload)]
+
+        def entries(records):
+            return {r.resource_id: ManifestEntry.from_record(r) for r in records}
+
+        entry_cls = ManifestEntry
+    else:
+        def listing():
+            return [item for payload in listings for item in json.loads(payload)]
+
+        def entries(records):
+            return {r["resource_id"]: LegacyManifestEntry.from_item(r) for r in records}
+
+        entry_cls = LegacyManifestEntry
+
+    listing_bytes, records = retained(listing)
+    manifest_bytes, updated = retained(lambda: entries(records))
+    loaded_bytes, loaded = retained(
+        lambda: {rid: entry_cls(resource_id=rid, **json.loads(v)) for rid, v in json.loads(manifest).items()}
+    )
+    del records, updated, loaded
+    return listing_bytes, manifest_bytes, loaded_bytes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк памяти на файл в цикле опроса")
+    parser.add_argument("--files", type=parse_size, default="100k")
+    parser.add_argument("--files-per-dir", type=int, default=50)
+    args = parser.parse_args()
+
+    listings, manifest = build_payloads(args.files, args.files_per_dir)
+    files = len(json.loads(manifest))
+    before = measure(listings, manifest, compact=False)
+    after = measure(listings, manifest, compact=True)
+
+    print(f"файлов: {files}, директорий: {len(listings)}")
+    header = f"{'структура':<12} {'до, Б/файл':>11} {'после, Б/файл':>14} {'экономия':>9}"
+    print(header)
+    print("-" * len(header))
+    for title, old, new in zip(("листинг", "манифест", "из Redis"), before, after):
+        print(f"{title:<12} {old / files:>11.0f} {new / files:>14.0f} {1 - new / old:>8.0%}")
+    total_old, total_new = sum(before), sum(after)
+    print(f"{'всего':<12} {total_old / files:>11.0f} {total_new / files:>14.0f} {1 - total_new / total_old:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
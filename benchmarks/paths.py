@@ -0,0 +1,92 @@
+"""
+Бенчмарк разбора путей: отдельные extract_* против classify_path (один проход, кэш папок).
+
+Корпус - пути файлов синтетического дерева (benchmarks.fake_disk). Отдельные функции
+вызываются так, как их вызывало создание задачи и подсчёт групп: предмет, группа дважды,
+сырой код группы, тема, преподаватель и дата. classify_path замеряется с пустым кэшем папок
+(первый обход) и с заполненным (следующие циклы). Перед замером результаты сверяются.
+
+Запуск:
+    uv run python -m benchmarks.paths --files 100k
+"""
+import argparse
+import time
+
+from benchmarks.crawl import parse_size
+from benchmarks.fake_disk import SyntheticTree
+from bot.common.utils.path_classifier import classify_directory, classify_path
+from bot.common.utils.path_parser import (
+    extract_date_from_filename,
+    extract_date_from_path,
+    extract_group_from_path,
+    extract_group_raw_from_path,
+    extract_subject_from_path,
+    extract_teacher_from_filename,
+    extract_topic_from_path,
+)
+
+
+def build_corpus(files: int, files_per_dir: int) -> list[str]:
+    tree = SyntheticTree(files, files_per_dir)
+    return [tree.file_item(leaf, idx)["path"] for leaf in tree.leaves.values() for idx in range(leaf.count)]
+
+
+def extract_separately(path: str) -> tuple:
+    name = path.rsplit("/", 1)[-1]
+    subject = extract_subject_from_path(path)
+    group = extract_group_from_path(path)
+    extract_group_from_path(path)  # Повторный вызов при подсчёте групп
+    group_raw = extract_group_raw_from_path(path)
+    topic = extract_topic_from_path(path)
+    teacher = extract_teacher_from_filename(name)
+    lesson_date = extract_date_from_filename(name) or extract_date_from_path(path)
+    return subject, topic, group, group_raw, teacher, lesson_date
+
+
+def extract_classified(path: str) -> tuple:
+    info = classify_path(path)
+    return info.subject, info.topic, info.group, info.group_raw, info.teacher, info.lesson_date
+
+
+def measure(fn, corpus: list[str], repeat: int) -> float:
+    """Лучшее время прохода по корпусу из repeat, с"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for path in corpus:
+            fn(path)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк разбора путей Я.Диска")
+    parser.add_argument("--files", type=parse_size, default="100k")
+    parser.add_argument("--files-per-dir", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.files, args.files_per_dir)
+    mismatches = [p for p in corpus if extract_separately(p) != extract_classified(p)]
+    if mismatches:
+        raise SystemExit(f"classify_path расходится с extract_* на {len(mismatches)} путях, например {mismatches[0]!r}")
+
+    separate = measure(extract_separately, corpus, args.repeat)
+    classify_directory.cache_clear()
+    started = time.perf_counter()
+    for path in corpus:
+        classify_path(path)
+    cold = time.perf_counter() - started
+    warm = measure(classify_path, corpus, args.repeat)
+    cache = classify_directory.cache_info()
+
+    print(f"путей: {len(corpus)}, папок в кэше: {cache.currsize}")
+    header = f"{'вариант':<24} {'всего, с':>9} {'мкс/путь':>9} {'ускорение':>10}"
+    print(header)
+    print("-" * len(header))
+    for title, elapsed in (("extract_* по отдельности", separate), ("classify_path, без кэша", cold), ("classify_path, с кэшем", warm)):
+        print(f"{title:<24} {elapsed:>9.3f} {elapsed / len(corpus) * 1e6:>9.2f} {separate / elapsed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
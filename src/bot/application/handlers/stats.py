@@ -3,10 +3,11 @@ from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command
 from aiogram.types import LinkPreviewOptions
 from bot.application.services.long_poll import YandexDiskPollingService
-from bot.application.widgets.keyboards import build_stats_menu_kb, build_kv_list_kb
-from bot.common.utils.formatters import StatisticsFormatter
+from bot.application.widgets.keyboards import build_stats_menu_kb, build_kv_list_kb, build_status_kb, build_telemetry_kb
+from bot.common.utils.formatters import CrawlTelemetryFormatter, StatisticsFormatter
 from bot.common.utils.formatting import parse_dt_raw, fmt_secs, fmt_int, human_ago
 from bot.common.utils.permissions import is_admin
+from bot.domain.entities.mappings import CrawlTier
 from bot.domain.entities.user import CreateUserEntity
 from bot.domain.services.scheduler import SchedulerServiceInterface
 from bot.domain.services.statistics import StatisticsServiceInterface
@@ -17,6 +18,8 @@ from redis.asyncio import Redis
 
 router = Router(name="stats")
 
+TIER_TITLES = {CrawlTier.HOT: "горячие", CrawlTier.WARM: "тёплые", CrawlTier.COLD: "холодные"}
+
 
 @router.message(Command("stats"))
 @inject
@@ -190,21 +193,34 @@ async def cmd_status(
         await message.answer("🚫 Доступно только администраторам")
         return
 
-    # Чекпоинт long-poll
+    # Чекпоинты long-poll по каждой корневой папке
+    checkpoints: dict[str, tuple[str, str]] = {}
+    for root_url in polling.public_root_urls:
+        try:
+            checkpoint_raw = await redis.get(polling._get_checkpoint_key(root_url))  # noqa: SLF001
+            checkpoint_dt = parse_dt_raw(checkpoint_raw)
+            checkpoints[root_url] = (
+                checkpoint_dt.strftime("%d.%m.%Y %H:%M:%S") if checkpoint_dt else "—",
+                human_ago(checkpoint_dt),
+            )
+        except Exception:
+            checkpoints[root_url] = ("—", "—")
+
+    # Лидер опроса
     try:
-        checkpoint_raw = await redis.get(polling._get_checkpoint_key())  # noqa: SLF001
-        checkpoint_dt = parse_dt_raw(checkpoint_raw)
-        checkpoint = checkpoint_dt.strftime("%d.%m.%Y %H:%M:%S") if checkpoint_dt else "—"
-        checkpoint_ago = human_ago(checkpoint_dt)
+        lease = await polling.lease_repository.current(polling.LEASE_NAME)
+        lease_error = False
     except Exception:
-        checkpoint = "—"
-        checkpoint_ago = "—"
+        lease = None
+        lease_error = True
 
     # Общая информация по long-poll
-    poll_url = getattr(polling, "public_root_url", "—")
     poll_interval = fmt_secs(getattr(polling, "poll_interval", "—"))
+    schedule = polling.poll_schedule
     http_timeout = fmt_secs(getattr(polling, "http_timeout", "—"))
     poll_running = getattr(polling, "_running", False)
+    crawl_stats_by_root = getattr(polling, "last_crawl_stats", None) or {}
+    api_retry_in = polling.disk_client.retry_in
 
     # Планировщик
     sched_interval = fmt_secs(getattr(scheduler, "check_interval", "—"))
@@ -218,27 +234,168 @@ async def cmd_status(
     lines: list[str] = ["ℹ️ <b>Статус сервиса</b>", "🛰️ <b>Long‑poll</b>"]
 
     # Long-poll
-    if poll_url and poll_url != "—":
-        lines.append(f"  • URL: <a href=\"{poll_url}\">{poll_url}</a>")
-    else:
-        lines.append(f"  • URL: {poll_url}")
-    lines.append(f"  • Интервал опроса: {poll_interval}")
+    lines.append(f"  • Интервал опроса: {fmt_secs(round(schedule.current))} ({schedule.reason})")
+    lines.append(f"  • Базовый интервал: {poll_interval}, границы {fmt_secs(schedule.minimum)}–{fmt_secs(schedule.maximum)}")
     lines.append(f"  • HTTP таймаут: {http_timeout}")
     lines.append(f"  • Состояние: {'<b>работает</b>' if poll_running else '<b>остановлен</b>'}")
-    lines.append(f"  • Последняя проверка: {checkpoint} ({checkpoint_ago})")
+    lines.append(f"  • Роль экземпляра: {'<b>лидер</b>' if polling.is_leader else 'резерв'} (<code>{polling.instance_id}</code>)")
+    if lease:
+        lines.append(f"  • Лидер: <code>{lease.holder}</code>, токен {lease.token}")
+        lines.append(
+            f"  • Аренда: взята {human_ago(lease.acquired_at)}, продлена {human_ago(lease.renewed_at)}"
+            + (f", истекает через {fmt_secs(round(lease.ttl_ms / 1000))}" if lease.ttl_ms else "")
+        )
+    else:
+        lines.append(f"  • Лидер: {'—' if lease_error else 'нет, аренда свободна'}")
+    demand = polling.last_demand
+    if demand is not None:
+        lines.append(
+            f"  • Спрос на обход: предметов {fmt_int(len(demand.subjects))}, групп {fmt_int(len(demand.groups))}, "
+            f"получателей {fmt_int(demand.users)}"
+        )
+    elif not polling.crawl_prune_unsubscribed:
+        lines.append("  • Спрос на обход: отсечение выключено, обходится всё дерево")
+    if api_retry_in > 0:
+        lines.append(f"  • API Я.Диска: <b>пауза</b>, повтор через {fmt_secs(round(api_retry_in))}")
+
+    root_blocks: list[list[str]] = []
+    for root_url, (checkpoint, checkpoint_ago) in checkpoints.items():
+        block = [
+            f"  📁 <a href=\"{root_url}\">{root_url}</a>",
+            f"    • Последняя проверка: {checkpoint} ({checkpoint_ago})",
+        ]
+        root_blocks.append(block)
+        crawl_stats = crawl_stats_by_root.get(root_url)
+        if not crawl_stats:
+            continue
+        block.append(
+            f"    • Последний обход: {fmt_secs(round(crawl_stats.duration, 1))} "
+            f"(директорий {fmt_int(crawl_stats.directories)}, файлов {fmt_int(crawl_stats.files)}, "
+            f"запросов {fmt_int(crawl_stats.requests)}, повторов {fmt_int(crawl_stats.retries)}, "
+            f"ошибок {fmt_int(crawl_stats.errors)})"
+        )
+        if crawl_stats.errors:
+            block.append("    • ⚠️ Обход неполный: удаления и чекпоинт не сохранены")
+        mode = "полный" if crawl_stats.full_resync else "инкрементальный"
+        block.append(
+            f"    • Режим обхода: {mode}, пропущено поддеревьев {fmt_int(crawl_stats.skipped_directories)}, "
+            f"без подписчиков {fmt_int(crawl_stats.pruned_directories)}, "
+            f"неполных листингов {fmt_int(crawl_stats.partial_directories)}, "
+            f"сэкономлено запросов {fmt_int(crawl_stats.requests_saved)}"
+        )
+        if crawl_stats.tier_requests or crawl_stats.tier_directories:
+            tiers = ", ".join(
+                f"{TIER_TITLES[tier]} {fmt_int(crawl_stats.tier_requests.get(tier, 0))}"
+                f" ({fmt_int(crawl_stats.tier_directories.get(tier, 0))} дир.)"
+                for tier in CrawlTier
+            )
+            block.append(f"    • Запросов по уровням: {tiers}")
 
     # Scheduler
-    lines.append("⏰ <b>Планировщик уведомлений</b>")
-    lines.append(f"  • Период проверки: {sched_interval}")
-    lines.append(f"  • Состояние: {'<b>работает</b>' if sched_running else '<b>остановлен</b>'}")
+    tail: list[str] = []
+    tail.append("⏰ <b>Планировщик уведомлений</b>")
+    tail.append(f"  • Период проверки: {sched_interval}")
+    tail.append(f"  • Состояние: {'<b>работает</b>' if sched_running else '<b>остановлен</b>'}")
 
     # Queues
-    lines.append("🗃️ <b>Очереди</b>")
-    lines.append(f"  • Входящих задач: <b>{fmt_int(queue_len)}</b>")
-    lines.append(f"  • Запланировано к отправке: <b>{fmt_int(scheduled_total)}</b>")
+    tail.append("🗃️ <b>Очереди</b>")
+    tail.append(f"  • Входящих задач: <b>{fmt_int(queue_len)}</b>")
+    tail.append(f"  • Запланировано к отправке: <b>{fmt_int(scheduled_total)}</b>")
 
     await message.answer(
-        "\n".join(lines),
+        _fit_status(lines, root_blocks, tail),
         parse_mode="HTML",
         link_preview_options=LinkPreviewOptions(is_disabled=True),
+        reply_markup=build_status_kb(),
     )
+
+
+def _fit_status(head: list[str], root_blocks: list[list[str]], tail: list[str]) -> str:
+    """
+    Собрать статус в одно сообщение Telegram
+
+    Как и в CrawlTelemetryFormatter: если текст длиннее MAX_LENGTH, по корневым папкам
+    остаётся только последняя проверка, а если и этого мало - список папок обрезается
+    по целой папке. Планировщик и очереди показываются всегда.
+
+    :param head: общие строки long-poll
+    :param root_blocks: строки по каждой корневой папке, первые две - ссылка и последняя проверка
+    :param tail: строки планировщика и очередей
+    :return: текст статуса не длиннее MAX_LENGTH
+    """
+    limit = CrawlTelemetryFormatter.MAX_LENGTH
+    for depth in (None, 2):
+        lines = head + [line for block in root_blocks for line in block[:depth]] + tail
+        text = "\n".join(lines)
+        if len(text) <= limit:
+            return text
+
+    marker = f"  {CrawlTelemetryFormatter.TRUNCATED}"
+    size = len("\n".join(head + [marker] + tail))
+    kept: list[str] = []
+    for block in root_blocks:
+        block_size = sum(len(line) + 1 for line in block[:2])
+        if size + block_size > limit:
+            break
+        kept.extend(block[:2])
+        size += block_size
+    return "\n".join(head + kept + [marker] + tail)
+
+
+async def _build_telemetry_report(polling: YandexDiskPollingService) -> str:
+    """Собрать отчёт телеметрии обхода по всем корневым папкам"""
+    cycles_by_root = {}
+    for root_url in polling.public_root_urls:
+        try:
+            cycles_by_root[root_url] = await polling.crawl_state_repository.load_telemetry(
+                root_url, polling.crawl_telemetry_cycles
+            )
+        except Exception:
+            cycles_by_root[root_url] = []
+    return CrawlTelemetryFormatter.format_report(cycles_by_root)
+
+
+@router.callback_query(F.data == "status:telemetry")
+@inject
+async def cb_status_telemetry(
+    callback: types.CallbackQuery,
+    user_service: FromDishka[UserServiceInterface],
+    polling: FromDishka[YandexDiskPollingService],
+):
+    """Показать телеметрию обхода отдельным сообщением (статус остаётся на месте)."""
+    await callback.answer()
+    caller = await user_service.get_or_create(CreateUserEntity.from_aiogram(callback.from_user))
+    if not is_admin(caller):
+        return
+    await callback.message.answer(
+        await _build_telemetry_report(polling),
+        parse_mode="HTML",
+        link_preview_options=LinkPreviewOptions(is_disabled=True),
+        reply_markup=build_telemetry_kb(),
+    )
+
+
+@router.callback_query(F.data == "status:telemetry:refresh")
+@inject
+async def cb_status_telemetry_refresh(
+    callback: types.CallbackQuery,
+    user_service: FromDishka[UserServiceInterface],
+    polling: FromDishka[YandexDiskPollingService],
+):
+    """Обновить отчёт телеметрии обхода."""
+    await callback.answer()
+    caller = await user_service.get_or_create(CreateUserEntity.from_aiogram(callback.from_user))
+    if not is_admin(caller):
+        return
+    try:
+        await callback.message.edit_text(
+            await _build_telemetry_report(polling),
+            parse_mode="HTML",
+            link_preview_options=LinkPreviewOptions(is_disabled=True),
+            reply_markup=build_telemetry_kb(),
+        )
+    except TelegramBadRequest as e:
+        if "message is not modified" in str(e).lower():
+            pass
+        else:
+            raise
@@ -0,0 +1,674 @@
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from hashlib import sha1
+from typing import AsyncIterator
+
+from bot.common.logs import logger
+from bot.common.utils.demand import CrawlDemand
+from bot.common.utils.manifest import has_ancestor_in
+from bot.common.utils.path_parser import parse_datetime
+from bot.domain.clients.yandex_disk import YandexDiskClientInterface, YandexDiskError, YandexDiskUnavailableError
+from bot.domain.entities.crawl import (
+    CrawlFrontier,
+    CrawlStats,
+    CrawlTelemetry,
+    DirectoryState,
+    DirectoryTelemetry,
+    FrontierDirectory,
+    FrontierPages,
+)
+from bot.domain.entities.manifest import FileRecord
+from bot.domain.entities.mappings import CrawlTier
+from bot.domain.repositories.crawl import CrawlStateRepositoryInterface
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:  # orjson - необязательное ускорение (extra "speedups")
+    _json_loads = json.loads
+
+
+@dataclass
+class _Listing:
+    """Результат листинга одной директории за обход"""
+
+    modified: str | None
+    digest: str
+    children: list[str]
+    pages: int
+    watermark: str | None
+    partial: bool
+
+
+class YandexDiskCrawler:
+    """
+    Параллельный обход дерева публичной папки Я.Диска.
+
+    Директории обходятся пулом воркеров через общий клиент API, найденные файлы
+    отдаются потоком через ограниченную очередь (backpressure для потребителя).
+
+    Поддиректория, у которой modified в листинге родителя совпадает с прошлым обходом,
+    не запрашивается: её поддерево считается неизменным (см. skipped). Отпечатки
+    директорий сворачиваются снизу вверх, как дерево Меркла.
+
+    В инкрементальном режиме листинг запрашивается по убыванию modified и обрывается
+    на водяной метке директории (см. partial). Полный листинг - только при full_resync.
+
+    Директориям назначается уровень частоты (CrawlTier) по давности последнего изменения
+    в поддереве. Неизменное поддерево уровня из refresh_tiers всё равно листается (на случай,
+    если Я.Диск не поднял modified родителя); если листинг родителя оборван на водяной метке,
+    такие поддиректории берутся из прошлого обхода. Директории уровней из reconcile_tiers
+    листаются полностью, без водяной метки.
+
+    Если передан demand, поддиректории с папкой предмета или группы, файлы из которых никто
+    не получит, не листаются - как и пропущенные по отпечатку, они попадают в skipped, и их
+    файлы остаются в манифесте. При full_resync отсечения нет: так раз в цикл сверки обновляется статистика.
+
+    Если передан state_repository, фронт обхода (необойдённые директории, смещения страниц,
+    уже отданные файлы) периодически сохраняется, и прерванный обход продолжается с него.
+    """
+
+    PAGE_LIMIT = 200
+    INCREMENTAL_PAGE_LIMIT = 50
+    ROOT = "/"
+
+    # Поля элементов листинга, которые нужны обходчику и задачам на уведомление
+    # Без "file": временная ссылка на скачивание запрашивается при отправке уведомления
+    ITEM_FIELDS = ("path", "name", "type", "md5", "resource_id", "created", "modified", "size")
+    # Проекция ответа API: без превью, mime-типов и метаданных самой директории
+    FIELDS_PARAM = ",".join(f"_embedded.items.{f}" for f in ITEM_FIELDS)
+
+    _DONE = object()
+
+    def __init__(
+        self,
+        client: YandexDiskClientInterface,
+        public_root_url: str,
+        concurrency: int = 8,
+        directories: dict[str, DirectoryState] | None = None,
+        full_resync: bool = True,
+        state_repository: CrawlStateRepositoryInterface | None = None,
+        checkpoint_interval: float = 10.0,
+        frontier_max_age: int = 3600,
+        refresh_tiers: set[CrawlTier] | None = None,
+        reconcile_tiers: set[CrawlTier] | None = None,
+        hot_days: int = 14,
+        warm_days: int = 180,
+        demand: CrawlDemand | None = None,
+    ):
+        """
+        :param directories: состояния директорий с прошлого обхода
+        :param full_resync: обойти всё дерево, не доверяя отпечаткам (все уровни)
+        :param state_repository: хранилище фронта обхода; None - обход не возобновляется
+        :param checkpoint_interval: как часто сохранять фронт, с
+        :param frontier_max_age: фронт старше этого (с) не возобновляется
+        :param refresh_tiers: уровни, неизменные поддеревья которых листаются в этом обходе
+        :param reconcile_tiers: уровни, директории которых листаются полностью (сверка)
+        :param hot_days: изменения моложе стольких дней - уровень HOT
+        :param warm_days: изменения моложе стольких дней - уровень WARM, старше - COLD
+        :param demand: спрос пользователей; None - обходить все поддеревья
+        """
+        self.client = client
+        self.public_root_url = public_root_url
+        self.concurrency = max(1, concurrency)
+        self.previous = directories or {}
+        self.full_resync = full_resync or not self.previous
+        self.stats = CrawlStats(full_resync=self.full_resync)
+        self.refresh_tiers = set(refresh_tiers or ())
+        self.reconcile_tiers = set(reconcile_tiers or ())
+        self.hot_age = timedelta(days=hot_days)
+        self.warm_age = timedelta(days=warm_days)
+        self.demand = demand
+        # Поддиректории по прошлому обходу: за водяной меткой неполного листинга их не видно
+        self._previous_children: dict[str, list[str]] = {}
+        for child in self.previous:
+            if child != self.ROOT:
+                self._previous_children.setdefault(child.rsplit("/", 1)[0] or self.ROOT, []).append(child)
+
+        # Поддеревья, пропущенные по отпечатку: их файлы не отдаются, но и не удалены
+        self.skipped: set[str] = set()
+        # Директории, листинг которых оборван на водяной метке: старые элементы не видны
+        self.partial: set[str] = set()
+        self._listings: dict[str, _Listing] = {}
+        # Метрики листингов этого процесса (директории с возобновлённого фронта не входят)
+        self.telemetry: dict[str, DirectoryTelemetry] = {}
+
+        self.state_repository = state_repository
+        self.checkpoint_interval = checkpoint_interval
+        self.frontier_max_age = frontier_max_age
+        self.resumed = False
+        # Фронт: директории в очереди или в работе, смещения их листингов,
+        # файлы директорий, завершённых с прошлого сохранения
+        self._pending: dict[str, str | None] = {}
+        self._pages: dict[str, FrontierPages] = {}
+        self._unsaved: dict[str, list[FileRecord]] = {}
+
+    @property
+    def untouched(self) -> set[str]:
+        """Директории, содержимое которых в этом обходе видно не целиком"""
+        return self.skipped | self.partial
+
+    @property
+    def finished(self) -> bool:
+        """Обход дошёл до конца (возможно, с ошибками), а не прерван"""
+        return self.stats.finished_at is not None
+
+    @property
+    def complete(self) -> bool:
+        """Обход прошёл без ошибок, и его результатам можно доверять"""
+        return self.stats.finished_at is not None and self.stats.errors == 0
+
+    async def iter_files(self) -> AsyncIterator[FileRecord]:
+        """Обходит дерево и по мере готовности отдаёт файлы."""
+        pending: asyncio.Queue[tuple[str, str | None]] = asyncio.Queue()
+        found: asyncio.Queue = asyncio.Queue(maxsize=self.PAGE_LIMIT * self.concurrency)
+
+        started = time.monotonic()
+        self.stats = CrawlStats(full_resync=self.full_resync)
+        self.skipped.clear()
+        self.partial.clear()
+        self._listings.clear()
+        self.telemetry.clear()
+        self._pending.clear()
+        self._pages.clear()
+        self._unsaved.clear()
+
+        replay = await self._restore_frontier()
+        if not self.resumed:
+            self._pending[self.ROOT] = None  # Начинаем с корня
+        for path, modified in self._pending.items():
+            pending.put_nowait((path, modified))
+
+        workers = [
+            asyncio.create_task(self._worker(pending, found), name=f"yadisk_crawl_{i}")
+            for i in range(self.concurrency)
+        ]
+
+        async def _finish():
+            await pending.join()
+            await found.put(self._DONE)
+
+        finisher = asyncio.create_task(_finish(), name="yadisk_crawl_join")
+        checkpointer = asyncio.create_task(self._checkpoint_loop(), name="yadisk_crawl_checkpoint")
+
+        try:
+            # Файлы директорий, завершённых до перезапуска, отдаём без запросов к API
+            for item in replay:
+                yield item
+            while True:
+                item = await found.get()
+                if item is self._DONE:
+                    break
+                yield item
+        finally:
+            for t in (*workers, finisher, checkpointer):
+                t.cancel()
+            await asyncio.gather(*workers, finisher, checkpointer, return_exceptions=True)
+
+            self.stats.finished_at = datetime.now() if not self._pending else None
+            self.stats.duration = time.monotonic() - started
+            # Финальное сохранение: после завершения фронт пуст, но завершённые директории
+            # нужны, пока вызывающий код не сохранит результаты (см. discard_frontier)
+            await self._save_frontier()
+            root = self.previous.get(self.ROOT)
+            if root and not self.full_resync:
+                # Экономия относительно стоимости полного обхода по прошлым данным
+                self.stats.requests_saved = max(0, root.requests - self.stats.requests)
+            logger.info(
+                f"⏱️ Обход завершён за {self.stats.duration:.1f} с: директорий {self.stats.directories}, "
+                f"файлов {self.stats.files}, запросов {self.stats.requests}, ошибок {self.stats.errors}, "
+                f"пропущено поддеревьев {self.stats.skipped_directories}, без подписчиков {self.stats.pruned_directories}, неполных листингов {self.stats.partial_directories} "
+                f"(сэкономлено запросов {self.stats.requests_saved}), страниц по уровням "
+                + ", ".join(f"{tier}: {n}" for tier, n in sorted(self.stats.tier_requests.items()))
+            )
+
+    async def discard_frontier(self) -> None:
+        """Удалить сохранённый фронт: результаты обхода сохранены, возобновлять нечего"""
+        if not self.state_repository:
+            return
+        try:
+            await self.state_repository.clear_frontier(self.public_root_url)
+        except Exception as e:
+            logger.error(f"Не удалось удалить фронт обхода: {e}")
+
+    async def _restore_frontier(self) -> list[FileRecord]:
+        """
+        Восстановить фронт прерванного обхода
+
+        :return: файлы директорий, завершённых до перезапуска
+        """
+        self.resumed = False
+        if not self.state_repository:
+            return []
+        try:
+            frontier = await self.state_repository.load_frontier(self.public_root_url)
+        except Exception as e:
+            logger.error(f"Не удалось загрузить фронт обхода: {e}")
+            frontier = None
+
+        if frontier and (datetime.now() - frontier.saved_at).total_seconds() > self.frontier_max_age:
+            logger.info(f"🧭 Фронт обхода от {frontier.saved_at.isoformat()} устарел, обход начнётся с корня")
+            frontier = None
+        if not frontier:
+            await self.discard_frontier()
+            return []
+
+        self.resumed = True
+        self.full_resync = frontier.full_resync
+        self.stats = frontier.stats
+        self.stats.finished_at = None
+        self.skipped = set(frontier.skipped)
+        self.partial = set(frontier.partial)
+        self._pending = dict(frontier.pending)
+        self._pages = {path: pages for path, pages in frontier.pages.items() if path in self._pending}
+
+        replay: list[FileRecord] = []
+        for path, d in frontier.directories.items():
+            self._listings[path] = _Listing(
+                modified=d.modified,
+                digest=d.digest,
+                children=d.children,
+                pages=d.pages,
+                watermark=d.watermark,
+                partial=d.partial,
+            )
+            replay.extend(FileRecord.from_item(f) for f in d.files)
+        logger.info(
+            f"🧭 Обход возобновлён с фронта от {frontier.saved_at.isoformat()}: "
+            f"завершено директорий {len(self._listings)}, в очереди {len(self._pending)}, "
+            f"файлов к повторной отдаче {len(replay)}"
+        )
+        return replay
+
+    async def _checkpoint_loop(self) -> None:
+        """Периодически сохраняет фронт обхода"""
+        if not self.state_repository:
+            return
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            await self._save_frontier()
+
+    async def _save_frontier(self) -> None:
+        """Сохранить фронт: необойдённые директории, смещения листингов и новые завершённые директории"""
+        if not self.state_repository:
+            return
+        # Снимок собирается без await, поэтому согласован с состоянием воркеров
+        unsaved, self._unsaved = self._unsaved, {}
+        frontier = CrawlFrontier(
+            full_resync=self.full_resync,
+            stats=self.stats.model_copy(),
+            pending=dict(self._pending),
+            skipped=sorted(self.skipped),
+            partial=sorted(self.partial),
+            directories={
+                path: FrontierDirectory(
+                    path=path,
+                    modified=listing.modified,
+                    digest=listing.digest,
+                    children=listing.children,
+                    pages=listing.pages,
+                    watermark=listing.watermark,
+                    partial=listing.partial,
+                    files=[f.to_item() for f in files],
+                )
+                for path, files in unsaved.items()
+                if (listing := self._listings.get(path))
+            },
+            pages={path: p.model_copy(update={"items": list(p.items)}) for path, p in self._pages.items()},
+        )
+        try:
+            await self.state_repository.save_frontier(self.public_root_url, frontier, ttl=self.frontier_max_age)
+        except Exception as e:
+            # Несохранённые директории попробуем записать в следующий раз
+            for path, files in unsaved.items():
+                self._unsaved.setdefault(path, files)
+            logger.error(f"Не удалось сохранить фронт обхода: {e}")
+
+    def directory_states(self) -> dict[str, DirectoryState]:
+        """
+        Отпечатки директорий по итогам обхода
+
+        Листинги сворачиваются снизу вверх; пропущенные поддеревья и невидимая часть
+        неполных листингов переносятся из прошлого обхода.
+        """
+        states: dict[str, DirectoryState] = {
+            path: state
+            for path, state in self.previous.items()
+            if has_ancestor_in(path, self.skipped, include_self=True) or has_ancestor_in(path, self.partial)
+        }
+
+        for path in sorted(self._listings, key=self._depth, reverse=True):
+            listing = self._listings[path]
+            prev = self.previous.get(path)
+            h = sha1(listing.digest.encode())
+            if listing.partial and prev:
+                # Неполный листинг: отпечаток строим поверх прошлого, стоимость берём прошлую
+                h.update((prev.fingerprint or "").encode())
+            requests = listing.pages
+            for child in sorted(set(listing.children)):
+                child_state = states.get(child)
+                if child_state:
+                    h.update((child_state.fingerprint or "").encode())
+                    requests += child_state.requests
+            pages = listing.pages
+            if listing.partial and prev:
+                pages = prev.pages
+                requests = max(requests, prev.requests)
+            last_change = self._latest(
+                listing.watermark,
+                *(states[child].last_change for child in set(listing.children) if child in states),
+            )
+            states[path] = DirectoryState(
+                path=path,
+                modified=listing.modified,
+                fingerprint=h.hexdigest(),
+                pages=pages,
+                requests=requests,
+                watermark=listing.watermark,
+                last_change=last_change,
+            )
+
+        # Уровни пересчитываются для всех директорий, включая перенесённые: так остывают
+        # и поддеревья, которые в этом обходе не листались
+        now = datetime.now()
+        self.stats.tier_directories = {}
+        for state in states.values():
+            state.tier = self._classify(state.last_change or state.modified, now)
+            self.stats.tier_directories[state.tier] = self.stats.tier_directories.get(state.tier, 0) + 1
+
+        return states
+
+    async def _worker(self, pending: asyncio.Queue, found: asyncio.Queue) -> None:
+        """Воркер: берёт директорию из очереди, раскладывает файлы и поддиректории."""
+        while True:
+            path, modified = await pending.get()
+            try:
+                prev = self.previous.get(path)
+                tier = self._tier_of(prev)
+                full_listing = self.full_resync or not prev or tier in self.reconcile_tiers
+                watermark = None if full_listing else prev.watermark
+                telemetry = self.telemetry[path] = DirectoryTelemetry(path=path, tier=tier)
+                items, pages, partial = await self._fetch_directory(path, watermark, telemetry)
+                self.stats.directories += 1
+                self.stats.tier_requests[tier] = self.stats.tier_requests.get(tier, 0) + pages
+                if partial:
+                    self.partial.add(path)
+                    self.stats.partial_directories += 1
+
+                # Листинг, поддиректории и фронт обновляются без await между ними,
+                # чтобы сохранённый фронт не содержал директорию наполовину
+                files: list[FileRecord] = []
+                children: list[str] = []
+                for item in items:
+                    if item.get("type") == "file":
+                        files.append(FileRecord.from_item(item))
+                    elif item.get("type") == "dir":
+                        child = item.get("path")
+                        children.append(child)
+                        if self._is_unchanged(child, item.get("modified")):
+                            self.skipped.add(child)
+                            self.stats.skipped_directories += 1
+                            continue
+                        if self._is_pruned(child):
+                            self.skipped.add(child)
+                            self.stats.pruned_directories += 1
+                            continue
+                        # Добавляем поддиректорию в очередь на обход
+                        self._pending[child] = item.get("modified")
+                        pending.put_nowait((child, item.get("modified")))
+                if partial:
+                    # Поддиректории за водяной меткой: их modified не менялся, но уровни
+                    # из refresh_tiers листаются каждый раз, иначе изменения в них ждали бы сверки
+                    for child in self._hidden_refresh_children(path, children):
+                        children.append(child)
+                        self._pending[child] = self.previous[child].modified
+                        pending.put_nowait((child, self.previous[child].modified))
+
+                self._listings[path] = _Listing(
+                    modified=modified,
+                    digest=self._listing_digest(items),
+                    children=children,
+                    pages=pages,
+                    watermark=self._max_modified(items, watermark if partial else None),
+                    partial=partial,
+                )
+                self._pending.pop(path, None)
+                self._pages.pop(path, None)
+                if self.state_repository:
+                    self._unsaved[path] = files
+
+                self.stats.files += len(files)
+                for record in files:
+                    await found.put(record)
+            except asyncio.CancelledError:
+                raise
+            except YandexDiskUnavailableError as e:
+                # Цепь разомкнута: оставшиеся директории не запрашиваем, обход будет неполным
+                self.stats.errors += 1
+                self._pending.pop(path, None)
+                self._record_error(path, e)
+            except YandexDiskError as e:
+                self._pending.pop(path, None)
+                if e.status == 404 and self._is_hidden_child(path):
+                    # Поддиректорию взяли из прошлого обхода, а её уже нет: удаление увидит сверка,
+                    # до неё поддерево считается неизменным
+                    self.skipped.add(path)
+                    logger.debug(f"Поддиректория за водяной меткой не найдена (path={path})")
+                else:
+                    self.stats.errors += 1
+                    self._record_error(path, e)
+                    logger.error(f"Ошибка обхода директории (path={path}): {e}")
+            except Exception as e:
+                self.stats.errors += 1
+                self._pending.pop(path, None)
+                self._record_error(path, e)
+                logger.error(f"Ошибка обхода директории (path={path}): {e}")
+            finally:
+                pending.task_done()
+
+    def _record_error(self, path: str, error: Exception) -> None:
+        telemetry = self.telemetry.setdefault(path, DirectoryTelemetry(path=path))
+        telemetry.error = f"{type(error).__name__}: {error}"[:200]
+
+    def cycle_telemetry(self, top: int = 10) -> CrawlTelemetry:
+        """
+        Телеметрия обхода: сводка и top самых медленных, самых больших и упавших директорий
+
+        :param top: сколько директорий оставить в каждом списке
+        """
+        listed = list(self.telemetry.values())
+        return CrawlTelemetry(
+            started_at=self.stats.started_at,
+            duration=self.stats.duration,
+            full_resync=self.full_resync,
+            complete=self.complete,
+            directories=self.stats.directories,
+            requests=self.stats.requests,
+            errors=self.stats.errors,
+            retries=self.stats.retries,
+            throttled=self.stats.throttled,
+            bytes=sum(t.bytes for t in listed),
+            slowest=sorted(listed, key=lambda t: t.elapsed, reverse=True)[:top],
+            largest=sorted(listed, key=lambda t: t.items, reverse=True)[:top],
+            failed=[t for t in listed if t.error][:top],
+        )
+
+    @classmethod
+    def _depth(cls, path: str) -> int:
+        """Глубина директории: корень - 0"""
+        return 0 if path == cls.ROOT else path.count("/")
+
+    def _is_unchanged(self, path: str, modified: str | None) -> bool:
+        """Можно ли не обходить поддиректорию: её modified совпадает с прошлым обходом, и уровень не на очереди"""
+        if self.full_resync or not modified:
+            return False
+        state = self.previous.get(path)
+        if not (state and state.fingerprint and state.modified == modified):
+            return False
+        return self._tier_of(state) not in self.refresh_tiers
+
+    def _hidden_refresh_children(self, path: str, seen: list[str]) -> list[str]:
+        """Известные по прошлому обходу поддиректории уровней из refresh_tiers, не попавшие в неполный листинг"""
+        if not self.refresh_tiers:
+            return []
+        seen_set = set(seen)
+        return [
+            child
+            for child in self._previous_children.get(path, ())
+            if child not in seen_set
+            and self.previous[child].fingerprint
+            and self._tier_of(self.previous[child]) in self.refresh_tiers
+            and not self._is_pruned(child)
+        ]
+
+    def _is_hidden_child(self, path: str) -> bool:
+        """Директория известна по прошлому обходу, а листинг её родителя неполный"""
+        return path in self.previous and (path.rsplit("/", 1)[0] or self.ROOT) in self.partial
+
+    def _is_pruned(self, path: str) -> bool:
+        """Можно ли не обходить поддиректорию: её файлы никому не нужны, а прошлое состояние известно"""
+        if self.full_resync or self.demand is None:
+            return False
+        # Без прошлого состояния поддерево не перенести в directory_states: такое обходим
+        state = self.previous.get(path)
+        if not (state and state.fingerprint):
+            return False
+        return not self.demand.wants(path)
+
+    @staticmethod
+    def _tier_of(state: DirectoryState | None) -> CrawlTier:
+        """Уровень директории с прошлого обхода; новые и ещё не размеченные - HOT"""
+        return state.tier if state and state.tier else CrawlTier.HOT
+
+    def _classify(self, last_change: str | None, now: datetime) -> CrawlTier:
+        """Уровень по давности последнего изменения в поддереве"""
+        changed = parse_datetime(last_change)
+        if changed is None:
+            return CrawlTier.COLD
+        age = now - changed
+        if age < self.hot_age:
+            return CrawlTier.HOT
+        if age < self.warm_age:
+            return CrawlTier.WARM
+        return CrawlTier.COLD
+
+    @staticmethod
+    def _latest(*values: str | None) -> str | None:
+        """Самое свежее из значений modified"""
+        best, best_dt = None, None
+        for value in values:
+            dt = parse_datetime(value)
+            if dt and (best_dt is None or dt > best_dt):
+                best, best_dt = value, dt
+        return best
+
+    @classmethod
+    def _decode_items(cls, raw: bytes) -> list[dict]:
+        """Декодирует страницу листинга в компактные записи только с нужными полями"""
+        data = _json_loads(raw)
+        items = (data.get("_embedded") or {}).get("items") or []
+        fields = cls.ITEM_FIELDS
+        return [{k: item[k] for k in fields if k in item} for item in items]
+
+    @staticmethod
+    def _max_modified(items: list[dict], watermark: str | None = None) -> str | None:
+        """Новая водяная метка директории: самый свежий modified среди элементов"""
+        best, best_dt = watermark, parse_datetime(watermark)
+        for item in items:
+            dt = parse_datetime(item.get("modified"))
+            if dt and (best_dt is None or dt > best_dt):
+                best, best_dt = item.get("modified"), dt
+        return best
+
+    @staticmethod
+    def _listing_digest(items: list[dict]) -> str:
+        """Хэш листинга: имена, типы, modified и md5 дочерних элементов"""
+        h = sha1()
+        for item in sorted(items, key=lambda i: i.get("name") or ""):
+            h.update(f"{item.get('name')}\0{item.get('type')}\0{item.get('modified')}\0{item.get('md5')}\n".encode())
+        return h.hexdigest()
+
+    async def _fetch_directory(
+        self,
+        path: str,
+        watermark: str | None = None,
+        telemetry: DirectoryTelemetry | None = None,
+    ) -> tuple[list[dict], int, bool]:
+        """
+        Запрашивает содержимое одной директории (с пагинацией)
+
+        :param path: путь директории
+        :param watermark: водяная метка; если задана, элементы идут по убыванию modified,
+            и листинг обрывается на первом элементе старше метки
+        :param telemetry: метрики директории, дополняются по каждой странице
+        :return: элементы, число запросов и признак неполного листинга
+        """
+        all_items: list[dict] = []
+        offset = 0
+        watermark_dt = parse_datetime(watermark)
+        limit = self.INCREMENTAL_PAGE_LIMIT if watermark_dt else self.PAGE_LIMIT
+        pages = 0
+
+        seen_paths: set[str] | None = None
+        resume = self._pages.get(path)
+        if resume:
+            # Продолжаем листинг с перекрытием в страницу: удаления до смещения сдвигают элементы назад
+            all_items = list(resume.items)
+            seen_paths = {item.get("path") for item in all_items}
+            offset = max(0, resume.offset - limit)
+
+        telemetry = telemetry or DirectoryTelemetry(path=path)
+        while True:
+            pages += 1
+            started = time.monotonic()
+            try:
+                raw = await self.client.list_public_resources(
+                    self.public_root_url,
+                    None if path == self.ROOT else path,
+                    limit=limit,
+                    offset=offset,
+                    sort="-modified" if watermark_dt else None,
+                    fields=self.FIELDS_PARAM,
+                    stats=self.stats,
+                )
+            finally:
+                # Время считаем и для неудачных запросов: медленная директория часто ещё и падает
+                latency = time.monotonic() - started
+                telemetry.elapsed += latency
+                telemetry.max_latency = max(telemetry.max_latency, latency)
+            items = self._decode_items(raw)
+            telemetry.pages += 1
+            telemetry.items += len(items)
+            telemetry.bytes += len(raw)
+
+            if not items:
+                break
+
+            page_size = len(items)
+            if seen_paths is not None:
+                items = [item for item in items if item.get("path") not in seen_paths]
+
+            if watermark_dt:
+                # Элементы отсортированы по убыванию modified: всё, что старше метки, уже видели
+                for idx, item in enumerate(items):
+                    item_modified = parse_datetime(item.get("modified"))
+                    if item_modified and item_modified < watermark_dt:
+                        all_items.extend(items[:idx])
+                        return all_items, pages, True
+
+            # добавляем полученные элементы
+            all_items.extend(items)
+
+            # Если получили меньше чем limit, значит это последняя страница
+            if page_size < limit:
+                break
+
+            offset += limit
+            if self.state_repository:
+                self._pages[path] = FrontierPages.model_construct(path=path, offset=offset, items=all_items)
+
+        return all_items, pages, False
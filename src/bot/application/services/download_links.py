@@ -0,0 +1,54 @@
+import asyncio
+import time
+from typing import Iterable, Optional
+
+from bot.common.logs import logger
+from bot.domain.entities.notification import NotificationTask
+from bot.domain.services.download_links import DownloadLinkResolverInterface
+
+
+class DownloadLinkResolver(DownloadLinkResolverInterface):
+    """
+    Ссылки на скачивание по запросу, с кэшем в памяти
+
+    Временная ссылка Я.Диска запрашивается перед отправкой пакета уведомлений: одна на файл
+    для всех получателей и повторно не раньше, чем истечёт ttl. Неудачи тоже кэшируются
+    (на failure_ttl), чтобы удалённый файл не запрашивался для каждого получателя.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # ключ файла -> (ссылка или None, момент истечения по time.monotonic())
+        self._cache: dict[tuple[str, str], tuple[Optional[str], float]] = {}
+
+    async def resolve_many(self, tasks: Iterable[NotificationTask]) -> dict[tuple[str, str], Optional[str]]:
+        now = time.monotonic()
+        self._evict(now)
+
+        keys = {key for task in tasks for key in self.link_keys(task)}
+        missing = [key for key in keys if key not in self._cache]
+        if missing:
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def resolve(key: tuple[str, str]) -> None:
+                async with semaphore:
+                    self._cache[key] = await self._fetch(key)
+
+            await asyncio.gather(*(resolve(key) for key in missing))
+            logger.debug(f"🔗 Запрошено ссылок на скачивание: {len(missing)} (из кэша: {len(keys) - len(missing)})")
+
+        return {key: self._cache[key][0] for key in keys}
+
+    async def _fetch(self, key: tuple[str, str]) -> tuple[Optional[str], float]:
+        public_root_url, path = key
+        try:
+            href = await self.disk_client.get_public_download_link(public_root_url, path)
+        except Exception as e:
+            logger.warning(f"Не удалось получить ссылку на скачивание {path}: {e}")
+            return None, time.monotonic() + self.failure_ttl
+        return href, time.monotonic() + self.ttl
+
+    def _evict(self, now: float) -> None:
+        expired = [key for key, (_, expires_at) in self._cache.items() if expires_at <= now]
+        for key in expired:
+            del self._cache[key]
@@ -1,24 +1,31 @@
 import asyncio
-import json
+import time
+from contextlib import aclosing
 from datetime import datetime
-from hashlib import sha256
 
-import aiohttp
+from bot.application.services.crawler import YandexDiskCrawler
 from bot.common.logs import logger
-from bot.common.utils.path_parser import (
-    parse_datetime,
-    build_public_file_url,
-    extract_subject_from_path,
-    extract_topic_from_path,
-    extract_group_from_path,
-    extract_group_raw_from_path,
-    extract_teacher_from_filename,
-    extract_date_from_filename,
-    extract_date_from_path,
-)
+from bot.common.utils.batching import BatchPipeline
+from bot.common.utils.bundling import BundleHold
+from bot.common.utils.demand import CrawlDemand
+from bot.common.utils.disk_stats import TOTAL, DiskStatsDelta
+from bot.common.utils.manifest import ManifestDiff
+from bot.common.utils.path_classifier import classify_path
+from bot.common.utils.path_parser import parse_datetime, public_root_hash, build_public_file_url
+from bot.domain.entities.crawl import CrawlSnapshot
+from bot.domain.entities.lease import LeaderLease, WriteFence
+from bot.domain.entities.manifest import FileChange, FileRecord, ManifestEntry
+from bot.domain.entities.mappings import CrawlTier, FileChangeKind
 from bot.domain.entities.notification import NotificationTask
+from bot.domain.entities.spool import SpooledBatch
+from bot.domain.repositories.lease import LeadershipLostError
+from bot.domain.repositories.snapshot import SnapshotCorruptedError
+from bot.domain.repositories.spool import TaskSpoolRepositoryInterface
 from bot.domain.services.long_poll import LongPollServiceInterface
-from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+
+# Redis недоступен: обход продолжается, задачи и записи манифеста пишутся в очередь на диске
+REDIS_UNAVAILABLE = (RedisConnectionError, RedisTimeoutError)
 
 
 class YandexDiskPollingService(LongPollServiceInterface):
@@ -27,23 +34,35 @@ class YandexDiskPollingService(LongPollServiceInterface):
         if self._running:
             return
         self._running = True
+        self._lease_task = asyncio.create_task(self._lease_loop(), name="yadisk_poll_lease")
         self._task = asyncio.create_task(self._poll_loop(), name="yadisk_poll")
-        logger.info("✅ Опрос Яндекс.Диска запущен")
+        if self._spool:
+            self._spool_task = asyncio.create_task(self._spool_loop(), name="yadisk_poll_spool")
+        logger.info(f"✅ Опрос Яндекс.Диска запущен (экземпляр {self.instance_id})")
 
     async def stop(self):
-        """Остановить цикл опроса и дождаться завершения фоновой задачи."""
+        """Остановить цикл опроса, дождаться завершения фоновых задач и освободить аренду."""
         self._running = False
-        if hasattr(self, "_task") and self._task:
-            self._task.cancel()
+        for task in (self._task, self._spool_task, self._lease_task):
+            if not task:
+                continue
+            task.cancel()
             try:
-                await self._task
+                await task
             except asyncio.CancelledError:
                 pass
+        await self._release_lease()
         logger.info("🛑 Опрос Яндекс.Диска остановлен")
 
     async def _poll_loop(self):
         """Основной цикл опроса: собирает новые файлы и отправляет задания в очередь."""
         while self._running:
+            # Резервный экземпляр ждёт, пока не станет лидером
+            if not self._leadership.is_set():
+                await self._leadership.wait()
+                continue
+
+            new_files = 0
             try:
                 new_files = await self._check_for_new_files()
                 if new_files:
@@ -51,7 +70,195 @@ class YandexDiskPollingService(LongPollServiceInterface):
             except Exception as e:
                 logger.exception(f"Ошибка опроса: {e}")
 
-            await asyncio.sleep(self.poll_interval)
+            # Интервал подстраивается под частоту изменений; пока предохранитель клиента разомкнут, диск не опрашиваем
+            interval = self.poll_schedule.next(new_files)
+            logger.debug(f"⏳ Следующий опрос через {interval:.0f} с ({self.poll_schedule.reason})")
+            await asyncio.sleep(max(interval, self.disk_client.retry_in))
+
+    async def _lease_loop(self):
+        """Фоновый захват и продление аренды лидерства."""
+        renewed_at = 0.0
+        while self._running:
+            attempt_at = time.monotonic()
+            try:
+                if self.lease and not await self.lease_repository.renew(self.LEASE_NAME, self.lease, self.leader_lease_ttl):
+                    logger.warning(f"👋 Аренда лидерства потеряна (токен {self.lease.token}), экземпляр в резерве")
+                    self._set_lease(None)
+                elif self.lease:
+                    renewed_at = attempt_at
+                else:
+                    lease = await self.lease_repository.acquire(self.LEASE_NAME, self.instance_id, self.leader_lease_ttl)
+                    if lease:
+                        renewed_at = attempt_at
+                        logger.info(f"👑 Экземпляр {self.instance_id} стал лидером опроса (токен {lease.token})")
+                        self._set_lease(lease)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка аренды лидерства: {e}")
+                # Без связи с Redis продлить аренду нельзя: к её истечению считаем себя резервом
+                if self.lease and time.monotonic() - renewed_at >= self.leader_lease_ttl - self.lease_renew_interval:
+                    logger.warning(f"👋 Аренда лидерства истекает без продления (токен {self.lease.token})")
+                    self._set_lease(None)
+            await asyncio.sleep(self.lease_renew_interval)
+
+    async def _spool_loop(self):
+        """Фоновая досылка задач из очереди на диске, когда Redis снова доступен."""
+        while self._running:
+            # Пакеты пишут и манифест, поэтому их досылает только лидер
+            if self._leadership.is_set():
+                await self._replay_spool()
+            await asyncio.sleep(self.spool_replay_interval)
+
+    @property
+    def _spool(self) -> TaskSpoolRepositoryInterface | None:
+        """Очередь задач на диске, если она включена"""
+        return self.task_spool if self.task_spool and self.task_spool.enabled else None
+
+    async def _replay_spool(self) -> None:
+        """Дослать пакеты из очереди на диске по порядку; ошибка оставляет их до следующей попытки"""
+        if not self._spool:
+            return
+        try:
+            replayed = await self._spool.replay(self._replay_batch)
+        except LeadershipLostError as e:
+            logger.warning(f"📮 Досылка задач с диска остановлена: {e}")
+            return
+        except Exception as e:
+            logger.error(f"Не удалось дослать задачи с диска: {e}")
+            return
+        if replayed:
+            logger.info(f"📮 Досланы пакеты задач с диска: {replayed}")
+
+    async def _replay_batch(self, batch: SpooledBatch) -> None:
+        """Пакет с диска - в очередь задач, затем его записи - в манифест; устаревший пакет отбрасывается"""
+        fence = await self._ensure_leader()
+        if not self._is_current(batch, fence):
+            # Пока пакет лежал на диске, лидером был другой экземпляр: его записи манифеста новее.
+            # Записей пакета в манифесте нет, поэтому его файлы найдутся снова
+            logger.warning(
+                f"📮 Пакет из {len(batch.tasks)} задач ({batch.public_root_url}) сохранён под токеном "
+                f"{batch.token}, после него лидировал другой экземпляр: пакет отброшен"
+            )
+            return
+        if batch.tasks:
+            await self.notification_service.enqueue_many(batch.tasks, fence)
+        if batch.entries:
+            await self.manifest_repository.upsert_many(batch.public_root_url, batch.entries, fence)
+
+    def _is_current(self, batch: SpooledBatch, fence: WriteFence) -> bool:
+        """
+        Не было ли другого лидера между сохранением пакета и текущей арендой
+
+        Токены аренды выдаются подряд, поэтому другого лидера не было, если все токены после
+        токена пакета до текущего - аренды этого экземпляра.
+        """
+        if batch.token is None or batch.token > fence.token:
+            return False
+        return all(token in self._lease_tokens for token in range(batch.token + 1, fence.token + 1))
+
+    async def _enqueue(
+        self, public_root_url: str, tasks: list[NotificationTask], entries: list[ManifestEntry], fence: WriteFence
+    ) -> bool:
+        """
+        Поставить задачи в очередь Redis, а если Redis их не принял - в очередь на диске
+
+        :param entries: записи манифеста пакета: при досылке с диска пишутся после задач
+        :param fence: ограждение записи действующего лидера
+        :return: True - пакет сохранён на диск, его записи манифеста запишет досылка
+
+        :raise: LeadershipLostError: аренду перехватили - задачи не пишутся ни в Redis, ни на диск
+        :raise: Exception: Redis не принял задачи, а очереди на диске нет или запись в неё не удалась
+        """
+        spool = self._spool
+        # Пока на диске есть недосланные пакеты, новые встают за ними, чтобы задачи уходили по порядку
+        if spool and await spool.pending():
+            await spool.append(SpooledBatch(public_root_url, tasks, entries, fence.token))
+            logger.debug(f"📮 Пакет из {len(tasks)} задач поставлен на диск за недосланными")
+            return True
+        if not tasks:
+            return False
+        try:
+            await self.notification_service.enqueue_many(tasks, fence)
+        except LeadershipLostError:
+            raise
+        except Exception as e:
+            if not spool:
+                raise
+            await spool.append(SpooledBatch(public_root_url, tasks, entries, fence.token))
+            logger.warning(f"📮 Redis не принял {len(tasks)} задач ({e}), пакет сохранён на диск")
+            return True
+        return False
+
+    async def _upsert_manifest(self, public_root_url: str, entries: list[ManifestEntry], fence: WriteFence) -> bool:
+        """
+        Записать записи манифеста пакета, задачи которого уже в Redis; если Redis их не принял - на диск
+
+        :return: True - записи сохранены на диск, их запишет досылка
+        :raise: Exception: Redis не принял записи, а очереди на диске нет или запись в неё не удалась
+        """
+        try:
+            await self.manifest_repository.upsert_many(public_root_url, entries, fence)
+        except LeadershipLostError:
+            raise
+        except Exception as e:
+            spool = self._spool
+            if not spool:
+                raise
+            await spool.append(SpooledBatch(public_root_url, [], entries, fence.token))
+            logger.warning(f"📮 Redis не принял {len(entries)} записей манифеста ({e}), они сохранены на диск")
+            return True
+        return False
+
+    def _set_lease(self, lease: LeaderLease | None) -> None:
+        self.lease = lease
+        if lease:
+            self._lease_tokens.add(lease.token)
+            self._leadership.set()
+        else:
+            # Придержанные задачи найдёт новый лидер: их записей нет в манифесте
+            for hold in self._bundle_holds.values():
+                hold.clear()
+            self._leadership.clear()
+
+    async def _release_lease(self) -> None:
+        """Освободить аренду при остановке, чтобы резерв перехватил её без ожидания TTL."""
+        lease, self.lease = self.lease, None
+        self._leadership.clear()
+        if not lease:
+            return
+        try:
+            await self.lease_repository.release(self.LEASE_NAME, lease)
+            logger.info(f"👋 Аренда лидерства освобождена (токен {lease.token})")
+        except Exception as e:
+            logger.error(f"Не удалось освободить аренду лидерства: {e}")
+
+    async def _ensure_leader(self) -> WriteFence:
+        """
+        Ограждение записи: результаты обхода сохраняет только действующий лидер
+
+        Задачи очереди и записи манифеста проверяют возвращённый токен в самой записи (Lua),
+        остальные записи цикла защищены только этой проверкой перед ними. Если Redis недоступен,
+        ограждение выдаётся по локальной аренде: такие записи попадут только в очередь на диске.
+
+        :return: ограждение для записей, проверяющих токен в Redis
+        :raise: LeadershipLostError: если аренда истекла или её токен уже перехвачен
+        """
+        lease = self.lease
+        try:
+            held = lease is not None and await self.lease_repository.is_held(self.LEASE_NAME, lease)
+        except REDIS_UNAVAILABLE as e:
+            # Без Redis аренду не проверить: пока она не истекла по локальным часам (см. _lease_loop),
+            # пишем только в очередь на диске - пакеты помечены токеном и отбросятся, если лидер сменится
+            if self.lease is lease:
+                logger.debug(f"Аренда лидерства не проверена ({e}), запись идёт по локальной аренде")
+                return self.lease_repository.fence(self.LEASE_NAME, lease)
+            raise LeadershipLostError(f"аренда лидерства (токен {lease.token}) больше не действует") from e
+        if held:
+            return self.lease_repository.fence(self.LEASE_NAME, lease)
+        if lease and self.lease is lease:
+            self._set_lease(None)
+        raise LeadershipLostError(f"аренда лидерства (токен {lease.token if lease else '—'}) больше не действует")
 
     async def _safe_redis_get(self, key: str) -> str | bytes | None:
         try:
@@ -67,159 +274,416 @@ class YandexDiskPollingService(LongPollServiceInterface):
             logger.error(f"Redis недоступен при SET {key}: {e}")
 
     async def _check_for_new_files(self) -> int:
-        """Проверяет диск и добавляет новые файлы в очередь. Возвращает количество новых задач."""
-        # Читаем чекпоинт - время последней проверки
-        checkpoint_key = self._get_checkpoint_key()
-        last_check = await self._safe_redis_get(checkpoint_key)
-        last_check_dt = parse_datetime(last_check)
+        """Проверяет все корневые папки параллельно. Возвращает общее количество новых файлов."""
+        # Раз в full_resync_every циклов обход полный (сверка): без пропуска поддеревьев
+        # и с полными листингами директорий, только так видны удаления
+        # (счёт циклов с единицы: после перезапуска состояние есть в Redis или в снимке,
+        # а без него обходчик и так обойдёт всё дерево)
+        full_resync = self.full_resync_every <= 1 or self._cycles % self.full_resync_every == 0
+        # Горячие поддеревья листаются каждый цикл, тёплые - раз в warm_every циклов
+        # (вместе с полной сверкой горячих), холодные - только при полном обходе
+        warm_due = self.warm_every <= 1 or self._cycles % self.warm_every == 0
+        refresh_tiers = {CrawlTier.HOT} | ({CrawlTier.WARM} if warm_due else set())
+        reconcile_tiers = {CrawlTier.HOT, CrawlTier.WARM} if warm_due else set()
+        self._cycles += 1
+        # Задачи прошлых циклов, сохранённые на диск, уходят в очередь до обхода:
+        # их записи манифеста должны попасть в Redis раньше, чем обход сравнит с ним диск
+        await self._replay_spool()
+        # Предметы и группы без подписчиков не листаем; полный обход идёт по всему дереву,
+        # поэтому их файлы и статистика обновляются раз в full_resync_every циклов
+        demand = None if full_resync else await self._load_demand()
+
+        # Бюджет параллельности делится поровну, чтобы большой корень не вытеснял остальные
+        budget = max(1, self.crawl_concurrency // len(self.public_root_urls))
+
+        results = await asyncio.gather(
+            *(
+                self._check_root(
+                    url,
+                    concurrency=budget,
+                    full_resync=full_resync,
+                    refresh_tiers=refresh_tiers,
+                    reconcile_tiers=reconcile_tiers,
+                    demand=demand,
+                )
+                for url in self.public_root_urls
+            ),
+            return_exceptions=True,
+        )
 
-        # Запоминаем время начала текущего обхода (без timezone)
-        current_check_dt = datetime.now()
+        total = 0
+        for url, result in zip(self.public_root_urls, results):
+            if isinstance(result, LeadershipLostError):
+                logger.warning(f"👋 Результаты обхода {url} отброшены: {result}")
+                continue
+            if isinstance(result, BaseException):
+                logger.error(f"Ошибка опроса корня {url}: {result!r}")
+                continue
+            total += result
+        return total
 
-        if last_check_dt:
-            logger.info(f"🕒 Последняя проверка: {last_check_dt.isoformat()}")
-        else:
-            logger.info("🆕 Первый запуск, чекпоинта нет")
-
-        # Собираем новые файлы и параллельно считаем статистику по группам
-        new_tasks = []
-        group_counts: dict[str, int] = {}
-        common_count = 0
-
-        async for file_dict in self._fetch_all_files():
-            file_modified = parse_datetime(file_dict.get("modified"))
-
-            # Подсчёт для статистики
-            path = file_dict.get("path", "")
-            g = extract_group_from_path(path)
-            if g:
-                group_name: str = str(g)  # StrEnum -> str
-                group_counts[group_name] = group_counts.get(group_name, 0) + 1
-            else:
-                common_count += 1
+    async def _load_snapshot(self, public_root_url: str) -> CrawlSnapshot | None:
+        """
+        Загрузить снимок с диска
 
-            # Пропускаем старые файлы (модифицированные до последней проверки)
-            if last_check_dt and file_modified and file_modified <= last_check_dt:
-                continue
+        :return: снимок или None, если его нет, он устарел или повреждён
+        """
+        if not self.snapshot_repository or not self.snapshot_repository.enabled:
+            return None
+        try:
+            return await self.snapshot_repository.load(public_root_url)
+        except SnapshotCorruptedError as e:
+            logger.warning(f"📦 Снимок обхода {public_root_url} повреждён: {e}")
+        except Exception as e:
+            logger.error(f"Не удалось прочитать снимок обхода {public_root_url}: {e}")
+        return None
 
-            # Создаём задачу на уведомление
-            task = self._create_notification_task(file_dict)
-            new_tasks.append(task)
+    async def _restore_snapshot(self, public_root_url: str) -> CrawlSnapshot | None:
+        """
+        Загрузить снимок с диска и перенести его в Redis
 
-        # Сохраняем задачи в очередь и обновляем чекпоинт
-        if new_tasks:
-            try:
-                await self.notification_service.enqueue_many(new_tasks)
-            except Exception as e:
-                logger.error(f"Не удалось поставить задачи в очередь: {e}")
-            await self._safe_redis_set(checkpoint_key, current_check_dt.isoformat())
-            logger.info(f"✅ Чекпоинт обновлен: {current_check_dt.isoformat()}")
-        elif last_check_dt:
-            # Даже если файлов нет, обновляем чекпоинт
-            await self._safe_redis_set(checkpoint_key, current_check_dt.isoformat())
-            logger.debug("⏭️ Новых файлов нет, чекпоинт обновлен")
+        :return: снимок или None, если его нет, он устарел или повреждён - тогда обход полный
+        """
+        snapshot = await self._load_snapshot(public_root_url)
+        if not snapshot:
+            return None
+
+        # Манифест и отпечатки пишем в Redis до обхода: иначе неполный обход оставил бы
+        # в Redis только изменения, и следующий цикл счёл бы остальные файлы новыми
+        fence = await self._ensure_leader()
+        await self.manifest_repository.upsert_many(public_root_url, list(snapshot.manifest.values()), fence)
+        await self.crawl_state_repository.save_directories(public_root_url, snapshot.directories)
+        if snapshot.checkpoint:
+            await self._safe_redis_set(self._get_checkpoint_key(public_root_url), snapshot.checkpoint.isoformat())
+        logger.info(
+            f"📦 Обход {public_root_url} продолжен со снимка от {snapshot.saved_at.isoformat()}: "
+            f"файлов {len(snapshot.manifest)}, директорий {len(snapshot.directories)}"
+        )
+        return snapshot
 
-        # Обновляем кэш статистики по группам (5 минут)
+    async def _save_snapshot(self, snapshot: CrawlSnapshot) -> None:
+        """Сохранить снимок полного обхода на диск; ошибка записи обход не прерывает"""
+        if not self.snapshot_repository or not self.snapshot_repository.enabled:
+            return
         try:
-            await self._save_group_counts_cache(group_counts, common_count, ttl=300)
+            await self.snapshot_repository.save(snapshot)
         except Exception as e:
-            logger.debug(f"Не удалось обновить кэш статистики групп: {e}")
-
-        return len(new_tasks)
-
-    async def _fetch_all_files(self):
-        """Получает все файлы с диска (обходит директории рекурсивно)."""
-        # Используем стек для обхода в ширину
-        dirs_to_scan = [""]  # Начинаем с корня
-
-        while dirs_to_scan:
-            current_path = dirs_to_scan.pop(0)
-
-            # Запрашиваем содержимое директории
-            items = await self._fetch_directory(current_path)
-
-            for item in items:
-                if item.get("type") == "file":
-                    yield item
-                elif item.get("type") == "dir":
-                    # Добавляем поддиректорию в очередь на обход
-                    dirs_to_scan.append(item.get("path"))
-
-    async def _fetch_directory(self, path: str) -> list[dict]:
-        """Запрашивает содержимое одной директории (с пагинацией)."""
-        all_items: list[dict] = []
-        offset = 0
-        limit = 200
-
-        while True:
-            params = {
-                "public_key": self.public_root_url,
-                "limit": limit,
-                "offset": offset,
-            }
-            if path:
-                params["path"] = path
+            logger.error(f"Не удалось сохранить снимок обхода {snapshot.public_root_url}: {e}")
 
-            try:
-                timeout = aiohttp.ClientTimeout(total=self.http_timeout)
-                url = "https://cloud-api.yandex.net/v1/disk/public/resources"
+    async def _save_telemetry(self, public_root_url: str, crawler: YandexDiskCrawler) -> None:
+        """Сохранить телеметрию цикла обхода; ошибка записи обход не прерывает"""
+        try:
+            await self.crawl_state_repository.save_telemetry(
+                public_root_url,
+                crawler.cycle_telemetry(top=self.crawl_telemetry_top),
+                keep=self.crawl_telemetry_cycles,
+            )
+        except Exception as e:
+            logger.error(f"Не удалось сохранить телеметрию обхода {public_root_url}: {e}")
+
+    async def _apply_disk_stats(self, public_root_url: str, delta: DiskStatsDelta) -> None:
+        """Прибавить изменения к статистике диска; ошибку исправит пересчёт при следующей сверке"""
+        if not delta:
+            return
+        try:
+            await self.statistics_repository.apply_disk_delta(public_root_url, delta.files, delta.bytes)
+        except Exception as e:
+            logger.error(f"Не удалось обновить статистику диска {public_root_url}: {e}")
+
+    async def _rebuild_disk_stats(self, public_root_url: str, manifest: dict[str, ManifestEntry], force: bool) -> None:
+        """Пересчитать статистику диска по манифесту, если это сверка или статистики ещё нет"""
+        try:
+            if not force and await self.statistics_repository.has_disk_stats(public_root_url):
+                return
+            stats = DiskStatsDelta.from_entries(manifest.values())
+            await self.statistics_repository.replace_disk_stats(public_root_url, stats.files, stats.bytes)
+            logger.info(f"📊 Статистика диска {public_root_url} пересчитана: файлов {stats.files.get(TOTAL, 0)}")
+        except Exception as e:
+            logger.error(f"Не удалось пересчитать статистику диска {public_root_url}: {e}")
+
+    async def _cancel_pending(self, file_ids: list[str], reason: str) -> None:
+        """Отменить ожидающие уведомления о файлах; ошибка обход не прерывает"""
+        if not file_ids:
+            return
+        try:
+            await self.notification_service.cancel_pending(file_ids, reason)
+        except Exception as e:
+            logger.error(f"Не удалось отменить уведомления о {len(file_ids)} файлах: {e}")
+
+    async def _move_pending(self, moves: dict[str, NotificationTask]) -> None:
+        """Переписать ожидающие уведомления на новое расположение файлов; ошибка обход не прерывает"""
+        if not moves:
+            return
+        try:
+            await self.notification_service.move_pending(moves)
+        except Exception as e:
+            logger.error(f"Не удалось переписать уведомления о {len(moves)} перемещённых файлах: {e}")
+
+    async def _spooled_entries(self, public_root_url: str) -> dict[str, ManifestEntry]:
+        """Записи манифеста из недосланных пакетов; ошибка чтения - пустой результат"""
+        if not self._spool:
+            return {}
+        try:
+            return await self._spool.entries(public_root_url)
+        except Exception as e:
+            logger.error(f"Не удалось прочитать очередь задач на диске для {public_root_url}: {e}")
+            return {}
+
+    async def _load_demand(self) -> CrawlDemand | None:
+        """Спрос по текущим пользователям; None - отсечение выключено или пользователей не прочитать"""
+        if not self.crawl_prune_unsubscribed:
+            return None
+        try:
+            users = await self.user_service.list_all_users()
+        except Exception as e:
+            # Без списка пользователей безопаснее обойти всё дерево
+            logger.error(f"Не удалось загрузить пользователей для отсечения обхода: {e}")
+            return None
+        self.last_demand = CrawlDemand.from_users(users)
+        logger.debug(f"🎯 Спрос на обход: {self.last_demand!r}")
+        return self.last_demand
+
+    async def _check_root(
+        self,
+        public_root_url: str,
+        *,
+        concurrency: int,
+        full_resync: bool,
+        refresh_tiers: set[CrawlTier] | None = None,
+        reconcile_tiers: set[CrawlTier] | None = None,
+        demand: CrawlDemand | None = None,
+    ) -> int:
+        """Проверяет одну корневую папку и добавляет новые файлы в очередь. Возвращает количество новых файлов."""
+        # Чекпоинт - время последней проверки (для /status и миграции на манифест)
+        checkpoint_key = self._get_checkpoint_key(public_root_url)
+        last_check = await self._safe_redis_get(checkpoint_key)
+        last_check_dt = parse_datetime(last_check)
 
-                async with self.http.get(url, params=params, timeout=timeout) as resp:
-                    resp.raise_for_status()
-                    data = await resp.json()
-                    items = data.get("_embedded", {}).get("items", [])
+        # Запоминаем время начала текущего обхода (без timezone)
+        current_check_dt = datetime.now()
 
-                    if not items:
-                        break
+        # Манифест прошлого обхода. Ошибку чтения не глушим: пустой манифест означал бы
+        # повторную рассылку по всему диску. Без Redis сравниваем со снимком на диске, и задачи
+        # идут только в очередь на диске
+        offline = False
+        try:
+            previous = await self.manifest_repository.load(public_root_url)
+            directories = await self.crawl_state_repository.load_directories(public_root_url)
+        except REDIS_UNAVAILABLE as e:
+            snapshot = await self._load_snapshot(public_root_url) if self._spool else None
+            if not snapshot:
+                raise
+            logger.warning(
+                f"📮 Redis недоступен ({e}): обход {public_root_url} сравнивается со снимком "
+                f"от {snapshot.saved_at.isoformat()}, задачи сохраняются на диск"
+            )
+            previous, directories, offline = snapshot.manifest, snapshot.directories, True
 
-                    # добавляем полученные элементы
-                    all_items.extend(items)
+        # Redis пуст (первый запуск или сброс): стартуем со снимка на диске, если он есть
+        if not offline and not previous and not directories:
+            snapshot = await self._restore_snapshot(public_root_url)
+            if snapshot:
+                previous, directories = snapshot.manifest, snapshot.directories
+                last_check_dt = snapshot.checkpoint or last_check_dt
 
-                    # Если получили меньше чем limit, значит это последняя страница
-                    if len(items) < limit:
-                        break
+        # Файлы недосланных пакетов уже сохранены на диск: второй раз в очередь они не встают
+        previous.update(await self._spooled_entries(public_root_url))
 
-                    offset += limit
-                    await asyncio.sleep(0.1)  # Небольшая пауза между запросами
+        if previous:
+            logger.info(f"🗂️ В манифесте {public_root_url}: {len(previous)} файлов")
+        elif last_check_dt:
+            logger.info(f"🗂️ Манифест пуст, файлы до чекпоинта {last_check_dt.isoformat()} будут добавлены без уведомлений")
+        else:
+            logger.info(f"🆕 Первый запуск для {public_root_url}, манифеста нет")
+
+        diff = ManifestDiff(previous, seed_before=None if previous else last_check_dt)
+        crawler = YandexDiskCrawler(
+            client=self.disk_client,
+            public_root_url=public_root_url,
+            concurrency=concurrency,
+            directories=directories,
+            full_resync=full_resync,
+            state_repository=self.crawl_state_repository,
+            checkpoint_interval=self.crawl_checkpoint_interval,
+            frontier_max_age=self.crawl_frontier_max_age,
+            refresh_tiers=refresh_tiers,
+            reconcile_tiers=reconcile_tiers,
+            hot_days=self.crawl_hot_days,
+            warm_days=self.crawl_warm_days,
+            demand=demand,
+        )
 
+        new_files = 0
+        enqueued = True
+        spooled = False
+        added_by_md5: dict[str, NotificationTask] = {}
+
+        async def flush(batch: list[tuple[FileChange, NotificationTask | None]]) -> None:
+            """Пакет задач - в очередь, затем его записи - в манифест и изменения - в статистику диска"""
+            nonlocal enqueued, spooled
+            # Пока шёл обход, аренду мог перехватить другой экземпляр: тогда ничего не пишем
+            fence = await self._ensure_leader()
+            # Задача при notify=False - новое расположение перемещённого файла: ею переписываются
+            # ожидающие уведомления, в очередь она не идёт
+            tasks = [task for change, task in batch if task and change.notify]
+            moves = {change.previous.resource_id: task for change, task in batch if task and not change.notify}
+            # Файл перезалит с новым содержимым: прежние ожидающие уведомления отменяем до постановки новых
+            replaced = [
+                change.previous.resource_id
+                for change, _ in batch
+                if change.kind == FileChangeKind.CHANGED and change.notify
+            ]
+            await self._cancel_pending(replaced, "файл заменён")
+            entries = [change.entry for change, _ in batch]
+            try:
+                to_disk = await self._enqueue(public_root_url, tasks, entries, fence)
+            except LeadershipLostError:
+                raise
             except Exception as e:
-                logger.error(f"Ошибка запроса к Яндекс.Диску (path={path}): {e}")
-                break
+                # Задачи не сохранены ни в Redis, ни на диске: записи пакета не попадут
+                # в манифест, и файлы найдутся снова в следующем цикле
+                enqueued = False
+                logger.error(f"Не удалось поставить задачи в очередь: {e}")
+                return
+            # Пакет на диске: его записи манифеста запишет досылка после задач
+            if not to_disk:
+                to_disk = await self._upsert_manifest(public_root_url, entries, fence)
+            spooled = spooled or to_disk
+            await self._apply_disk_stats(public_root_url, DiskStatsDelta().extend(change for change, _ in batch))
+            await self._move_pending(moves)
+
+        # Файлы одной загрузки (папка, предмет, группа, дата) уходят одной задачей-пакетом: их задачи
+        # придерживаются между пакетами записи и циклами, пока загрузка продолжается
+        hold = self._bundle_holds.setdefault(public_root_url, BundleHold(self.bundle_window, self.bundle_max_files))
+
+        # Задачи пишутся пакетами прямо во время обхода; если запись отстаёт, обход ждёт
+        pipeline = BatchPipeline(flush, batch_size=self.enqueue_batch_size, flush_interval=self.enqueue_flush_interval)
+        try:
+            async with pipeline, aclosing(crawler.iter_files()) as files:
+                async for record in files:
+                    change = diff.observe(record)
+                    if change is None:
+                        continue
+
+                    # Уведомляем только о реально добавленных или изменённых файлах; для перемещённого
+                    # файла задача нужна, чтобы переписать уже запланированные уведомления
+                    task = None
+                    if change.notify or change.moved:
+                        task = self._create_notification_task(record, public_root_url)
+                    # Новые файлы по md5: удалённый файл мог быть перезалит в другое место
+                    if previous and task and change.kind == FileChangeKind.ADDED and change.entry.md5:
+                        added_by_md5[change.entry.md5] = task
+                    if task and change.notify and task not in hold:
+                        new_files += 1
+                    if change.notify and hold.accepts(task):
+                        for item in hold.add((change, task)):
+                            await pipeline.put(item)
+                        continue
+                    await pipeline.put((change, task))
+                # Загрузки, которые bundle_window секунд не пополнялись, уходят пакетами
+                released = hold.release()
+                if released:
+                    logger.debug(f"📦 Отданы придержанные файлы загрузок: {len(released)}, ждут ещё {len(hold)}")
+                for item in released:
+                    await pipeline.put(item)
+        finally:
+            self.last_crawl_stats[public_root_url] = crawler.stats
+
+        await self._save_telemetry(public_root_url, crawler)
+
+        # Всё записанное попало в Redis (а не в очередь на диске): только тогда пишем удаления
+        # и отпечатки, иначе они обогнали бы недосланные записи манифеста
+        saved = enqueued and not spooled and not offline
+        # Удалённые файлы считаем только по полному обходу, иначе ошибки сети выглядят как удаление
+        removed = diff.removed(crawler.untouched) if crawler.complete and saved else []
+        await self._ensure_leader()
+        if removed:
+            await self.manifest_repository.delete_many(public_root_url, [c.entry.resource_id for c in removed])
+            await self._apply_disk_stats(public_root_url, DiskStatsDelta().extend(removed))
+            logger.info(f"🗑️ Удалено с диска ({public_root_url}): {len(removed)}")
+            # Ожидающие уведомления об удалённых файлах: перезалитые в другое место (тот же md5)
+            # переписываем на новый файл, остальные отменяем, чтобы не отправлять мёртвые ссылки
+            moves: dict[str, NotificationTask] = {}
+            gone: list[str] = []
+            for change in removed:
+                task = added_by_md5.get(change.entry.md5) if change.entry.md5 else None
+                if task:
+                    moves[change.entry.resource_id] = task
+                else:
+                    gone.append(change.entry.resource_id)
+            await self._move_pending(moves)
+            await self._cancel_pending(gone, "файл удалён с диска")
+
+        # Отпечатки директорий сохраняем только по полному обходу и принятым Redis задачам,
+        # иначе изменения в пропускаемых поддеревьях потеряются
+        if crawler.complete and saved:
+            states = crawler.directory_states()
+            manifest = diff.current(removed)
+            # Записи придержанных файлов ещё не в Redis: снимок повторяет манифест в Redis
+            for file_id in hold.file_ids():
+                if file_id in diff.previous:
+                    manifest[file_id] = diff.previous[file_id]
+                else:
+                    manifest.pop(file_id, None)
+            await self.crawl_state_repository.save_directories(public_root_url, states)
+            await self._save_snapshot(
+                CrawlSnapshot(
+                    public_root_url=public_root_url,
+                    checkpoint=current_check_dt,
+                    manifest=manifest,
+                    directories=states,
+                )
+            )
+            # Статистика диска ведётся по изменениям; при сверке (и если её ещё нет) пересчитываем
+            # по всему манифесту, чтобы не накапливалось расхождение после сбоев записи
+            await self._rebuild_disk_stats(public_root_url, manifest, force=crawler.full_resync)
 
-        return all_items
+        # Чекпоинт двигаем только после полного обхода, все задачи которого сохранены
+        if crawler.complete and saved:
+            await self._safe_redis_set(checkpoint_key, current_check_dt.isoformat())
+            logger.debug(f"✅ Чекпоинт обновлен: {current_check_dt.isoformat()}")
+        elif crawler.complete and enqueued:
+            logger.warning(
+                f"📮 Задачи обхода {public_root_url} сохранены на диск: удаления, отпечатки директорий "
+                "и чекпоинт сохранятся в цикле после досылки"
+            )
+        elif crawler.complete:
+            logger.warning(
+                f"⚠️ Часть задач обхода {public_root_url} не сохранена: "
+                "отпечатки директорий и чекпоинт не сохранены, файлы найдутся снова"
+            )
+        else:
+            logger.warning(
+                f"⚠️ Обход {public_root_url} неполный (ошибок: {crawler.stats.errors}): "
+                "удаления, отпечатки директорий и чекпоинт не сохранены"
+            )
+
+        # Результаты сохранены: прерванного обхода больше нет, следующий начнётся заново
+        if crawler.finished:
+            await crawler.discard_frontier()
+
+        return new_files
 
-    def _create_notification_task(self, file_dict: dict) -> NotificationTask:
+    def _create_notification_task(self, record: FileRecord, public_root_url: str) -> NotificationTask:
         """Создаёт задачу на уведомление из данных файла."""
-        path = file_dict.get("path", "")
-        file_name = file_dict.get("name", "")
-        subject_code = extract_subject_from_path(path)
-        study_group = extract_group_from_path(path)
-        group_raw = extract_group_raw_from_path(path)
-        topic = extract_topic_from_path(path)
+        path = record.path
+        file_name = record.name
+        # Предмет, группа, тема, преподаватель и дата - за один разбор пути (папки - из кэша)
+        info = classify_path(path)
 
         # Формируем прямую ссылку на просмотр файла на Яндекс.Диске
-        public_url = build_public_file_url(path, self.public_root_url)
-
-        # Парсим метаданные из названия файла/пути
-        teacher = extract_teacher_from_filename(file_name)
+        public_url = build_public_file_url(path, public_root_url)
 
         # Источник даты по приоритету: имя файла -> путь -> created -> modified
-        lesson_date_source = None
-        lesson_date = extract_date_from_filename(file_name)
-        if lesson_date:
-            lesson_date_source = "filename"
-        else:
-            lesson_date = extract_date_from_path(path)
+        lesson_date, lesson_date_source = info.lesson_date, info.lesson_date_source
+        if not lesson_date:
+            lesson_date = parse_datetime(record.created)
             if lesson_date:
-                lesson_date_source = "path"
+                lesson_date_source = "created"
             else:
-                lesson_date = parse_datetime(file_dict.get("created"))
+                lesson_date = parse_datetime(record.modified)
                 if lesson_date:
-                    lesson_date_source = "created"
-                else:
-                    lesson_date = parse_datetime(file_dict.get("modified"))
-                    if lesson_date:
-                        lesson_date_source = "modified"
+                    lesson_date_source = "modified"
 
         if lesson_date_source:
             logger.debug(
@@ -233,37 +697,24 @@ class YandexDiskPollingService(LongPollServiceInterface):
             logger.debug("📅 lesson_date not found in filename/path/created/modified for '%s'", file_name)
 
         return NotificationTask(
-            subject_code=subject_code,
+            subject_code=info.subject,
             subject_title=None,
-            topic=topic,
-            study_group=study_group,
-            group_raw=group_raw,
-            teacher=teacher,
+            topic=info.topic,
+            study_group=info.group,
+            group_raw=info.group_raw,
+            teacher=info.teacher,
             lesson_date=lesson_date,
             file_name=file_name,
             file_path=path,
             public_url=public_url,
-            download_url=file_dict.get("file"),  # Временная ссылка для скачивания
-            md5=file_dict.get("md5"),
-            resource_id=file_dict.get("resource_id"),
-            modified_iso=file_dict.get("modified"),
+            public_root_url=public_root_url,
+            md5=record.md5,
+            resource_id=record.resource_id,
+            modified_iso=record.modified,
         )
 
-    def _get_checkpoint_key(self) -> str:
-        """Генерирует ключ Redis для хранения чекпоинта."""
-        url_hash = sha256(self.public_root_url.encode()).hexdigest()[:12]
+    def _get_checkpoint_key(self, public_root_url: str | None = None) -> str:
+        """Генерирует ключ Redis для хранения чекпоинта корневой папки."""
+        url_hash = public_root_hash(public_root_url or self.public_root_url)
         base = f"checkpoint:{url_hash}"
         return f"{self.key_prefix}:{base}" if getattr(self, 'key_prefix', None) else base
-
-    def _group_counts_cache_key(self) -> str:
-        url_hash = sha256(self.public_root_url.encode()).hexdigest()[:12]
-        base = f"stats:group_counts:{url_hash}"
-        return f"{self.key_prefix}:{base}" if getattr(self, 'key_prefix', None) else base
-
-    async def _save_group_counts_cache(self, groups: dict[str, int], common: int, ttl: int = 300) -> None:
-        payload = {
-            "groups": groups,
-            "common": common,
-            "computed_at": datetime.now().isoformat(),
-        }
-        await self._safe_redis_set(self._group_counts_cache_key(), json.dumps(payload), ex=ttl)
@@ -2,6 +2,7 @@ from datetime import datetime, time, timedelta
 from typing import Optional
 
 from bot.common.logs import logger
+from bot.domain.entities.lease import WriteFence
 from bot.domain.entities.mappings import NotificationScheduleMode, COURSE_SUBJECTS
 from bot.domain.entities.notification import NotificationTask, UserNotification
 from bot.domain.entities.user import UserEntity
@@ -11,9 +12,9 @@ from bot.domain.services.notification import NotificationServiceInterface
 class NotificationService(NotificationServiceInterface):
     """Сервис обработки уведомлений с фильтрацией и планированием"""
 
-    async def enqueue_many(self, tasks: list[NotificationTask]) -> None:
+    async def enqueue_many(self, tasks: list[NotificationTask], fence: Optional[WriteFence] = None) -> None:
         """Добавляет задачи в общую очередь для обработки"""
-        await self.repository.push_to_queue(tasks)
+        await self.repository.push_to_queue(tasks, fence)
         logger.info(f"📥 Добавлено {len(tasks)} задач в очередь уведомлений")
 
     async def process_queue(self) -> int:
@@ -47,6 +48,24 @@ class NotificationService(NotificationServiceInterface):
 
         return processed
 
+    async def cancel_pending(self, file_ids: list[str], reason: str) -> int:
+        """Отменяет ожидающие отправки уведомления об удалённых или заменённых файлах"""
+        if not file_ids:
+            return 0
+        cancelled = await self.repository.cancel_pending(file_ids, reason)
+        if cancelled > 0:
+            logger.info(f"🚫 Отменено уведомлений: {cancelled} (файлов: {len(file_ids)}, {reason})")
+        return cancelled
+
+    async def move_pending(self, moves: dict[str, NotificationTask]) -> int:
+        """Переписывает ожидающие отправки уведомления о перемещённых файлах (ключ прежнего файла -> новая задача)"""
+        rewritten = 0
+        for file_id, task in moves.items():
+            rewritten += await self.repository.rewrite_pending(file_id, task)
+        if rewritten > 0:
+            logger.info(f"🔀 Переписано уведомлений на новое расположение файлов: {rewritten} (файлов: {len(moves)})")
+        return rewritten
+
     async def _should_notify_user(self, user: UserEntity, task: NotificationTask) -> bool:
         """Проверяет, должен ли пользователь получить уведомление"""
 
@@ -55,7 +55,42 @@ class NotificationScheduler(SchedulerServiceInterface):
 
         logger.debug(f"🔍 Проверка уведомлений до {now.isoformat()}")
 
-        async for notification in self.repository.get_due_notifications(now):  # NOQA
+        # Уведомления отправляются пакетами: перед отправкой пакета ссылки на скачивание
+        # запрашиваются по одной на файл, а не берутся из задачи, где они могли устареть.
+        # Забранные из расписания, но не отправленные (отмена, ошибка) возвращаются в него
+        batch: list[UserNotification] = []
+        try:
+            async for notification in self.repository.get_due_notifications(now):  # NOQA
+                batch.append(notification)
+                if len(batch) >= self.send_batch_size:
+                    sent, failed = await self._send_batch(batch)
+                    sent_count, failed_count = sent_count + sent, failed_count + failed
+            if batch:
+                sent, failed = await self._send_batch(batch)
+                sent_count, failed_count = sent_count + sent, failed_count + failed
+        finally:
+            if batch:
+                await self._return_unsent(batch)
+
+        if sent_count > 0 or failed_count > 0:
+            logger.info(f"📤 Отправлено уведомлений: {sent_count}, ошибок: {failed_count}")
+        else:
+            logger.debug("⏭️ Нет уведомлений для отправки")
+
+    async def _send_batch(self, batch: list[UserNotification]) -> tuple[int, int]:
+        """
+        Отправляет пакет уведомлений со свежими ссылками на скачивание
+
+        Уведомление убирается из batch перед отправкой: если отправку прервут, в batch
+        останутся только те, что ещё не отправлялись.
+
+        :return: (отправлено, ошибок)
+        """
+        await self._attach_download_links(batch)
+        sent_count = 0
+        failed_count = 0
+        while batch:
+            notification = batch.pop(0)
             try:
                 await self._send_notification(notification)
                 if notification.notification_id:
@@ -66,11 +101,38 @@ class NotificationScheduler(SchedulerServiceInterface):
                 if notification.notification_id:
                     await self.repository.mark_as_failed(notification.notification_id, str(e))
                 failed_count += 1
+        return sent_count, failed_count
 
-        if sent_count > 0 or failed_count > 0:
-            logger.info(f"📤 Отправлено уведомлений: {sent_count}, ошибок: {failed_count}")
-        else:
-            logger.debug("⏭️ Нет уведомлений для отправки")
+    async def _return_unsent(self, batch: list[UserNotification]) -> None:
+        """Возвращает в расписание уведомления, которые забрали на отправку, но не отправили"""
+        returned = 0
+        for notification in batch:
+            try:
+                await self.repository.save_user_notification(notification)
+                returned += 1
+            except Exception as e:
+                logger.error(f"Не удалось вернуть уведомление пользователю {notification.user_id} в расписание: {e}")
+        logger.warning(f"↩️ Отправка прервана, уведомлений возвращено в расписание: {returned} из {len(batch)}")
+        batch.clear()
+
+    async def _attach_download_links(self, batch: list[UserNotification]) -> None:
+        """Подставляет в задачи ссылки на скачивание, общие для всех получателей файла"""
+        if not self.link_resolver:
+            return
+        try:
+            links = await self.link_resolver.resolve_many(n.task for n in batch)
+        except Exception as e:
+            # Без ссылки на скачивание уведомление всё равно уходит: в нём есть ссылка на просмотр
+            logger.error(f"Не удалось получить ссылки на скачивание: {e}")
+            links = {}
+        for notification in batch:
+            task = notification.task
+            key = self.link_resolver.link_key(task)
+            if key is None:
+                continue  # Папка неизвестна (старая задача) - остаётся сохранённая ссылка
+            task.download_url = links.get(key)
+            for file in task.bundle:
+                file.download_url = links.get((task.public_root_url, file.file_path))
 
     async def _send_notification(self, notification: UserNotification):
         """Отправляет одно уведомление пользователю"""
@@ -1,5 +1,6 @@
 from collections import Counter
 
+from bot.common.utils.disk_stats import COMMON
 from bot.domain.entities.statistics import StatsSnapshot
 from bot.domain.services.statistics import StatisticsServiceInterface
 
@@ -40,9 +41,11 @@ class StatisticsService(StatisticsServiceInterface):
         snap.queue_len = await self.repo.get_queue_len()
         snap.scheduled_total = await self.repo.get_scheduled_total()
 
-        groups, common, computed_at = await self.repo.get_disk_group_counts()
-        snap.disk_groups = groups
-        snap.disk_common = common
-        snap.disk_computed_at = computed_at
+        disk = await self.repo.get_disk_stats()
+        if disk is not None:
+            snap.disk_stats = disk
+            snap.disk_groups = {code: count for code, (count, _) in disk.dimension("group").items()}
+            snap.disk_common = max(0, disk.files.get(COMMON, 0))
+            snap.disk_computed_at = disk.updated_at
 
         return snap
@@ -206,6 +206,28 @@ def build_stats_menu_kb() -> types.InlineKeyboardMarkup:
     return kb.as_markup()
 
 
+def build_status_kb() -> types.InlineKeyboardMarkup:
+    """
+    Клавиатура под /status
+
+    :return: inline-клавиатура с переходом к телеметрии обхода
+    """
+    kb = InlineKeyboardBuilder()
+    kb.row(InlineKeyboardButton(text="📈 Телеметрия обхода", callback_data="status:telemetry"))
+    return kb.as_markup()
+
+
+def build_telemetry_kb() -> types.InlineKeyboardMarkup:
+    """
+    Клавиатура отчёта телеметрии обхода
+
+    :return: inline-клавиатура с кнопкой обновления
+    """
+    kb = InlineKeyboardBuilder()
+    kb.row(InlineKeyboardButton(text="🔄 Обновить", callback_data="status:telemetry:refresh"))
+    return kb.as_markup()
+
+
 def build_kv_list_kb(
     *,
     items: list[tuple[str, int]],
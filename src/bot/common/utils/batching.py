@@ -0,0 +1,103 @@
+"""Потоковая пакетная запись с ограниченным буфером."""
+import asyncio
+import time
+from typing import Awaitable, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class BatchPipeline(Generic[T]):
+    """
+    Конвейер: элементы копятся в пакеты и пишутся фоновой задачей по мере поступления
+
+    Пакет уходит, когда набрал batch_size элементов или старше flush_interval секунд.
+    В очереди не больше max_batches пакетов: если запись отстаёт, put() ждёт (backpressure),
+    и в памяти одновременно не больше (max_batches + 2) * batch_size элементов.
+
+    Ошибка записи прерывает конвейер: она пробрасывается из ближайшего put() или close().
+
+    :example:
+        /// async with BatchPipeline(sink, batch_size=200) as pipeline:
+        ///     async for item in source:
+        ///         await pipeline.put(item)
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[list[T]], Awaitable[None]],
+        batch_size: int = 200,
+        flush_interval: float = 2.0,
+        max_batches: int = 2,
+    ):
+        self.sink = sink
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue[list[T] | None] = asyncio.Queue(maxsize=max(1, max_batches))
+        self._batch: list[T] = []
+        self._batch_started = 0.0
+        self._task: asyncio.Task | None = None
+        self._error: BaseException | None = None
+
+        self.items = 0  # Записано элементов
+        self.batches = 0  # Записано пакетов
+
+    async def __aenter__(self) -> "BatchPipeline[T]":
+        self._task = asyncio.create_task(self._run(), name="batch_pipeline")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.close()
+            return
+        # Источник упал: недописанное отбрасываем, запись не ждём
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def put(self, item: T) -> None:
+        """Добавить элемент; ждёт, если запись отстаёт"""
+        self._raise_error()
+        if not self._batch:
+            self._batch_started = time.monotonic()
+        self._batch.append(item)
+        if len(self._batch) >= self.batch_size or time.monotonic() - self._batch_started >= self.flush_interval:
+            await self._submit()
+
+    async def close(self) -> None:
+        """Дописать остаток и дождаться окончания записи"""
+        await self._submit()
+        await self._queue.put(None)
+        if self._task:
+            await self._task
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    async def _submit(self) -> None:
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        await self._queue.put(batch)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                batch = await asyncio.wait_for(self._queue.get(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                # Источник затих: забираем неполный пакет, чтобы он не ждал следующих элементов
+                if not self._batch or time.monotonic() - self._batch_started < self.flush_interval:
+                    continue
+                batch, self._batch = self._batch, []
+
+            if batch is None:
+                return
+            if self._error is not None:
+                continue  # После ошибки только разгружаем очередь, чтобы put() не завис
+            try:
+                await self.sink(batch)
+                self.items += len(batch)
+                self.batches += 1
+            except Exception as e:
+                self._error = e
@@ -0,0 +1,194 @@
+"""Склейка файлов одной загрузки в задачу-пакет: одно уведомление вместо сообщения на каждый файл."""
+import time
+from datetime import datetime
+from typing import Optional
+
+from bot.common.utils.path_parser import parse_datetime
+from bot.domain.entities.manifest import FileChange
+from bot.domain.entities.notification import NotificationTask
+
+# Изменение файла и его задача: так элементы идут в пакетную запись опроса
+HeldItem = tuple[FileChange, Optional[NotificationTask]]
+
+
+def bundle_key(task: NotificationTask) -> tuple:
+    """
+    Ключ пакета: папка занятия, предмет, группа и дата занятия
+
+    :example:
+        /// bundle_key(task)  # task.file_path = "/1 курс/МА/Лекция/Часть 1.mp4"
+        ("/1 курс/МА/Лекция", "МА", None, None, date(2025, 10, 15))
+    """
+    directory = task.file_path.rpartition("/")[0]
+    lesson_day = task.lesson_date.date() if task.lesson_date else None
+    # Группа - и распознанная, и сырая: по ним сервис уведомлений выбирает получателей
+    return directory, task.subject_code, task.study_group, task.group_raw, lesson_day
+
+
+def _uploaded_at(task: NotificationTask) -> Optional[datetime]:
+    return parse_datetime(task.modified_iso)
+
+
+def can_bundle(task: NotificationTask) -> bool:
+    """Задачу можно склеить с другими: у файла есть предмет и время загрузки, и это ещё не пакет"""
+    return bool(task.subject_code) and not task.bundle and _uploaded_at(task) is not None
+
+
+def coalesce_tasks(tasks: list[NotificationTask], window: int, max_files: int = 10) -> list[NotificationTask]:
+    """
+    Склеить задачи файлов одной загрузки в задачи-пакеты
+
+    Файлы с одинаковым ключом (bundle_key), загруженные с перерывом не больше window секунд,
+    попадают в один пакет, но не больше max_files файлов. Внутри пакета файлы идут по имени
+    ("Часть 1", "Часть 2", ...). Файлы без времени загрузки и с неизвестным предметом
+    не склеиваются.
+
+    :param tasks: задачи отдельных файлов
+    :param window: наибольший перерыв между загрузками файлов пакета, с (0 - не склеивать)
+    :param max_files: наибольшее число файлов в пакете
+    :return: задачи-пакеты и одиночные задачи в порядке первого файла
+    """
+    if window <= 0 or max_files <= 1 or len(tasks) < 2:
+        return tasks
+
+    groups: dict[tuple, list[tuple[datetime, int, NotificationTask]]] = {}
+    single: list[tuple[int, NotificationTask]] = []
+    for idx, task in enumerate(tasks):
+        uploaded_at = _uploaded_at(task)
+        if uploaded_at is None or not task.subject_code or task.bundle:
+            single.append((idx, task))
+            continue
+        groups.setdefault(bundle_key(task), []).append((uploaded_at, idx, task))
+
+    result = list(single)
+    for items in groups.values():
+        items.sort(key=lambda item: item[0])
+        burst: list[tuple[datetime, int, NotificationTask]] = []
+        for item in items:
+            if burst and (
+                (item[0] - burst[-1][0]).total_seconds() > window or len(burst) >= max_files
+            ):
+                result.append(_merge(burst))
+                burst = []
+            burst.append(item)
+        result.append(_merge(burst))
+
+    result.sort(key=lambda item: item[0])
+    return [task for _, task in result]
+
+
+def _merge(burst: list[tuple[datetime, int, NotificationTask]]) -> tuple[int, NotificationTask]:
+    """Задача-пакет из файлов одной загрузки (позиция - первый по порядку файл)"""
+    first_idx = min(idx for _, idx, _ in burst)
+    if len(burst) == 1:
+        return first_idx, burst[0][2]
+    tasks = sorted((task for _, _, task in burst), key=lambda t: t.file_name)
+    bundle = tasks[0].with_files([t.files[0] for t in tasks])
+    # Дата занятия - первого загруженного файла (у записи есть время, у слайдов обычно только дата)
+    bundle.lesson_date = next((t.lesson_date for _, _, t in burst if t.lesson_date), None)
+    return first_idx, bundle
+
+
+class BundleHold:
+    """
+    Задачи, придержанные до конца загрузки: файлы одной загрузки склеиваются, даже если
+    пришли в разных пакетах записи или в разных циклах опроса
+
+    Задача, которую можно склеить (can_bundle), ждёт, пока её группа (bundle_key) пополняется.
+    Группа отдаётся, когда window секунд в неё не приходили новые файлы или она набрала
+    max_files файлов. Если придержано больше max_held файлов, раньше срока отдаются группы,
+    которые дольше всех не пополнялись. При отдаче задачи группы склеиваются (coalesce_tasks).
+
+    Записи манифеста придержанных файлов не пишутся до отдачи: если процесс упадёт, файлы
+    найдутся снова при полном листинге их директории.
+
+    :param window: наибольший перерыв между загрузками файлов пакета, с (0 - не придерживать)
+    :param max_files: наибольшее число файлов в пакете
+    :param max_held: наибольшее число придержанных файлов
+
+    :example:
+        /// hold = BundleHold(window=900, max_files=10)
+        /// hold.add((change, task))  # Группа не полна: задача придержана
+        []
+        /// hold.release()  # 900 с без новых файлов группы
+        [(change, task)]
+    """
+
+    def __init__(self, window: int, max_files: int = 10, max_held: int = 1000):
+        self.window = window
+        self.max_files = max_files
+        self.max_held = max(1, max_held)
+        # Ключ группы -> (время последнего пополнения, ключ файла -> элемент); порядок - по пополнению
+        self._groups: dict[tuple, tuple[float, dict[str, HeldItem]]] = {}
+        self._held = 0
+
+    def __len__(self) -> int:
+        return self._held
+
+    def __contains__(self, task: NotificationTask) -> bool:
+        """Файл задачи уже придержан (его нашли снова)"""
+        group = self._groups.get(bundle_key(task))
+        return group is not None and task.files[0].file_id in group[1]
+
+    def accepts(self, task: Optional[NotificationTask]) -> bool:
+        """Придерживать ли задачу: склейка включена, а задачу можно склеить"""
+        return self.window > 0 and self.max_files > 1 and task is not None and can_bundle(task)
+
+    def add(self, item: HeldItem, now: Optional[float] = None) -> list[HeldItem]:
+        """
+        Придержать задачу файла
+
+        Файл, уже придержанный в группе, заменяется (его нашли снова).
+
+        :param item: изменение файла и задача, для которой accepts() вернул True
+        :param now: текущее время по time.monotonic()
+        :return: элементы групп, отданных раньше срока (группа полна или придержано слишком много)
+        """
+        now = time.monotonic() if now is None else now
+        change, task = item
+        key = bundle_key(task)
+        _, files = self._groups.pop(key, (now, {}))
+        file_id = task.files[0].file_id
+        self._held += file_id not in files
+        files[file_id] = item
+        self._groups[key] = (now, files)
+
+        released: list[HeldItem] = []
+        if len(files) >= self.max_files:
+            released += self._take(key)
+        while self._held > self.max_held:
+            released += self._take(next(iter(self._groups)))
+        return released
+
+    def release(self, now: Optional[float] = None, force: bool = False) -> list[HeldItem]:
+        """
+        Отдать группы, которые window секунд не пополнялись
+
+        :param now: текущее время по time.monotonic()
+        :param force: отдать все группы
+        :return: элементы для записи: у первого файла пакета - задача-пакет, у остальных задачи нет
+        """
+        now = time.monotonic() if now is None else now
+        due = [key for key, (touched, _) in self._groups.items() if force or now - touched >= self.window]
+        return [item for key in due for item in self._take(key)]
+
+    def file_ids(self) -> set[str]:
+        """Ключи придержанных файлов (как resource_id записи манифеста)"""
+        return {file_id for _, files in self._groups.values() for file_id in files}
+
+    def clear(self) -> None:
+        """Забыть придержанные задачи (например, лидерство потеряно)"""
+        self._groups.clear()
+        self._held = 0
+
+    def _take(self, key: tuple) -> list[HeldItem]:
+        """Убрать группу и склеить её задачи"""
+        _, files = self._groups.pop(key)
+        self._held -= len(files)
+        tasks = coalesce_tasks([task for _, task in files.values()], self.window, self.max_files)
+        items: list[HeldItem] = []
+        for task in tasks:
+            first, *rest = task.files
+            items.append((files[first.file_id][0], task))
+            items.extend((files[f.file_id][0], None) for f in rest)
+        return items
@@ -0,0 +1,91 @@
+"""Спрос на файлы: какие поддеревья Я.Диска кому-то нужны."""
+from typing import Iterable
+
+from bot.common.utils.path_parser import GROUP_RAW_PATTERN
+from bot.common.utils.subject_matcher import get_subject_matcher
+from bot.domain.entities.mappings import COURSE_SUBJECTS
+from bot.domain.entities.user import UserEntity
+
+
+class CrawlDemand:
+    """
+    Папки предметов и групп, файлы из которых может получить хотя бы один пользователь
+
+    Повторяет фильтры NotificationService._should_notify_user: уведомления включены, курс
+    задан, предмет входит в предметы курса и не исключён, группа (если есть в пути) совпадает
+    с группой пользователя. Поддерево с папкой предмета или группы вне спроса никому не
+    достанется, и обходчик может его не листать.
+
+    :param subjects: ключи предметов (имена папок), нужные хотя бы одному пользователю
+    :param groups: коды групп пользователей с включёнными уведомлениями
+    :param users: сколько пользователей вообще могут получать уведомления
+    """
+
+    def __init__(self, subjects: set[str], groups: set[str], users: int = 0):
+        self.subjects = frozenset(subjects)
+        self.groups = frozenset(groups)
+        self.users = users
+
+    @classmethod
+    def from_users(cls, users: Iterable[UserEntity]) -> "CrawlDemand":
+        """
+        Спрос по текущим пользователям
+
+        :example:
+            /// CrawlDemand.from_users([UserEntity(tg_id=1, user_course=StudyCourses.COURSE1, user_study_group=StudyGroups.BKNAD252)])
+            CrawlDemand(subjects=6, groups=1, users=1)
+        """
+        subjects: set[str] = set()
+        groups: set[str] = set()
+        receivers = 0
+        for user in users:
+            if not user.enable_notifications or not user.user_course:
+                continue
+            course_subjects = set(COURSE_SUBJECTS.get(user.user_course, ()))
+            course_subjects -= set(user.excluded_disciplines or ())
+            if not course_subjects:
+                continue
+            receivers += 1
+            subjects |= course_subjects
+            if user.user_study_group:
+                groups.add(str(user.user_study_group))
+        return cls(subjects, groups, receivers)
+
+    def wants(self, path: str) -> bool:
+        """
+        Нужно ли кому-то поддерево директории
+
+        Нужна любая директория, в пути которой нет папки предмета или группы вне спроса.
+        Предмет каждой папки пути определяется так же, как при разборе пути (с псевдонимами,
+        нестрогое совпадение не меняет предмет, найденный выше по пути), поэтому папка
+        отсекается, только если файлы в ней получат предмет вне спроса. Исключение - папка,
+        названная точным ключом нужного предмета внутри папки ненужного: её файлы найдёт только
+        полная сверка (full_resync).
+        Папка неизвестной группы (похожая на код группы, но не из StudyGroups) не нужна
+        никому: такие файлы не рассылаются.
+
+        :param path: путь директории (например, "/1 курс/МА/БКНАД252")
+        :return: False, если файлы поддерева не получит ни один пользователь
+
+        :example:
+            /// CrawlDemand({"МА"}, {"БКНАД252"}).wants("/1 курс/ЛА/Лекция")
+            False
+            /// CrawlDemand({"Машинное обучение 1"}, set()).wants("/3 курс/Машинное обучение 1/Семинар/Python")
+            True
+            /// CrawlDemand({"Глубинное обучение 1"}, set()).wants("/3 курс/Глубинное обучение 1 (2025)/Семинары/Python")
+            True
+        """
+        matcher = get_subject_matcher()
+        subject = None
+        for segment in path.split("/"):
+            if not segment:
+                continue
+            subject = matcher.match_next(segment, subject)
+            if subject and subject not in self.subjects:
+                return False
+            if GROUP_RAW_PATTERN.match(segment) and segment not in self.groups:
+                return False
+        return True
+
+    def __repr__(self) -> str:
+        return f"CrawlDemand(subjects={len(self.subjects)}, groups={len(self.groups)}, users={self.users})"
@@ -0,0 +1,84 @@
+"""Статистика файлов на диске по измерениям: считается по событиям манифеста."""
+from collections import Counter
+from typing import Iterable
+
+from bot.common.utils.path_classifier import classify_path
+from bot.domain.entities.manifest import FileChange, ManifestEntry
+from bot.domain.entities.mappings import COURSE_SUBJECTS, FileChangeKind
+
+TOTAL = "total"
+COMMON = "common"  # Файлы без папки группы (общие для курса)
+DIMENSIONS = ("group", "subject", "course", "topic", "teacher")
+
+# Курс по предмету: папка предмета однозначно задаёт курс
+_SUBJECT_COURSES = {subject: str(course) for course, subjects in COURSE_SUBJECTS.items() for subject in subjects}
+
+
+def file_buckets(path: str) -> list[str]:
+    """
+    Корзины статистики, в которые попадает файл
+
+    :param path: путь к файлу на диске
+    :return: "total", группа ("group:<код>" или "common") и известные измерения вида "<измерение>:<значение>"
+
+    :example:
+        /// file_buckets("/1 курс/МА/БКНАД252/Лобода А.А. 2025-10-15T08-08-19Z.mp4")
+        ["total", "group:БКНАД252", "subject:МА", "course:COURSE1", "teacher:Лобода А.А."]
+    """
+    info = classify_path(path)
+    buckets = [TOTAL, f"group:{info.group}" if info.group else COMMON]
+    if info.subject:
+        buckets.append(f"subject:{info.subject}")
+        course = _SUBJECT_COURSES.get(info.subject)
+        if course:
+            buckets.append(f"course:{course}")
+    if info.topic:
+        buckets.append(f"topic:{info.topic}")
+    if info.teacher:
+        buckets.append(f"teacher:{info.teacher}")
+    return buckets
+
+
+class DiskStatsDelta:
+    """
+    Накопитель изменений статистики: файлов и байт по корзинам
+
+    Добавление файла увеличивает его корзины, удаление уменьшает, изменение - это
+    удаление прошлой записи и добавление новой (путь и размер могли поменяться).
+    """
+
+    def __init__(self):
+        self.files: Counter[str] = Counter()
+        self.bytes: Counter[str] = Counter()
+
+    def add(self, entry: ManifestEntry, sign: int = 1) -> None:
+        size = entry.size or 0
+        for bucket in file_buckets(entry.path):
+            self.files[bucket] += sign
+            if size:
+                self.bytes[bucket] += sign * size
+
+    def apply(self, change: FileChange) -> None:
+        """Учесть событие манифеста"""
+        if change.kind == FileChangeKind.REMOVED:
+            self.add(change.entry, -1)
+            return
+        if change.previous is not None:
+            self.add(change.previous, -1)
+        self.add(change.entry)
+
+    def extend(self, changes: Iterable[FileChange]) -> "DiskStatsDelta":
+        for change in changes:
+            self.apply(change)
+        return self
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[ManifestEntry]) -> "DiskStatsDelta":
+        """Полный пересчёт: статистика всего манифеста"""
+        delta = cls()
+        for entry in entries:
+            delta.add(entry)
+        return delta
+
+    def __bool__(self) -> bool:
+        return any(self.files.values()) or any(self.bytes.values())
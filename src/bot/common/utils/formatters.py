@@ -1,12 +1,34 @@
 """Форматтеры для отображения данных в интерфейсе"""
+from html import escape
 
-from bot.common.utils.formatting import fmt_int, human_ago
+from bot.common.utils.disk_stats import TOTAL
+from bot.common.utils.formatting import fmt_bytes, fmt_int, fmt_secs, human_ago
+from bot.domain.entities.course import get_course
+from bot.domain.entities.crawl import CrawlTelemetry, DirectoryTelemetry
+from bot.domain.entities.mappings import StudyCourses
 from bot.domain.entities.statistics import StatsSnapshot
 
 
 class StatisticsFormatter:
     """Форматирование статистики для отображения в интерфейсе"""
 
+    # Измерения статистики диска: заголовок, измерение, сколько значений показывать
+    DISK_DIMENSIONS = (
+        ("По курсам", "course", 10),
+        ("По темам", "topic", 10),
+        ("Топ предметов", "subject", 10),
+        ("Топ преподавателей", "teacher", 10),
+    )
+
+    @staticmethod
+    def _disk_label(dimension: str, key: str) -> str:
+        """Подпись значения измерения: курс хранится кодом (COURSE1), показывается названием (1 курс)"""
+        if dimension == "course" and key in StudyCourses.__members__:
+            course = get_course(StudyCourses(key))
+            if course:
+                return course.title
+        return key
+
     @staticmethod
     def format_summary(snap: StatsSnapshot) -> str:
         """
@@ -32,13 +54,29 @@ class StatisticsFormatter:
 
         lines.append("")
         lines.append("📁 <b>Файлы на диске</b>")
+        disk = getattr(snap, "disk_stats", None)
         if getattr(snap, "disk_computed_at", None) is None:
-            lines.append("• Обновляется… (подождите до 5 минут)")
+            lines.append("• Считается… (после первого обхода диска)")
         else:
+            if disk:
+                lines.append(
+                    f"• Всего: <b>{fmt_int(disk.files.get(TOTAL, 0))}</b> ({fmt_bytes(disk.bytes.get(TOTAL, 0))})"
+                )
             if getattr(snap, "disk_groups", None):
                 parts = ", ".join(f"{k}: {fmt_int(v)}" for k, v in sorted(snap.disk_groups.items()))
                 lines.append(f"• По группам: {parts}")
             lines.append(f"• Общие (без группы): <b>{fmt_int(getattr(snap, 'disk_common', 0))}</b>")
+            if disk:
+                for title, dimension, limit in StatisticsFormatter.DISK_DIMENSIONS:
+                    values = sorted(disk.dimension(dimension).items(), key=lambda kv: (-kv[1][0], kv[0]))
+                    if not values:
+                        continue
+                    parts = ", ".join(
+                        f"{StatisticsFormatter._disk_label(dimension, k)}: {fmt_int(count)} ({fmt_bytes(size)})"
+                        for k, (count, size) in values[:limit]
+                    )
+                    more = f" и ещё {len(values) - limit}" if len(values) > limit else ""
+                    lines.append(f"• {title}: {parts}{more}")
             lines.append(
                 f"• Обновлено: {snap.disk_computed_at.strftime('%d.%m.%Y %H:%M:%S')} ({human_ago(snap.disk_computed_at)})"
             )
@@ -52,3 +90,120 @@ class StatisticsFormatter:
         lines.append(top_disabled)
 
         return "\n".join(lines)
+
+
+class CrawlTelemetryFormatter:
+    """Отчёт по телеметрии обхода для администраторов"""
+
+    MAX_LENGTH = 4096  # Предел длины сообщения Telegram
+    MAX_ERROR_LENGTH = 120  # Текст ошибки листинга в отчёте обрезается до стольких символов
+    TRUNCATED = "… отчёт сокращён"
+
+    @staticmethod
+    def format_report(cycles_by_root: dict[str, list[CrawlTelemetry]], top: int = 5) -> str:
+        """
+        Форматировать телеметрию последних циклов обхода
+
+        Отчёт умещается в одно сообщение: если текст длиннее MAX_LENGTH, списки директорий
+        укорачиваются, а если и этого мало - отчёт обрезается по целой строке.
+
+        :param cycles_by_root: корневая папка -> телеметрия циклов, от новых к старым
+        :param top: сколько директорий показывать в каждом списке
+        :return: отформатированный текст
+        """
+        limit = CrawlTelemetryFormatter.MAX_LENGTH
+        for n in range(max(top, 0), -1, -1):
+            lines = CrawlTelemetryFormatter._format_lines(cycles_by_root, n)
+            text = "\n".join(lines)
+            if len(text) <= limit:
+                return text
+
+        # Даже без списков не помещается (много корней): обрезаем по строкам, не разрывая теги
+        suffix = f"\n{CrawlTelemetryFormatter.TRUNCATED}"
+        kept: list[str] = []
+        size = len(suffix)
+        for line in lines:
+            if size + len(line) + 1 > limit:
+                break
+            kept.append(line)
+            size += len(line) + 1
+        return "\n".join(kept) + suffix
+
+    @staticmethod
+    def _format_lines(cycles_by_root: dict[str, list[CrawlTelemetry]], top: int) -> list[str]:
+        lines: list[str] = ["📈 <b>Телеметрия обхода</b>"]
+        for root_url, cycles in cycles_by_root.items():
+            lines.append("")
+            lines.append(f"📁 <a href=\"{escape(root_url)}\">{escape(root_url)}</a>")
+            if not cycles:
+                lines.append("• Данных пока нет")
+                continue
+            lines.extend(CrawlTelemetryFormatter._format_root(cycles, top))
+        return lines
+
+    @staticmethod
+    def _shorten(text: str, limit: int) -> str:
+        return text if len(text) <= limit else text[:limit - 1] + "…"
+
+    @staticmethod
+    def _fmt_latency(seconds: float) -> str:
+        """Задержка: до секунды - в миллисекундах"""
+        if seconds < 1:
+            return f"{seconds * 1000:.0f} мс"
+        return fmt_secs(round(seconds, 1))
+
+    @staticmethod
+    def _format_root(cycles: list[CrawlTelemetry], top: int) -> list[str]:
+        last = cycles[0]
+        n = len(cycles)
+        durations = [c.duration for c in cycles]
+        requests = sum(c.requests for c in cycles)
+        failures = sum(c.errors + c.retries for c in cycles)
+        lines = [
+            f"• Циклов: {fmt_int(n)} (полных {fmt_int(sum(1 for c in cycles if c.full_resync))}, "
+            f"неполных {fmt_int(sum(1 for c in cycles if not c.complete))}), последний {human_ago(last.started_at)}",
+            f"• Время цикла: последний {fmt_secs(round(last.duration, 1))}, "
+            f"среднее {fmt_secs(round(sum(durations) / n, 1))}, максимум {fmt_secs(round(max(durations), 1))}",
+            f"• Последний цикл: директорий {fmt_int(last.directories)}, запросов {fmt_int(last.requests)}, "
+            f"ответов {fmt_bytes(last.bytes)}",
+            f"• Доля ошибок: {failures / requests:.1%} ({fmt_int(failures)} из {fmt_int(requests)} запросов, "
+            f"429: {fmt_int(sum(c.throttled for c in cycles))})" if requests else "• Доля ошибок: —",
+        ]
+
+        # Самые медленные - по худшему времени за все циклы, самые большие - по последнему листингу
+        slowest: dict[str, tuple[DirectoryTelemetry, int]] = {}
+        largest: dict[str, DirectoryTelemetry] = {}
+        failed: dict[str, tuple[DirectoryTelemetry, int]] = {}
+        for cycle in cycles:
+            for t in cycle.slowest:
+                worst, seen = slowest.get(t.path, (t, 0))
+                slowest[t.path] = (t if t.elapsed > worst.elapsed else worst, seen + 1)
+            for t in cycle.largest:
+                largest.setdefault(t.path, t)
+            for t in cycle.failed:
+                latest, seen = failed.get(t.path, (t, 0))
+                failed[t.path] = (latest, seen + 1)
+
+        if top <= 0:
+            return lines
+        if slowest:
+            lines.append(f"🐢 <b>Самые медленные директории</b> (последние циклы: {fmt_int(n)})")
+            for t, seen in sorted(slowest.values(), key=lambda v: v[0].elapsed, reverse=True)[:top]:
+                lines.append(
+                    f"  • <code>{escape(t.path)}</code> - {CrawlTelemetryFormatter._fmt_latency(t.elapsed)} "
+                    f"(страниц {fmt_int(t.pages)}, самый долгий запрос {CrawlTelemetryFormatter._fmt_latency(t.max_latency)}, "
+                    f"в топе {fmt_int(seen)} раз)"
+                )
+        if largest:
+            lines.append("📦 <b>Самые большие директории</b>")
+            for t in sorted(largest.values(), key=lambda v: v.items, reverse=True)[:top]:
+                lines.append(
+                    f"  • <code>{escape(t.path)}</code> - элементов {fmt_int(t.items)}, "
+                    f"страниц {fmt_int(t.pages)}, {fmt_bytes(t.bytes)}"
+                )
+        if failed:
+            lines.append("⚠️ <b>Ошибки листинга</b>")
+            for t, seen in sorted(failed.values(), key=lambda v: v[1], reverse=True)[:top]:
+                error = CrawlTelemetryFormatter._shorten(t.error or "", CrawlTelemetryFormatter.MAX_ERROR_LENGTH)
+                lines.append(f"  • <code>{escape(t.path)}</code> - {escape(error)} ({fmt_int(seen)} раз)")
+        return lines
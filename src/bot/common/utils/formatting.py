@@ -1,5 +1,6 @@
 """Утилиты форматирования текста, чисел, дат и времени."""
 from datetime import datetime, time
+from html import escape
 
 
 def parse_dt_raw(value: str | bytes | None) -> datetime | None:
@@ -48,6 +49,24 @@ def fmt_int(n: int) -> str:
         return str(n)
 
 
+def fmt_bytes(n: int) -> str:
+    """
+    Форматирование размера в байтах
+
+    :param n: размер в байтах
+    :return: строка вида "512 Б", "3.4 ГБ"
+    """
+    try:
+        size = float(n)
+    except Exception:
+        return str(n)
+    for unit in ("Б", "КБ", "МБ", "ГБ"):
+        if abs(size) < 1024:
+            return f"{int(size)} {unit}" if unit == "Б" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} ТБ"
+
+
 def human_ago(dt: datetime | None) -> str:
     """
     Форматирование datetime как человекочитаемое относительное время
@@ -113,6 +132,8 @@ def format_notification_message(task) -> str:
     """
     Форматирование задачи уведомления как HTML-сообщение для Telegram
 
+    Задача-пакет (файлы одной загрузки) - одно сообщение со списком файлов и ссылками на каждый.
+
     :param task: объект NotificationTask с метаданными файла
     :return: отформатированная HTML-строка сообщения
     """
@@ -173,6 +194,17 @@ def format_notification_message(task) -> str:
                 lines.append(f"📖 {h}")
             else:
                 lines.append(f"🏷️ {h}")
+    if task.bundle:
+        files = task.files
+        lines.append(f"\n📦 Файлов: {len(files)}")
+        for i, file in enumerate(files, 1):
+            links = []
+            if file.public_url:
+                links.append(f"<a href='{file.public_url}'>смотреть</a>")
+            if file.download_url:
+                links.append(f"<a href='{file.download_url}'>скачать</a>")
+            lines.append(f"{i}. {escape(file.file_name)}" + (f" - {' · '.join(links)}" if links else ""))
+        return "\n".join(lines)
     if public_link:
         lines.append(f"\n🔗 <a href='{public_link}'>Смотреть видео</a>")
     if download_link:
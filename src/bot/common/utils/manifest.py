@@ -0,0 +1,92 @@
+"""Сравнение листинга Я.Диска с манифестом предыдущего обхода."""
+from datetime import datetime
+
+from bot.common.utils.path_parser import parse_datetime
+from bot.domain.entities.manifest import FileChange, FileRecord, ManifestEntry
+from bot.domain.entities.mappings import FileChangeKind
+
+
+def has_ancestor_in(path: str, dirs: set[str], include_self: bool = False) -> bool:
+    """
+    Лежит ли путь внутри одной из директорий
+
+    :param path: путь к файлу или директории (например, "/1 курс/МА/file.mp4")
+    :param dirs: множество путей директорий
+    :param include_self: считать совпадение самого пути
+    :return: True, если какая-то из директорий - предок пути
+    """
+    if not dirs:
+        return False
+    if include_self and path in dirs:
+        return True
+    while path != "/":
+        idx = path.rfind("/")
+        if idx < 0:
+            return False
+        path = path[:idx] or "/"
+        if path in dirs:
+            return True
+    return False
+
+
+class ManifestDiff:
+    """
+    Потоковый diff: файлы подаются по одному через observe(), удалённые считаются в конце
+
+    Для каждой записи, отличающейся от манифеста, observe() возвращает событие; изменения
+    без смены содержимого возвращаются с notify=False - их нужно записать, но не рассылать.
+    """
+
+    def __init__(self, previous: dict[str, ManifestEntry], seed_before: datetime | None = None):
+        """
+        :param previous: манифест предыдущего обхода (resource_id -> запись)
+        :param seed_before: файлы с modified не позже этой даты добавляются в манифест без события
+            (миграция со старого чекпоинта по времени)
+        """
+        self.previous = previous
+        self.seed_before = seed_before
+        self.seen: set[str] = set()
+        self.updated: dict[str, ManifestEntry] = {}
+
+    def observe(self, record: FileRecord) -> FileChange | None:
+        """
+        Учесть файл из листинга
+
+        :param record: файл листинга
+        :return: событие ADDED/CHANGED или None, если запись манифеста не менялась
+        """
+        entry = ManifestEntry.from_record(record)
+        self.seen.add(entry.resource_id)
+
+        prev = self.previous.get(entry.resource_id)
+        if prev == entry:
+            return None
+
+        self.updated[entry.resource_id] = entry
+        if prev is None:
+            if self.seed_before:
+                modified = parse_datetime(entry.modified)
+                if modified and modified <= self.seed_before:
+                    return FileChange(kind=FileChangeKind.ADDED, entry=entry, notify=False)
+            return FileChange(kind=FileChangeKind.ADDED, entry=entry)
+
+        return FileChange(kind=FileChangeKind.CHANGED, entry=entry, previous=prev, notify=not prev.same_content(entry))
+
+    def removed(self, untouched: set[str] | None = None) -> list[FileChange]:
+        """
+        Файлы из манифеста, не встреченные в текущем обходе
+
+        :param untouched: директории, которые в этом обходе не листились - их файлы не считаются удалёнными
+        """
+        return [
+            FileChange(kind=FileChangeKind.REMOVED, entry=entry)
+            for resource_id, entry in self.previous.items()
+            if resource_id not in self.seen and not has_ancestor_in(entry.path, untouched or set())
+        ]
+
+    def current(self, removed: list[FileChange]) -> dict[str, ManifestEntry]:
+        """Манифест после обхода: прошлый, с новыми и изменёнными записями, без удалённых"""
+        manifest = {**self.previous, **self.updated}
+        for change in removed:
+            manifest.pop(change.entry.resource_id, None)
+        return manifest
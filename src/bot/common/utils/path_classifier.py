@@ -0,0 +1,140 @@
+"""Классификация путей Я.Диска за один проход: все атрибуты файла из одного разбора пути."""
+import sys
+from datetime import datetime
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from bot.common.utils.path_parser import (
+    GROUP_RAW_PATTERN,
+    STUDY_GROUP_VALUES,
+    extract_date_from_filename,
+    extract_date_from_path,
+    extract_teacher_from_filename,
+)
+from bot.common.utils.subject_matcher import get_subject_matcher
+from bot.domain.entities.mappings import StudyGroups, SUBJECTS, TOPICS
+
+
+class DirectoryInfo(NamedTuple):
+    """Атрибуты директории: то, что задают сегменты её пути"""
+
+    subject: Optional[str] = None  # Ближайшая к файлу папка предмета
+    topic: Optional[str] = None  # Первая папка темы (Лекция/Семинар)
+    group: Optional[StudyGroups] = None  # Первая папка известной группы
+    group_raw: Optional[str] = None  # Первый сегмент, похожий на код группы
+    date: Optional[datetime] = None  # Дата из ближайшей к файлу папки с датой
+
+
+class PathInfo(NamedTuple):
+    """Атрибуты файла по пути и имени"""
+
+    subject: Optional[str]
+    topic: Optional[str]
+    group: Optional[StudyGroups]
+    group_raw: Optional[str]
+    teacher: Optional[str]
+    lesson_date: Optional[datetime]
+    lesson_date_source: Optional[str]  # "filename", "path" или None
+
+
+_EMPTY = DirectoryInfo()
+
+
+@lru_cache(maxsize=8192)
+def classify_directory(path: str) -> DirectoryInfo:
+    """
+    Атрибуты директории с запоминанием
+
+    Директория классифицируется через родителя: родитель уже в кэше, и разбирается только
+    последний сегмент. Тысячи файлов одной папки получают результат из кэша.
+
+    :param path: путь директории без завершающего слэша ("" - корень)
+    :return: атрибуты директории
+
+    :example:
+        /// classify_directory("/1 курс/МА/БКНАД252")
+        DirectoryInfo(subject="МА", topic=None, group=StudyGroups.BKNAD252, group_raw="БКНАД252", date=None)
+    """
+    if not path or path == "/":
+        return _EMPTY
+    idx = path.rfind("/")
+    parent = classify_directory(path[:idx]) if idx > 0 else _EMPTY
+    segment = path[idx + 1:]
+    if not segment:
+        return parent
+
+    # Дата - из ближайшей к файлу папки, тема и группа - первые от корня, предмет - ближайший
+    # точный ключ, иначе первое нестрогое совпадение
+    subject = get_subject_matcher().match_next(segment, parent.subject)
+    topic = parent.topic
+    if topic is None and segment.strip() in TOPICS:
+        topic = segment.strip()
+    group = parent.group
+    if group is None and segment in STUDY_GROUP_VALUES:
+        group = StudyGroups(segment)
+    group_raw = parent.group_raw
+    if group_raw is None and GROUP_RAW_PATTERN.match(segment):
+        group_raw = segment
+    date = extract_date_from_path(segment) or parent.date
+    return DirectoryInfo(subject, topic, group, group_raw, date)
+
+
+def classify_path(path: str) -> PathInfo:
+    """
+    Все атрибуты файла за один разбор пути
+
+    Совпадает с отдельными extract_*: предмет, тема, группа, сырой код группы, преподаватель
+    и дата занятия (из имени файла, иначе из папок).
+
+    :param path: путь к файлу на диске
+    :return: атрибуты файла
+
+    :example:
+        /// classify_path("/1 курс/МА/Лекция/Лобода А.А. 2025-10-15T08-08-19Z.mp4")
+        PathInfo(subject="МА", topic="Лекция", group=None, group_raw=None, teacher="Лобода А.А.",
+                 lesson_date=datetime(2025, 10, 15, 8, 8, 19), lesson_date_source="filename")
+    """
+    if "\\" in path:
+        path = path.replace("\\", "/")
+    path = path.rstrip("/")
+    idx = path.rfind("/")
+    directory = classify_directory(path[:idx]) if idx > 0 else _EMPTY
+    name = path[idx + 1:]
+
+    lesson_date = extract_date_from_filename(name)
+    if lesson_date:
+        return _with_name(directory, name, lesson_date, "filename")
+    return _with_name(directory, name, directory.date, "path" if directory.date else None)
+
+
+def _with_name(
+    directory: DirectoryInfo,
+    name: str,
+    lesson_date: Optional[datetime],
+    lesson_date_source: Optional[str],
+) -> PathInfo:
+    """Атрибуты файла: атрибуты директории, дополненные именем файла"""
+    # Имя файла - тоже сегмент пути: проверяем его так же, как отдельные extract_*
+    # (предмет в имени файла - только точное совпадение с ключом)
+    subject = name if name in SUBJECTS else directory.subject
+    topic = directory.topic
+    if topic is None and name.strip() in TOPICS:
+        topic = name.strip()
+    group = directory.group
+    if group is None and name in STUDY_GROUP_VALUES:
+        group = StudyGroups(name)
+    group_raw = directory.group_raw
+    if group_raw is None and GROUP_RAW_PATTERN.match(name):
+        group_raw = name
+    # Преподавателей единицы, а задач - тысячи: строка фамилии одна на всех
+    teacher = extract_teacher_from_filename(name)
+    return PathInfo(
+        subject=subject,
+        topic=topic,
+        group=group,
+        group_raw=group_raw,
+        teacher=sys.intern(teacher) if teacher else None,
+        lesson_date=lesson_date,
+        lesson_date_source=lesson_date_source,
+    )
+
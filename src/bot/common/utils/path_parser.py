@@ -2,9 +2,17 @@
 import re
 import urllib.parse
 from datetime import datetime
+from functools import lru_cache
+from hashlib import sha256
 from typing import Any, Optional
 
-from bot.domain.entities.mappings import StudyGroups, SUBJECTS, TOPICS
+from bot.common.utils.subject_matcher import get_subject_matcher
+from bot.domain.entities.mappings import StudyGroups, TOPICS
+
+# Значения StudyGroups и паттерны собираются один раз, а не на каждый путь
+STUDY_GROUP_VALUES = frozenset(g.value for g in StudyGroups)
+GROUP_RAW_PATTERN = re.compile(r"^БКНАД\d{3}$", re.IGNORECASE)
+TEACHER_PATTERN = re.compile(r'^([А-ЯЁа-яё]+\s+[А-ЯЁ]\.[А-ЯЁ]\.)')
 
 
 def parse_datetime(value: Any) -> Optional[datetime]:
@@ -28,6 +36,16 @@ def parse_datetime(value: Any) -> Optional[datetime]:
         return None
 
 
+def public_root_hash(public_root_url: str) -> str:
+    """
+    Короткий хэш публичной ссылки для ключей Redis
+
+    :param public_root_url: публичная корневая ссылка папки на диске
+    :return: первые 12 символов sha256
+    """
+    return sha256(public_root_url.encode()).hexdigest()[:12]
+
+
 def build_public_file_url(file_path: str, public_root_url: str) -> str:
     """
     Построение публичной ссылки Яндекс.Диска на файл
@@ -53,26 +71,23 @@ def extract_subject_from_path(path: str) -> Optional[str]:
     """
     Извлечение кода предмета из пути к файлу
 
-    Ищет в сегментах пути известные коды предметов из маппинга SUBJECTS.
+    Ищет в сегментах пути предметы из маппинга SUBJECTS: по ключу, отображаемому имени или
+    псевдониму (SUBJECT_ALIASES и настройка SUBJECT_ALIASES), без учёта регистра и знаков.
     Поиск идёт в обратном порядке (от конца к началу) для предпочтения более специфичных совпадений.
 
     :param path: путь к файлу на диске (например, "/1 курс/МА/БКНАД252/file.mp4")
-    :return: код предмета (имя папки) если найдено, иначе None
+    :return: код предмета (ключ SUBJECTS) если найдено, иначе None
 
     :example:
         /// extract_subject_from_path("/1 курс/МА/Лекция/file.mp4")
         "МА"
+        /// extract_subject_from_path("/1 курс/Мат. анализ 2025/Лекция/file.mp4")
+        "МА"
     """
     try:
-        # Разбиваем путь на сегменты и ищем известный предмет
-        segments = [s for s in path.replace("\\", "/").split("/") if s]
-        for segment in reversed(segments):
-            if segment in SUBJECTS:
-                return segment
+        return get_subject_matcher().match_path(path)
     except Exception:
-        pass
-
-    return None
+        return None
 
 
 def extract_topic_from_path(path: str) -> Optional[str]:
@@ -114,9 +129,8 @@ def extract_group_from_path(path: str) -> Optional[StudyGroups]:
     """
     try:
         segments = [s for s in path.replace("\\", "/").split("/") if s]
-        values = {g for g in StudyGroups}
         for segment in segments:
-            if segment in values:
+            if segment in STUDY_GROUP_VALUES:
                 # Вернём enum по значению
                 return StudyGroups(segment)
     except Exception:
@@ -139,9 +153,8 @@ def extract_group_raw_from_path(path: str) -> Optional[str]:
     "БКНАД999" Даже если не в enum StudyGroups
     """
     segments = [s for s in path.replace("\\", "/").split("/") if s]
-    pattern = re.compile(r"^БКНАД\d{3}$", re.IGNORECASE)
     for segment in segments:
-        if pattern.match(segment):
+        if GROUP_RAW_PATTERN.match(segment):
             return segment
     return None
 
@@ -159,10 +172,9 @@ def extract_teacher_from_filename(filename: str) -> Optional[str]:
         /// extract_teacher_from_filename("Лобода А.А. 2025-10-15T08-08-19Z.mp4")
         "Лобода А.А."
     """
-    # Паттерн: Фамилия И.О. (кириллица + точки)
+    # Паттерн TEACHER_PATTERN: Фамилия И.О. (кириллица + точки)
     # Примеры: "Лобода А.А.", "Медведь Н.Ю.", "Овчинников С.А."
-    pattern = r'^([А-ЯЁа-яё]+\s+[А-ЯЁ]\.[А-ЯЁ]\.)'
-    match = re.match(pattern, filename)
+    match = TEACHER_PATTERN.match(filename)
 
     if match:
         return match.group(1).strip()
@@ -172,6 +184,21 @@ def extract_teacher_from_filename(filename: str) -> Optional[str]:
 
 # -------------------- Расширенный парсинг даты/времени --------------------
 
+# Форматы по приоритету: паттерн и порядок групп (год, месяц, день), затем часы, минуты, секунды.
+# Паттерны отдельные: у общего паттерна с альтернативами в каждой позиции совпадает только одна
+# альтернатива, и первое совпадение формата могло бы отличаться от отдельного search
+_DATE_PATTERNS = (
+    # 1) ISO-подобный: 2025-10-15T08-08-19Z, 2025-10-15 08:08, 2025-10-15_08.08.19
+    (re.compile(r'(\d{4})-(\d{2})-(\d{2})(?:[T _](\d{2})[:\-.](\d{2})(?:[:\-.](\d{2}))?Z?)?'), (0, 1, 2)),
+    # 2) ДД.ММ.ГГГГ [время]
+    (re.compile(r'(\d{2})[.-](\d{2})[.-](\d{4})(?:[T _](\d{2})[.:\-](\d{2})(?:[.:\-](\d{2}))?)?'), (2, 1, 0)),
+    # 3) ГГГГ.ММ.ДД [время]
+    (re.compile(r'(\d{4})[.-](\d{2})[.-](\d{2})(?:[T _](\d{2})[.:\-](\d{2})(?:[.:\-](\d{2}))?)?'), (0, 1, 2)),
+)
+# Быстрая проверка: в дате не меньше двух цифр подряд, остальные сегменты отсекаются без разбора
+_HAS_DIGITS = re.compile(r'\d\d')
+
+
 def _try_build_datetime(year: int, month: int, day: int, hour: int | None, minute: int | None, second: int | None) -> Optional[datetime]:
     try:
         return datetime(year, month, day, hour or 0, minute or 0, second or 0)
@@ -179,54 +206,36 @@ def _try_build_datetime(year: int, month: int, day: int, hour: int | None, minut
         return None
 
 
+@lru_cache(maxsize=16384)
 def _extract_datetime_from_text(text: str) -> Optional[datetime]:
     """
     Универсальный поиск даты/времени в тексте по нескольким распространённым форматам.
 
-    Поддерживаемые форматы (время необязательно):
+    Поддерживаемые форматы (время необязательно), по приоритету:
     - YYYY-MM-DD[ T|_ ]HH[:|.|-]MM([:|.|-]SS)?(Z)?
     - YYYY-MM-DD
     - DD.MM.YYYY[ T|_ ]HH[:|.|-]MM([:|.|-]SS)?
     - DD.MM.YYYY
     - YYYY.MM.DD[ T|_ ]HH[:|.|-]MM([:|.|-]SS)?
     - YYYY.MM.DD
+
+    Берётся первое совпадение каждого формата; если из него не собрать дату (например,
+    месяц 13), проверяется следующий формат. Паттерны скомпилированы заранее, текст без двух
+    цифр подряд не разбирается, результат кэшируется по строке: одни и те же папки и имена
+    файлов встречаются в каждом обходе.
     """
-    if not text:
+    if not text or not _HAS_DIGITS.search(text):
         return None
 
-    # 1) ISO-подобный: 2025-10-15T08-08-19Z, 2025-10-15 08:08, 2025-10-15_08.08.19
-    iso_like = re.search(r'(\d{4})-(\d{2})-(\d{2})(?:[T _](\d{2})[:\-.](\d{2})(?:[:\-.](\d{2}))?Z?)?', text)
-    if iso_like:
-        y, m, d = int(iso_like.group(1)), int(iso_like.group(2)), int(iso_like.group(3))
-        hh = int(iso_like.group(4)) if iso_like.group(4) else None
-        mm = int(iso_like.group(5)) if iso_like.group(5) else None
-        ss = int(iso_like.group(6)) if iso_like.group(6) else None
-        dt = _try_build_datetime(y, m, d, hh, mm, ss)
-        if dt:
-            return dt
-
-    # 2) ДД.ММ.ГГГГ [время]
-    dmy = re.search(r'(\d{2})[.-](\d{2})[.-](\d{4})(?:[T _](\d{2})[.:\-](\d{2})(?:[.:\-](\d{2}))?)?', text)
-    if dmy:
-        d, m, y = int(dmy.group(1)), int(dmy.group(2)), int(dmy.group(3))
-        hh = int(dmy.group(4)) if dmy.group(4) else None
-        mm = int(dmy.group(5)) if dmy.group(5) else None
-        ss = int(dmy.group(6)) if dmy.group(6) else None
-        dt = _try_build_datetime(y, m, d, hh, mm, ss)
-        if dt:
-            return dt
-
-    # 3) ГГГГ.ММ.ДД [время]
-    ymd_dots = re.search(r'(\d{4})[.-](\d{2})[.-](\d{2})(?:[T _](\d{2})[.:\-](\d{2})(?:[.:\-](\d{2}))?)?', text)
-    if ymd_dots:
-        y, m, d = int(ymd_dots.group(1)), int(ymd_dots.group(2)), int(ymd_dots.group(3))
-        hh = int(ymd_dots.group(4)) if ymd_dots.group(4) else None
-        mm = int(ymd_dots.group(5)) if ymd_dots.group(5) else None
-        ss = int(ymd_dots.group(6)) if ymd_dots.group(6) else None
-        dt = _try_build_datetime(y, m, d, hh, mm, ss)
-        if dt:
-            return dt
-
+    for pattern, order in _DATE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            groups = match.groups()
+            y, m, d = (int(groups[i]) for i in order)
+            hh, mm, ss = (int(g) if g else None for g in groups[3:])
+            dt = _try_build_datetime(y, m, d, hh, mm, ss)
+            if dt:
+                return dt
     return None
 
 
@@ -264,3 +273,4 @@ def extract_date_from_path(path: str) -> Optional[datetime]:
         if dt:
             return dt
     return None
+
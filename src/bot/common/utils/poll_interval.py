@@ -0,0 +1,95 @@
+"""Адаптивный интервал опроса Я.Диска."""
+from datetime import datetime, time, timedelta
+
+from bot.common.utils.formatting import str_to_time
+
+
+def parse_hour_ranges(value: str | None) -> list[tuple[time, time]]:
+    """
+    Парсинг списка интервалов времени суток
+
+    :param value: строка вида "9-12,15:30-19" (часы или HH:MM), пустая - без интервалов
+    :return: список пар (начало, конец); некорректные элементы пропускаются
+
+    :example:
+        /// parse_hour_ranges("9-12,15:30-19")
+        [(time(9, 0), time(12, 0)), (time(15, 30), time(19, 0))]
+    """
+    ranges: list[tuple[time, time]] = []
+    for part in (value or "").split(","):
+        if "-" not in part:
+            continue
+        raw_start, raw_end = (p.strip() for p in part.split("-", 1))
+        start = str_to_time(raw_start if ":" in raw_start else f"{raw_start}:00", time.max)
+        end = str_to_time(raw_end if ":" in raw_end else f"{raw_end}:00", time.max)
+        if start == time.max or end == time.max:
+            continue
+        ranges.append((start, end))
+    return ranges
+
+
+class AdaptivePollInterval:
+    """
+    Интервал опроса по наблюдаемой частоте изменений
+
+    - после изменений (и ещё hot_period секунд) и в часы загрузок - минимальный интервал;
+    - без изменений интервал растёт от базового в backoff_factor раз за цикл до максимума.
+    """
+
+    def __init__(
+        self,
+        base: int,
+        minimum: int,
+        maximum: int,
+        backoff_factor: float = 1.5,
+        hot_period: int = 3600,
+        upload_hours: str | None = None,
+    ):
+        self.minimum = max(1, min(minimum, base))
+        self.maximum = max(base, maximum)
+        self.base = base
+        self.backoff_factor = max(1.0, backoff_factor)
+        self.hot_period = timedelta(seconds=hot_period)
+        self.upload_hours = parse_hour_ranges(upload_hours)
+
+        self.current: float = float(base)
+        self.reason: str = "базовый интервал"
+        self.last_change_at: datetime | None = None
+        self.idle_cycles = 0
+
+    def in_upload_hours(self, now: datetime) -> bool:
+        """Попадает ли время в часы загрузок (интервалы через полночь поддерживаются)"""
+        t = now.time()
+        for start, end in self.upload_hours:
+            if start <= end and start <= t < end:
+                return True
+            if start > end and (t >= start or t < end):
+                return True
+        return False
+
+    def next(self, changes: int, now: datetime | None = None) -> float:
+        """
+        Рассчитать интервал до следующего опроса
+
+        :param changes: сколько изменений нашёл последний цикл
+        :param now: текущее время (для тестов)
+        :return: интервал в секундах
+        """
+        now = now or datetime.now()
+        if changes > 0:
+            self.last_change_at = now
+            self.idle_cycles = 0
+        else:
+            self.idle_cycles += 1
+
+        if changes > 0:
+            self.current, self.reason = float(self.minimum), f"найдено изменений: {changes}"
+        elif self.last_change_at and now - self.last_change_at < self.hot_period:
+            self.current, self.reason = float(self.minimum), "недавние изменения"
+        elif self.in_upload_hours(now):
+            self.current, self.reason = float(self.minimum), "часы загрузок"
+        else:
+            grown = max(float(self.base), self.current * self.backoff_factor) if self.idle_cycles > 1 else float(self.base)
+            self.current = min(float(self.maximum), grown)
+            self.reason = f"изменений нет {self.idle_cycles} цикл(ов)"
+        return self.current
@@ -0,0 +1,172 @@
+"""Распознавание папок предметов: префиксное дерево по словам названий и псевдонимов."""
+import re
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from bot.common.logs import logger
+from bot.domain.entities.mappings import SUBJECT_ALIASES, SUBJECTS
+
+# Слово - буквы подряд или цифры подряд: "АиСД2" -> ("аисд", "2"), "Мат. анализ" -> ("мат", "анализ")
+_TOKEN = re.compile(r"[^\W\d_]+|\d+")
+_END = ""  # Метка конца названия в узле дерева (пустого слова не бывает)
+
+
+def tokenize(text: str) -> tuple[str, ...]:
+    """
+    Нормализованные слова названия: нижний регистр, ё -> е, без знаков препинания
+
+    :example:
+        /// tokenize("Мат. Анализ-2")
+        ("мат", "анализ", "2")
+    """
+    return tuple(_TOKEN.findall(text.lower().replace("ё", "е")))
+
+
+class SubjectMatcher:
+    """
+    Поиск предмета в названии папки за один проход по её словам
+
+    Названия предметов (ключи и отображаемые имена SUBJECTS) и псевдонимы собираются в
+    префиксное дерево по словам. Для каждого слова сегмента дерево проходится, пока слова
+    совпадают; побеждает самое длинное совпадение. Стоимость зависит от длины сегмента,
+    а не от числа предметов. Точное совпадение с ключом проверяется первым.
+
+    В пути нестрогое совпадение не меняет уже найденный выше предмет: папка "Python" внутри
+    "Машинное обучение 1 2025" или "Ма" внутри "МА2" предмет не меняет (см. match_next).
+
+    :param subjects: ключи предметов -> отображаемые имена (SUBJECTS)
+    :param aliases: ключ предмета -> другие названия папки
+    """
+
+    def __init__(self, subjects: dict[str, str], aliases: dict[str, Iterable[str]] | None = None):
+        self.subjects = subjects
+        self._trie: dict = {}
+        # Ключи важнее отображаемых имён, имена важнее псевдонимов: уже занятое название не перезаписывается
+        for key in subjects:
+            self._add(key, key)
+        for key, display in subjects.items():
+            self._add(display, key)
+        for key, names in (aliases or {}).items():
+            if key not in subjects:
+                logger.warning(f"Псевдонимы для неизвестного предмета {key!r} пропущены")
+                continue
+            for name in names:
+                self._add(name, key)
+        self.match_segment = lru_cache(maxsize=4096)(self._match_segment)
+
+    def _add(self, name: str, key: str) -> None:
+        tokens = tokenize(name)
+        if not tokens:
+            return
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node.setdefault(_END, key)
+
+    def _match_segment(self, segment: str) -> Optional[str]:
+        """
+        Предмет по названию одной папки
+
+        :param segment: имя папки (например, "Мат. анализ 2025")
+        :return: ключ SUBJECTS или None
+
+        :example:
+            /// matcher.match_segment("МА 2025")
+            "МА"
+        """
+        if segment in self.subjects:
+            return segment
+        tokens = tokenize(segment)
+        best: Optional[str] = None
+        best_len = 0
+        for start in range(len(tokens)):
+            node = self._trie
+            for pos in range(start, len(tokens)):
+                node = node.get(tokens[pos])
+                if node is None:
+                    break
+                key = node.get(_END)
+                if key is not None and pos - start + 1 > best_len:
+                    best, best_len = key, pos - start + 1
+        return best
+
+    def match_next(self, segment: str, subject: Optional[str]) -> Optional[str]:
+        """
+        Предмет директории по предмету родителя и имени папки
+
+        Точный ключ в имени папки заменяет предмет родителя. Нестрогое совпадение (по имени,
+        псевдониму или словам) используется, только пока предмет выше по пути не найден.
+
+        :param segment: имя папки
+        :param subject: предмет родителя
+        :return: предмет директории
+
+        :example:
+            /// matcher.match_next("Python", "Машинное обучение 1")
+            "Машинное обучение 1"
+            /// matcher.match_next("МА", "Машинное обучение 1")
+            "МА"
+        """
+        if segment in self.subjects:
+            return segment
+        if subject is not None:
+            return subject
+        return self.match_segment(segment)
+
+    def match_path(self, path: str) -> Optional[str]:
+        """
+        Предмет по пути: ближайшая к файлу папка с точным ключом, иначе первая от корня папка,
+        в названии которой есть предмет
+
+        Имя файла сравнивается только точно: в нём фамилии, даты и другие слова,
+        которые не должны совпадать с короткими кодами предметов.
+
+        :param path: путь к файлу на диске
+        :return: ключ SUBJECTS или None
+
+        :example:
+            /// matcher.match_path("/1 курс/Мат. анализ 2025/Лекция/file.mp4")
+            "МА"
+            /// matcher.match_path("/3 курс/Машинное обучение 1/Семинар/Python/x.ipynb")
+            "Машинное обучение 1"
+            /// matcher.match_path("/2 курс/МА2/Ма/x")
+            "МА2"
+            /// matcher.match_path("/3 курс/Машинное обучение 1 2025/Python/x.ipynb")
+            "Машинное обучение 1"
+            /// matcher.match_path("/1 курс/Дискретка 2025/Алгебра логики/x.pdf")
+            "ДМ"
+        """
+        segments = [s for s in path.replace("\\", "/").split("/") if s]
+        if not segments:
+            return None
+        if segments[-1] in self.subjects:
+            return segments[-1]
+        subject = None
+        for segment in segments[:-1]:
+            subject = self.match_next(segment, subject)
+        return subject
+
+
+_matcher = SubjectMatcher(SUBJECTS, SUBJECT_ALIASES)
+
+
+def get_subject_matcher() -> SubjectMatcher:
+    """Текущий распознаватель предметов"""
+    return _matcher
+
+
+def configure_subject_aliases(aliases: dict[str, list[str]]) -> SubjectMatcher:
+    """
+    Добавить псевдонимы из настроек к встроенным (SUBJECT_ALIASES)
+
+    Вызывается при запуске, до разбора путей: результаты разбора папок кэшируются.
+
+    :param aliases: ключ предмета -> другие названия папки
+    :return: новый распознаватель
+    """
+    global _matcher
+    merged = {key: list(names) for key, names in SUBJECT_ALIASES.items()}
+    for key, names in aliases.items():
+        merged.setdefault(key, []).extend(names)
+    _matcher = SubjectMatcher(SUBJECTS, merged)
+    return _matcher
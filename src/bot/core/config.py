@@ -1,7 +1,7 @@
 from pathlib import Path
 
 from dotenv import load_dotenv
-from pydantic import SecretStr
+from pydantic import SecretStr, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 # Загружаем .env из корня проекта
@@ -26,15 +26,76 @@ class RedisConfig(BaseSettings):
 
 
 class YandexDiskConfig(BaseSettings):
-    PUBLIC_ROOT_URL: str
+    PUBLIC_ROOT_URL: str = ""
+    PUBLIC_ROOT_URLS: str = ""  # Несколько публичных папок через запятую (дополняют PUBLIC_ROOT_URL)
     POLL_INTERVAL: int = 600
+    POLL_INTERVAL_MIN: int = 120  # Интервал после изменений и в часы загрузок
+    POLL_INTERVAL_MAX: int = 3600  # Предел роста интервала, когда изменений нет
+    POLL_BACKOFF_FACTOR: float = 1.5  # Во сколько раз растёт интервал за цикл без изменений
+    POLL_HOT_PERIOD: int = 3600  # Сколько секунд после изменений держать минимальный интервал
+    POLL_UPLOAD_HOURS: str = ""  # Часы загрузок, например "9-12,15:30-21"
     HTTP_TIMEOUT: float = 10.0
+    CRAWL_CONCURRENCY: int = 8  # Сколько директорий запрашивать параллельно
+    CRAWL_FULL_RESYNC_EVERY: int = 96  # Каждый N-й цикл обходить всё дерево, включая холодные поддеревья
+    CRAWL_WARM_EVERY: int = 12  # Каждый N-й цикл листать тёплые поддеревья и полностью сверять горячие
+    CRAWL_HOT_DAYS: int = 14  # Поддерево с изменениями моложе стольких дней - горячее (листается каждый цикл)
+    CRAWL_WARM_DAYS: int = 180  # Изменения моложе стольких дней - тёплое, старше - холодное (архив)
+    CRAWL_CHECKPOINT_INTERVAL: float = 10.0  # Как часто сохранять фронт обхода для возобновления, с
+    CRAWL_FRONTIER_MAX_AGE: int = 3600  # Фронт старше этого (с) не возобновляется, обход начнётся с корня
+    CRAWL_TELEMETRY_CYCLES: int = 20  # Сколько последних циклов обхода хранить в телеметрии
+    CRAWL_TELEMETRY_TOP: int = 10  # Сколько самых медленных/больших директорий хранить за цикл
+    CRAWL_PRUNE_UNSUBSCRIBED: bool = True  # Не листать предметы и группы без подписчиков (кроме полного обхода)
+    ENQUEUE_BATCH_SIZE: int = 200  # Задач в пакете, который ставится в очередь во время обхода
+    ENQUEUE_FLUSH_INTERVAL: float = 2.0  # Неполный пакет уходит в очередь не позже чем через столько секунд
+    SNAPSHOT_DIR: str = "/data"  # Каталог снимков обхода для тёплого старта; пустой - снимки выключены
+    SNAPSHOT_MAX_AGE: int = 7 * 24 * 3600  # Снимок старше этого (с) не загружается, обход будет полным
+    SPOOL_DIR: str = "/data"  # Каталог очереди задач, не принятых Redis; пустой - такие задачи найдутся снова в следующем цикле
+    SPOOL_REPLAY_INTERVAL: float = 30.0  # Как часто пытаться дослать задачи с диска в Redis, с
+    BUNDLE_WINDOW: int = 900  # Файлы одной папки занятия, загруженные с перерывом до стольких секунд, - одно уведомление (ждёт конца загрузки); 0 - выключено
+    BUNDLE_MAX_FILES: int = 10  # Наибольшее число файлов в одном уведомлении
+    LEADER_LEASE_TTL: int = 30  # Срок аренды лидерства, с: за это время резерв заменит упавший экземпляр
+    SUBJECT_ALIASES: str = ""  # Доп. названия папок предметов: "МА=Мат. анализ|Матан;ЛА=Линал"
+
+    # Клиент API: ограничение частоты, повторы, предохранитель
+    HTTP_RATE_LIMIT: float = 10.0  # Запросов в секунду
+    HTTP_RATE_BURST: int = 20  # Запросов подряд без ожидания
+    HTTP_MAX_RETRIES: int = 5
+    HTTP_BACKOFF_BASE: float = 0.5  # Начальная задержка повтора, с
+    HTTP_BACKOFF_MAX: float = 30.0  # Максимальная задержка повтора, с
+    CIRCUIT_FAILURE_THRESHOLD: int = 10  # Запросов подряд, исчерпавших повторы, до размыкания цепи
+    CIRCUIT_RESET_TIMEOUT: float = 120.0  # Пауза после размыкания, с
 
     model_config = SettingsConfigDict(env_file=str(env_path), env_file_encoding="utf-8", extra="allow")
 
+    @property
+    def root_urls(self) -> list[str]:
+        """Все публичные папки для опроса, без повторов"""
+        urls = [self.PUBLIC_ROOT_URL, *self.PUBLIC_ROOT_URLS.split(",")]
+        return list(dict.fromkeys(u.strip() for u in urls if u.strip()))
+
+    @property
+    def subject_aliases(self) -> dict[str, list[str]]:
+        """Псевдонимы папок предметов из SUBJECT_ALIASES: ключ предмета -> названия"""
+        aliases: dict[str, list[str]] = {}
+        for item in self.SUBJECT_ALIASES.split(";"):
+            key, sep, names = item.partition("=")
+            if not sep or not key.strip():
+                continue
+            aliases.setdefault(key.strip(), []).extend(n.strip() for n in names.split("|") if n.strip())
+        return aliases
+
+    @model_validator(mode="after")
+    def _check_root_urls(self) -> "YandexDiskConfig":
+        if not self.root_urls:
+            raise ValueError("Нужно задать PUBLIC_ROOT_URL или PUBLIC_ROOT_URLS")
+        return self
+
 
 class NotificationsConfig(BaseSettings):
     """Настройки интервалов для уведомлений."""
     NOTIFICATION_CHECK_INTERVAL: int = 300  # периодичность проверки очереди и планировщика
+    NOTIFICATION_SEND_BATCH: int = 100  # сколько уведомлений отправлять за раз (ссылки запрашиваются на пакет)
+    DOWNLOAD_LINK_TTL: int = 1800  # сколько секунд ссылка на скачивание берётся из кэша (меньше её срока жизни)
+    DOWNLOAD_LINK_CONCURRENCY: int = 4  # сколько ссылок на скачивание запрашивать параллельно
 
     model_config = SettingsConfigDict(env_file=str(env_path), env_file_encoding="utf-8", extra="allow")
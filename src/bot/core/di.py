@@ -2,6 +2,7 @@ from collections.abc import AsyncIterator
 
 import aiohttp
 from aiogram import Bot
+from bot.application.services.download_links import DownloadLinkResolver
 from bot.application.services.long_poll import YandexDiskPollingService
 from bot.application.services.notification import NotificationService
 from bot.application.services.scheduler import NotificationScheduler
@@ -9,15 +10,28 @@ from bot.application.services.statistics import StatisticsService
 from bot.application.services.user import UserService
 from bot.application.widgets.time_picker import TimePicker
 from bot.core.config import BotConfig, RedisConfig, YandexDiskConfig, NotificationsConfig
+from bot.domain.clients.yandex_disk import YandexDiskClientInterface
 from bot.domain.entities.constants import DEFAULT_MINUTE_STEP
+from bot.domain.repositories.crawl import CrawlStateRepositoryInterface
+from bot.domain.repositories.lease import LeaseRepositoryInterface
+from bot.domain.repositories.manifest import ManifestRepositoryInterface
 from bot.domain.repositories.notification import NotificationRepositoryInterface
+from bot.domain.repositories.snapshot import CrawlSnapshotRepositoryInterface
+from bot.domain.repositories.spool import TaskSpoolRepositoryInterface
 from bot.domain.repositories.statistics import StatisticsRepositoryInterface
 from bot.domain.repositories.user import UserRepositoryInterface
+from bot.domain.services.download_links import DownloadLinkResolverInterface
 from bot.domain.services.notification import NotificationServiceInterface
 from bot.domain.services.scheduler import SchedulerServiceInterface
 from bot.domain.services.statistics import StatisticsServiceInterface
 from bot.domain.services.user import UserServiceInterface
+from bot.infrastructure.clients.yandex_disk import YandexDiskClient
+from bot.infrastructure.repositories.crawl import RedisCrawlStateRepository
+from bot.infrastructure.repositories.lease import RedisLeaseRepository
+from bot.infrastructure.repositories.manifest import RedisManifestRepository
 from bot.infrastructure.repositories.notification import RedisNotificationRepository
+from bot.infrastructure.repositories.snapshot import FileCrawlSnapshotRepository
+from bot.infrastructure.repositories.spool import FileTaskSpoolRepository
 from bot.infrastructure.repositories.statistics import RedisStatisticsRepository
 from bot.infrastructure.repositories.user import RedisUserRepository
 from dishka import AsyncContainer, Provider, Scope, provide
@@ -74,6 +88,20 @@ class InfrastructureProvider(Provider):
         async with aiohttp.ClientSession() as session:
             yield session
 
+    @provide(scope=Scope.APP)
+    def get_yandex_disk_client(self, http_session: aiohttp.ClientSession, config: YandexDiskConfig) -> YandexDiskClientInterface:
+        return YandexDiskClient(
+            http=http_session,
+            http_timeout=config.HTTP_TIMEOUT,
+            rate_limit=config.HTTP_RATE_LIMIT,
+            rate_burst=config.HTTP_RATE_BURST,
+            max_retries=config.HTTP_MAX_RETRIES,
+            backoff_base=config.HTTP_BACKOFF_BASE,
+            backoff_max=config.HTTP_BACKOFF_MAX,
+            failure_threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=config.CIRCUIT_RESET_TIMEOUT,
+        )
+
     @provide(scope=Scope.APP)
     def get_bot(self, config: BotConfig) -> Bot:
         return Bot(token=config.TOKEN.get_secret_value())
@@ -88,9 +116,29 @@ class RepositoryProvider(Provider):
     def get_notification_repository(self, redis: Redis, config: RedisConfig) -> NotificationRepositoryInterface:
         return RedisNotificationRepository(redis, key_prefix=config.REDIS_KEY_PREFIX)
 
+    @provide(scope=Scope.APP)
+    def get_manifest_repository(self, redis: Redis, config: RedisConfig) -> ManifestRepositoryInterface:
+        return RedisManifestRepository(redis, key_prefix=config.REDIS_KEY_PREFIX)
+
+    @provide(scope=Scope.APP)
+    def get_crawl_state_repository(self, redis: Redis, config: RedisConfig) -> CrawlStateRepositoryInterface:
+        return RedisCrawlStateRepository(redis, key_prefix=config.REDIS_KEY_PREFIX)
+
+    @provide(scope=Scope.APP)
+    def get_lease_repository(self, redis: Redis, config: RedisConfig) -> LeaseRepositoryInterface:
+        return RedisLeaseRepository(redis, key_prefix=config.REDIS_KEY_PREFIX)
+
+    @provide(scope=Scope.APP)
+    def get_snapshot_repository(self, config: YandexDiskConfig) -> CrawlSnapshotRepositoryInterface:
+        return FileCrawlSnapshotRepository(config.SNAPSHOT_DIR, max_age=config.SNAPSHOT_MAX_AGE)
+
+    @provide(scope=Scope.APP)
+    def get_task_spool_repository(self, config: YandexDiskConfig) -> TaskSpoolRepositoryInterface:
+        return FileTaskSpoolRepository(config.SPOOL_DIR)
+
     @provide(scope=Scope.APP)
     def get_statistics_repository(self, redis: Redis, rconf: RedisConfig, yconf: YandexDiskConfig) -> StatisticsRepositoryInterface:
-        return RedisStatisticsRepository(redis, key_prefix=rconf.REDIS_KEY_PREFIX, public_root_url=yconf.PUBLIC_ROOT_URL)
+        return RedisStatisticsRepository(redis, key_prefix=rconf.REDIS_KEY_PREFIX, public_root_urls=yconf.root_urls)
 
 
 class ServiceProvider(Provider):
@@ -118,14 +166,33 @@ class ServiceProvider(Provider):
     ) -> StatisticsServiceInterface:
         return StatisticsService(user_service, repo)
 
+    @provide(scope=Scope.APP)
+    def get_download_link_resolver(
+        self,
+        disk_client: YandexDiskClientInterface,
+        notifications_config: NotificationsConfig,
+    ) -> DownloadLinkResolverInterface:
+        return DownloadLinkResolver(
+            disk_client,
+            ttl=notifications_config.DOWNLOAD_LINK_TTL,
+            concurrency=notifications_config.DOWNLOAD_LINK_CONCURRENCY,
+        )
+
     @provide(scope=Scope.APP)
     def get_notification_scheduler(
         self,
         bot: Bot,
         notification_repository: NotificationRepositoryInterface,
+        link_resolver: DownloadLinkResolverInterface,
         notifications_config: NotificationsConfig,
     ) -> SchedulerServiceInterface:
-        return NotificationScheduler(bot, notification_repository, check_interval=notifications_config.NOTIFICATION_CHECK_INTERVAL)
+        return NotificationScheduler(
+            bot,
+            notification_repository,
+            check_interval=notifications_config.NOTIFICATION_CHECK_INTERVAL,
+            link_resolver=link_resolver,
+            send_batch_size=notifications_config.NOTIFICATION_SEND_BATCH,
+        )
 
     @provide(scope=Scope.APP)
     def get_polling_service(
@@ -133,8 +200,14 @@ class ServiceProvider(Provider):
         bot: Bot,
         user_service: UserServiceInterface,
         notification_service: NotificationServiceInterface,
+        manifest_repository: ManifestRepositoryInterface,
+        crawl_state_repository: CrawlStateRepositoryInterface,
+        lease_repository: LeaseRepositoryInterface,
+        snapshot_repository: CrawlSnapshotRepositoryInterface,
+        task_spool: TaskSpoolRepositoryInterface,
+        statistics_repository: StatisticsRepositoryInterface,
         config: YandexDiskConfig,
-        http_session: aiohttp.ClientSession,
+        disk_client: YandexDiskClientInterface,
         redis: Redis,
         redis_config: RedisConfig,
     ) -> YandexDiskPollingService:
@@ -142,12 +215,39 @@ class ServiceProvider(Provider):
             bot=bot,
             user_service=user_service,
             notification_service=notification_service,
-            http=http_session,
+            manifest_repository=manifest_repository,
+            crawl_state_repository=crawl_state_repository,
+            lease_repository=lease_repository,
+            snapshot_repository=snapshot_repository,
+            task_spool=task_spool,
+            statistics_repository=statistics_repository,
+            disk_client=disk_client,
             redis=redis,
-            public_root_url=config.PUBLIC_ROOT_URL,
+            public_root_urls=config.root_urls,
             poll_interval=config.POLL_INTERVAL,
+            poll_interval_min=config.POLL_INTERVAL_MIN,
+            poll_interval_max=config.POLL_INTERVAL_MAX,
+            poll_backoff_factor=config.POLL_BACKOFF_FACTOR,
+            poll_hot_period=config.POLL_HOT_PERIOD,
+            poll_upload_hours=config.POLL_UPLOAD_HOURS,
             http_timeout=config.HTTP_TIMEOUT,
             key_prefix=redis_config.REDIS_KEY_PREFIX,
+            crawl_concurrency=config.CRAWL_CONCURRENCY,
+            full_resync_every=config.CRAWL_FULL_RESYNC_EVERY,
+            warm_every=config.CRAWL_WARM_EVERY,
+            crawl_hot_days=config.CRAWL_HOT_DAYS,
+            crawl_warm_days=config.CRAWL_WARM_DAYS,
+            crawl_checkpoint_interval=config.CRAWL_CHECKPOINT_INTERVAL,
+            crawl_frontier_max_age=config.CRAWL_FRONTIER_MAX_AGE,
+            crawl_prune_unsubscribed=config.CRAWL_PRUNE_UNSUBSCRIBED,
+            crawl_telemetry_cycles=config.CRAWL_TELEMETRY_CYCLES,
+            crawl_telemetry_top=config.CRAWL_TELEMETRY_TOP,
+            enqueue_batch_size=config.ENQUEUE_BATCH_SIZE,
+            enqueue_flush_interval=config.ENQUEUE_FLUSH_INTERVAL,
+            spool_replay_interval=config.SPOOL_REPLAY_INTERVAL,
+            bundle_window=config.BUNDLE_WINDOW,
+            bundle_max_files=config.BUNDLE_MAX_FILES,
+            leader_lease_ttl=config.LEADER_LEASE_TTL,
         )
 
 
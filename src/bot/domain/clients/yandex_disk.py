@@ -0,0 +1,74 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from bot.domain.entities.crawl import CrawlStats
+
+
+class YandexDiskError(Exception):
+    """Запрос к API Я.Диска не удался (после всех повторов)"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class YandexDiskUnavailableError(YandexDiskError):
+    """API Я.Диска временно недоступно: цепь разомкнута, запросы не отправляются"""
+
+    def __init__(self, retry_in: float):
+        super().__init__(f"API Я.Диска недоступно, повтор через {retry_in:.0f} с")
+        self.retry_in = retry_in
+
+
+class YandexDiskClientInterface(ABC):
+    """Клиент публичного API Я.Диска"""
+
+    @property
+    @abstractmethod
+    def retry_in(self) -> float:
+        """
+        Через сколько секунд API снова можно опрашивать (0 - можно сейчас).
+
+        :return: секунды до закрытия цепи
+        """
+
+    @abstractmethod
+    async def list_public_resources(
+        self,
+        public_key: str,
+        path: str | None,
+        *,
+        limit: int,
+        offset: int,
+        sort: str | None = None,
+        fields: str | None = None,
+        stats: CrawlStats | None = None,
+    ) -> bytes:
+        """
+        Получить страницу листинга публичной папки.
+
+        :param public_key: публичная ссылка корневой папки
+        :param path: путь внутри публичной папки (None - корень)
+        :param limit: размер страницы
+        :param offset: смещение
+        :param sort: поле сортировки (например, "-modified")
+        :param fields: проекция полей ответа
+        :param stats: метрики обхода для учёта запросов и повторов
+        :return: тело ответа (JSON)
+
+        :raise: YandexDiskUnavailableError: если цепь разомкнута
+        :raise: YandexDiskError: если запрос не удался после повторов
+        """
+
+    @abstractmethod
+    async def get_public_download_link(self, public_key: str, path: str) -> str:
+        """
+        Получить временную ссылку на скачивание файла из публичной папки.
+
+        :param public_key: публичная ссылка корневой папки
+        :param path: путь к файлу внутри публичной папки
+        :return: ссылка на скачивание (живёт ограниченное время)
+
+        :raise: YandexDiskUnavailableError: если цепь разомкнута
+        :raise: YandexDiskError: если запрос не удался после повторов или ссылки нет в ответе
+        """
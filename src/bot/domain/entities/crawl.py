@@ -0,0 +1,124 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from bot.domain.entities.manifest import ManifestEntry
+from bot.domain.entities.mappings import CrawlTier
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class CrawlStats(BaseModel):
+    """Метрики одного обхода публичной папки"""
+
+    started_at: datetime = Field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+    duration: float = 0.0  # Длительность обхода в секундах
+
+    directories: int = 0  # Просмотрено директорий
+    files: int = 0  # Найдено файлов
+    requests: int = 0  # HTTP-запросов к API
+    errors: int = 0  # Ошибок при запросах
+    retries: int = 0  # Повторных запросов (429, 5xx, сеть)
+    throttled: int = 0  # Ответов 429 Too Many Requests
+
+    full_resync: bool = False  # Полный обход без пропуска неизменных поддеревьев
+    skipped_directories: int = 0  # Поддеревьев пропущено по отпечатку
+    pruned_directories: int = 0  # Поддеревьев не обойдено: их файлы никому не нужны
+    requests_saved: int = 0  # Запросов сэкономлено пропуском поддеревьев
+    partial_directories: int = 0  # Директорий, листинг которых остановлен на водяной метке
+    tier_requests: dict[CrawlTier, int] = Field(default_factory=dict)  # Страниц листинга по уровням частоты
+    tier_directories: dict[CrawlTier, int] = Field(default_factory=dict)  # Директорий по уровням после обхода
+
+
+class DirectoryTelemetry(BaseModel):
+    """Метрики листинга одной директории за обход"""
+
+    path: str
+    tier: Optional[CrawlTier] = None
+    pages: int = 0  # Запрошено страниц
+    items: int = 0  # Получено элементов (файлов и поддиректорий)
+    bytes: int = 0  # Объём ответов API
+    elapsed: float = 0.0  # Суммарное время запросов, с (с повторами и ожиданием лимита)
+    max_latency: float = 0.0  # Самый долгий запрос страницы, с
+    error: Optional[str] = None  # Ошибка, на которой листинг прервался
+
+
+class CrawlTelemetry(BaseModel):
+    """Телеметрия одного цикла обхода корневой папки: сводка и самые показательные директории"""
+
+    started_at: datetime = Field(default_factory=datetime.now)
+    duration: float = 0.0
+    full_resync: bool = False
+    complete: bool = False
+    directories: int = 0
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    throttled: int = 0
+    bytes: int = 0
+    slowest: list[DirectoryTelemetry] = Field(default_factory=list)  # По elapsed, по убыванию
+    largest: list[DirectoryTelemetry] = Field(default_factory=list)  # По items, по убыванию
+    failed: list[DirectoryTelemetry] = Field(default_factory=list)  # Директории с ошибками
+
+    @property
+    def error_rate(self) -> float:
+        """Доля неудачных запросов (ошибок и повторов) от всех запросов"""
+        return (self.errors + self.retries) / self.requests if self.requests else 0.0
+
+
+class DirectoryState(BaseModel):
+    """Состояние директории с прошлого обхода"""
+
+    path: str
+    modified: Optional[str] = None  # modified директории из листинга родителя
+    fingerprint: Optional[str] = None  # Хэш поддерева: свой листинг + отпечатки поддиректорий
+    pages: int = 0  # Сколько запросов стоит полный листинг самой директории
+    requests: int = 0  # Сколько запросов стоит листинг всего поддерева
+    watermark: Optional[str] = None  # Самый свежий modified среди элементов директории
+    last_change: Optional[str] = None  # Самый свежий modified во всём поддереве
+    tier: Optional[CrawlTier] = None  # Уровень частоты обхода по last_change
+
+
+class FrontierDirectory(BaseModel):
+    """Директория, листинг которой завершён в прерванном обходе"""
+
+    path: str
+    modified: Optional[str] = None
+    digest: str
+    children: list[str] = Field(default_factory=list)
+    pages: int = 0
+    watermark: Optional[str] = None
+    partial: bool = False
+    files: list[dict[str, Any]] = Field(default_factory=list)  # Уже отданные файлы директории
+
+
+class FrontierPages(BaseModel):
+    """Прогресс постраничного листинга директории"""
+
+    path: str
+    offset: int  # Смещение следующей страницы
+    items: list[dict[str, Any]] = Field(default_factory=list)  # Элементы уже полученных страниц
+
+
+class CrawlFrontier(BaseModel):
+    """Фронт прерванного обхода: с него обход продолжается после перезапуска"""
+
+    saved_at: datetime = Field(default_factory=datetime.now)
+    full_resync: bool = False
+    stats: CrawlStats = Field(default_factory=CrawlStats)
+    pending: dict[str, Optional[str]] = Field(default_factory=dict)  # Необойдённые директории: path -> modified
+    skipped: list[str] = Field(default_factory=list)
+    partial: list[str] = Field(default_factory=list)
+    directories: dict[str, FrontierDirectory] = Field(default_factory=dict)  # При сохранении - только новые
+    pages: dict[str, FrontierPages] = Field(default_factory=dict)
+
+
+class CrawlSnapshot(BaseModel):
+    """Снимок результатов полного обхода на диске: с него стартует обход, если в Redis пусто"""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)  # ManifestEntry - не pydantic-модель
+
+    public_root_url: str
+    saved_at: datetime = Field(default_factory=datetime.now)
+    checkpoint: Optional[datetime] = None  # Начало обхода, по которому снят снимок
+    manifest: dict[str, ManifestEntry] = Field(default_factory=dict)  # resource_id -> запись
+    directories: dict[str, DirectoryState] = Field(default_factory=dict)  # path -> состояние
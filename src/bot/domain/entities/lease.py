@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class LeaderLease(BaseModel):
+    """Аренда лидерства: только её держатель опрашивает диск"""
+
+    holder: str  # Идентификатор экземпляра бота (хост:pid:суффикс)
+    token: int  # Токен ограждения: растёт с каждым новым захватом аренды
+    acquired_at: datetime  # Когда аренда захвачена
+    renewed_at: datetime  # Когда аренда последний раз продлена
+    ttl_ms: Optional[int] = None  # Сколько миллисекунд аренда ещё действует (по данным Redis)
+
+
+class WriteFence(BaseModel):
+    """Ограждение записи: запись принимается, только пока аренда держит этот токен"""
+
+    lease_key: str  # Ключ аренды в Redis
+    token: int  # Токен ограждения писателя
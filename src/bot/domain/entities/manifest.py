@@ -0,0 +1,151 @@
+import sys
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from bot.domain.entities.mappings import FileChangeKind
+
+
+def split_path(path: str) -> tuple[str, str]:
+    """
+    Путь файла -> (директория, имя); строка директории интернируется
+
+    Файлы одной папки (и записи манифеста с прошлого обхода) ссылаются на один объект строки
+    директории, а не хранят полный путь каждый.
+
+    :example:
+        /// split_path("/1 курс/МА/Лекция/file.mp4")
+        ("/1 курс/МА/Лекция", "file.mp4")
+    """
+    idx = path.rfind("/")
+    if idx < 0:
+        return "", path
+    return sys.intern(path[:idx]), path[idx + 1:]
+
+
+@dataclass(slots=True)
+class FileRecord:
+    """
+    Файл из листинга API: компактная запись вместо словаря
+
+    Обходчик превращает элементы листинга в записи сразу после запроса, дальше по конвейеру
+    (манифест, задачи на уведомление) идут только они.
+    """
+
+    directory: str  # Интернированный путь директории
+    name: str
+    resource_id: str  # resource_id файла, а без него - путь
+    md5: Optional[str] = None
+    modified: Optional[str] = None
+    created: Optional[str] = None
+    size: Optional[int] = None
+
+    @property
+    def path(self) -> str:
+        return f"{self.directory}/{self.name}"
+
+    @classmethod
+    def from_item(cls, item: dict) -> "FileRecord":
+        """Создание записи из элемента листинга API Я.Диска"""
+        path = item.get("path", "")
+        directory, name = split_path(path)
+        return cls(
+            directory=directory,
+            name=name,
+            resource_id=item.get("resource_id") or path,
+            md5=item.get("md5"),
+            modified=item.get("modified"),
+            created=item.get("created"),
+            size=item.get("size"),
+        )
+
+    def to_item(self) -> dict[str, Any]:
+        """Элемент в формате листинга API (для сохранения фронта обхода)"""
+        return {
+            "path": self.path,
+            "name": self.name,
+            "type": "file",
+            "resource_id": self.resource_id,
+            "md5": self.md5,
+            "modified": self.modified,
+            "created": self.created,
+            "size": self.size,
+        }
+
+
+@dataclass(slots=True, init=False)
+class ManifestEntry:
+    """Запись манифеста файлов: то, что известно о файле с прошлого обхода"""
+
+    resource_id: str
+    directory: str  # Интернированный путь директории
+    name: str
+    md5: Optional[str]
+    modified: Optional[str]
+    size: Optional[int]  # Размер в байтах (для статистики диска)
+
+    def __init__(
+        self,
+        resource_id: str,
+        path: str = "",
+        md5: Optional[str] = None,
+        modified: Optional[str] = None,
+        size: Optional[int] = None,
+    ):
+        self.resource_id = resource_id
+        self.directory, self.name = split_path(path)
+        self.md5 = md5
+        self.modified = modified
+        self.size = size
+
+    @property
+    def path(self) -> str:
+        return f"{self.directory}/{self.name}"
+
+    @classmethod
+    def from_item(cls, item: dict) -> "ManifestEntry":
+        """Создание записи из элемента листинга API Я.Диска"""
+        path = item.get("path", "")
+        return cls(
+            resource_id=item.get("resource_id") or path,
+            path=path,
+            md5=item.get("md5"),
+            modified=item.get("modified"),
+            size=item.get("size"),
+        )
+
+    @classmethod
+    def from_record(cls, record: FileRecord) -> "ManifestEntry":
+        """Создание записи из файла листинга: строки директории и имени не копируются"""
+        entry = cls.__new__(cls)
+        entry.resource_id = record.resource_id
+        entry.directory = record.directory
+        entry.name = record.name
+        entry.md5 = record.md5
+        entry.modified = record.modified
+        entry.size = record.size
+        return entry
+
+    def to_dict(self) -> dict[str, Any]:
+        """Поля записи без resource_id (он - ключ манифеста)"""
+        return {"path": self.path, "md5": self.md5, "modified": self.modified, "size": self.size}
+
+    def same_content(self, other: "ManifestEntry") -> bool:
+        """Совпадает ли содержимое файла (по md5, а без него - по modified)"""
+        if self.md5 and other.md5:
+            return self.md5 == other.md5
+        return self.modified == other.modified
+
+
+@dataclass(slots=True)
+class FileChange:
+    """Событие изменения файла, найденное сравнением с манифестом"""
+
+    kind: FileChangeKind
+    entry: ManifestEntry
+    previous: Optional[ManifestEntry] = None
+    notify: bool = True  # False - запись манифеста обновляется без уведомления (метаданные, миграция)
+
+    @property
+    def moved(self) -> bool:
+        """Файл с тем же resource_id сменил путь (перемещён или переименован)"""
+        return self.previous is not None and self.previous.path != self.entry.path
@@ -38,6 +38,19 @@ class NotificationStatus(StrEnum):
     PENDING = "pending"  # Ожидает отправки
     SENT = "sent"  # Отправлено
     FAILED = "failed"  # Ошибка отправки
+    CANCELLED = "cancelled"  # Отменено: файл удалён или заменён до отправки
+
+
+class FileChangeKind(StrEnum):
+    ADDED = "added"  # Новый файл
+    CHANGED = "changed"  # Изменилось содержимое (md5/modified)
+    REMOVED = "removed"  # Файл пропал с диска
+
+
+class CrawlTier(StrEnum):
+    HOT = "hot"  # Недавние изменения: листается каждый цикл
+    WARM = "warm"  # Изменения были не так давно: листается раз в несколько циклов
+    COLD = "cold"  # Архив: листается только при полном обходе
 
 
 SUBJECTS = {
@@ -63,6 +76,19 @@ SUBJECTS = {
     "ДОЦ Психология": "ДОЦ Психология",
 }
 
+# Другие названия папок предметов (ключ - ключ SUBJECTS). Названия из SUBJECTS распознаются и так;
+# регистр, ё/е, знаки препинания и пробел между словом и числом не важны ("Мат. анализ 2" = "Мат анализ2")
+SUBJECT_ALIASES: dict[str, list[str]] = {
+    "ДМ": ["Дискра", "Дискретка"],
+    "ЛА": ["Линал", "Линейная алгебра и геометрия"],
+    "МА": ["Мат анализ", "Матан"],
+    "МА2": ["Мат анализ 2", "Матан 2"],
+    "Программирование на Python": ["Python", "Питон"],
+    "АиСД2": ["Алгоритмы 2"],
+    "Теория вероятностей": ["Тервер", "ТВиМС"],
+    "Мат статистика 2": ["Матстат 2"],
+}
+
 TOPICS = {
     "Лекция": "Лекция",
     "Семинар": "Семинар",
@@ -5,6 +5,23 @@ from bot.domain.entities.mappings import NotificationStatus, StudyGroups
 from pydantic import BaseModel, Field
 
 
+class BundledFile(BaseModel):
+    """Файл задачи: основной или один из файлов пакета"""
+
+    file_name: str
+    file_path: str
+    public_url: Optional[str] = None
+    download_url: Optional[str] = None
+    md5: Optional[str] = None
+    resource_id: Optional[str] = None
+    modified_iso: Optional[str] = None
+
+    @property
+    def file_id(self) -> str:
+        """Ключ файла: resource_id, а без него - путь (как у записи манифеста)"""
+        return self.resource_id or self.file_path
+
+
 class NotificationTask(BaseModel):
     """Задача на рассылку, формируемая лонг-поллом.
     Содержит минимум данных о найденном файле; маршрутизацию по курсам/группам и фильтры
@@ -28,14 +45,45 @@ class NotificationTask(BaseModel):
     file_name: str
     file_path: str
     public_url: Optional[str] = None  # Прямая ссылка на просмотр на Яндекс.Диске
-    download_url: Optional[str] = None  # Временная ссылка для скачивания
+    public_root_url: Optional[str] = None  # Публичная корневая папка, в которой найден файл
+    download_url: Optional[str] = None  # Временная ссылка для скачивания (подставляется при отправке)
 
     md5: Optional[str] = None
     resource_id: Optional[str] = None
     modified_iso: Optional[str] = None
 
+    # Остальные файлы одной загрузки (задача-пакет): та же папка, предмет, группа и дата
+    bundle: list[BundledFile] = Field(default_factory=list)
+
     created_at: datetime = Field(default_factory=lambda: datetime.now())
 
+    @property
+    def files(self) -> list[BundledFile]:
+        """Все файлы задачи: основной, затем файлы пакета"""
+        main = BundledFile(**self.model_dump(include=set(BundledFile.model_fields)))
+        return [main, *self.bundle]
+
+    def with_files(self, files: list[BundledFile]) -> "NotificationTask":
+        """
+        Копия задачи с другим набором файлов: первый становится основным, остальные - пакетом
+
+        :param files: файлы задачи (не пустой список)
+        """
+        main, *rest = files
+        return self.model_copy(update={**main.model_dump(), "bundle": rest})
+
+    def without_file(self, file_id: str) -> Optional["NotificationTask"]:
+        """Задача без файла (файл удалён или заменён); None - других файлов в задаче нет"""
+        files = [f for f in self.files if f.file_id != file_id]
+        return self.with_files(files) if files else None
+
+    def replace_file(self, file_id: str, task: "NotificationTask") -> "NotificationTask":
+        """Задача, в которой файл file_id заменён основным файлом task (перемещение)"""
+        if not self.bundle:
+            return task
+        new = task.files[0]
+        return self.with_files([new if f.file_id == file_id else f for f in self.files])
+
 
 class UserNotification(BaseModel):
     """Персональное уведомление для пользователя с учетом его настроек доставки"""
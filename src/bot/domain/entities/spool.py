@@ -0,0 +1,14 @@
+from dataclasses import dataclass, field
+
+from bot.domain.entities.manifest import ManifestEntry
+from bot.domain.entities.notification import NotificationTask
+
+
+@dataclass(slots=True)
+class SpooledBatch:
+    """Пакет задач, не принятый Redis: задачи и записи манифеста, которые запишутся после них"""
+
+    public_root_url: str
+    tasks: list[NotificationTask]
+    entries: list[ManifestEntry] = field(default_factory=list)
+    token: int | None = None  # Токен аренды лидера, сохранившего пакет: после смены лидера пакет устаревает
@@ -4,6 +4,28 @@ from typing import Optional
 from pydantic import BaseModel, Field
 
 
+class DiskStats(BaseModel):
+    """Файлы на диске: количество и суммарный размер по корзинам (total, common, <измерение>:<значение>)"""
+
+    files: dict[str, int] = Field(default_factory=dict)
+    bytes: dict[str, int] = Field(default_factory=dict)
+    updated_at: Optional[datetime] = None  # Последнее изменение (самое старое из корней)
+
+    def dimension(self, name: str) -> dict[str, tuple[int, int]]:
+        """
+        Значения одного измерения
+
+        :param name: group, subject, course, topic или teacher
+        :return: значение -> (файлов, байт)
+        """
+        prefix = f"{name}:"
+        return {
+            bucket[len(prefix):]: (count, self.bytes.get(bucket, 0))
+            for bucket, count in self.files.items()
+            if bucket.startswith(prefix) and count > 0
+        }
+
+
 class StatsSnapshot(BaseModel):
     users_total: int = 0
     users_enabled: int = 0
@@ -18,3 +40,4 @@ class StatsSnapshot(BaseModel):
     disk_groups: dict[str, int] = Field(default_factory=dict)
     disk_common: int = 0
     disk_computed_at: Optional[datetime] = None
+    disk_stats: Optional[DiskStats] = None
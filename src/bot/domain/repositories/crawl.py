@@ -0,0 +1,62 @@
+from abc import ABC, abstractmethod
+
+from typing import Optional
+
+from bot.domain.entities.crawl import CrawlFrontier, CrawlTelemetry, DirectoryState
+
+
+class CrawlStateRepositoryInterface(ABC):
+    BASE_DIRECTORIES = 'crawl:dirs:{root_hash}'
+    BASE_FRONTIER = 'crawl:frontier:{root_hash}'
+    BASE_FRONTIER_DIRECTORIES = 'crawl:frontier:{root_hash}:dirs'
+    BASE_FRONTIER_PAGES = 'crawl:frontier:{root_hash}:pages'
+    BASE_TELEMETRY = 'crawl:telemetry:{root_hash}'
+
+    def __init__(self, redis, key_prefix: str = ''):
+        self.redis = redis
+        self._prefix = key_prefix.strip().rstrip(':') if key_prefix else ''
+
+    @abstractmethod
+    async def load_directories(self, public_root_url: str) -> dict[str, DirectoryState]:
+        """Загружает состояния директорий с прошлого обхода: path -> состояние"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def save_directories(self, public_root_url: str, states: dict[str, DirectoryState]) -> None:
+        """Атомарно заменяет состояния директорий результатом полного обхода"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def load_frontier(self, public_root_url: str) -> Optional[CrawlFrontier]:
+        """Загружает фронт прерванного обхода вместе со всеми завершёнными директориями"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def save_frontier(self, public_root_url: str, frontier: CrawlFrontier, ttl: int) -> None:
+        """
+        Сохраняет фронт обхода
+
+        :param frontier: фронт; directories - только завершённые с прошлого сохранения,
+            pages - прогресс всех незавершённых листингов
+        :param ttl: время жизни фронта в секундах
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def clear_frontier(self, public_root_url: str) -> None:
+        """Удаляет фронт: результаты обхода сохранены"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def save_telemetry(self, public_root_url: str, telemetry: CrawlTelemetry, keep: int) -> None:
+        """
+        Добавляет телеметрию цикла обхода
+
+        :param keep: сколько последних циклов хранить, более старые удаляются
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def load_telemetry(self, public_root_url: str, limit: int) -> list[CrawlTelemetry]:
+        """Телеметрия последних циклов обхода, от новых к старым"""
+        raise NotImplementedError
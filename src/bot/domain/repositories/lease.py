@@ -0,0 +1,54 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from bot.domain.entities.lease import LeaderLease, WriteFence
+
+
+class LeadershipLostError(Exception):
+    """Аренда лидерства потеряна: запись результатов от имени бывшего лидера запрещена"""
+
+
+class LeaseRepositoryInterface(ABC):
+    BASE_LEASE = 'lease:{name}'
+    BASE_TOKEN = 'lease:{name}:token'
+
+    def __init__(self, redis, key_prefix: str = ''):
+        self.redis = redis
+        self._prefix = key_prefix.strip().rstrip(':') if key_prefix else ''
+
+    @abstractmethod
+    async def acquire(self, name: str, holder: str, ttl: int) -> Optional[LeaderLease]:
+        """
+        Захватить аренду, если она свободна
+
+        :param name: имя аренды
+        :param holder: идентификатор претендента
+        :param ttl: срок аренды в секундах
+        :return: аренда с новым токеном ограждения или None, если её держит другой экземпляр
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def renew(self, name: str, lease: LeaderLease, ttl: int) -> bool:
+        """Продлить аренду; False - аренда уже истекла или перехвачена"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def release(self, name: str, lease: LeaderLease) -> None:
+        """Освободить аренду, если она всё ещё наша"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def is_held(self, name: str, lease: LeaderLease) -> bool:
+        """Проверка ограждения: действует ли аренда с этим токеном"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def fence(self, name: str, lease: LeaderLease) -> WriteFence:
+        """Ограждение для записей от имени держателя аренды (проверяется в самой записи)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def current(self, name: str) -> Optional[LeaderLease]:
+        """Текущая аренда (кто лидер), None - лидера нет"""
+        raise NotImplementedError
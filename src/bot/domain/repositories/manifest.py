@@ -0,0 +1,35 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from bot.domain.entities.lease import WriteFence
+from bot.domain.entities.manifest import ManifestEntry
+
+
+class ManifestRepositoryInterface(ABC):
+    BASE_MANIFEST = 'manifest:{root_hash}'
+
+    def __init__(self, redis, key_prefix: str = ''):
+        self.redis = redis
+        self._prefix = key_prefix.strip().rstrip(':') if key_prefix else ''
+
+    @abstractmethod
+    async def load(self, public_root_url: str) -> dict[str, ManifestEntry]:
+        """Загружает манифест корневой папки: resource_id -> запись"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def upsert_many(
+        self, public_root_url: str, entries: list[ManifestEntry], fence: Optional[WriteFence] = None
+    ) -> None:
+        """
+        Добавляет или обновляет записи манифеста пачкой
+
+        :param fence: ограждение записи: каждая пачка пишется, только пока токен аренды действует
+        :raise: LeadershipLostError: если токен ограждения больше не действует
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_many(self, public_root_url: str, resource_ids: list[str]) -> None:
+        """Удаляет записи манифеста пачкой"""
+        raise NotImplementedError
@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import AsyncIterator
+from typing import AsyncIterator, Optional
 
+from bot.domain.entities.lease import WriteFence
 from bot.domain.entities.notification import NotificationTask, UserNotification
 
 
@@ -10,14 +11,20 @@ class NotificationRepositoryInterface(ABC):
     BASE_USER = 'notifications:user:{user_id}'
     BASE_SENT = 'notifications:sent:{user_id}'
     BASE_STATUS = 'notifications:status:{notification_id}'
+    BASE_PENDING = 'notifications:pending:{file_id}'
 
     def __init__(self, redis, key_prefix: str = ''):
         self.redis = redis
         self._prefix = key_prefix.strip().rstrip(':') if key_prefix else ''
 
     @abstractmethod
-    async def push_to_queue(self, tasks: list[NotificationTask]) -> None:
-        """Добавляет задачи в общую очередь для обработки"""
+    async def push_to_queue(self, tasks: list[NotificationTask], fence: Optional[WriteFence] = None) -> None:
+        """
+        Добавляет задачи в общую очередь для обработки
+
+        :param fence: ограждение записи: задачи принимаются, только пока токен аренды действует
+        :raise: LeadershipLostError: если токен ограждения больше не действует
+        """
         raise NotImplementedError
 
     @abstractmethod
@@ -25,6 +32,20 @@ class NotificationRepositoryInterface(ABC):
         """Извлекает задачи из общей очереди"""
         raise NotImplementedError
 
+    @staticmethod
+    def pending_file_id(task: NotificationTask) -> str:
+        """
+        Ключ файла в индексе ожидающих уведомлений
+
+        Совпадает с ManifestEntry.resource_id: resource_id файла, а без него - путь.
+        """
+        return task.resource_id or task.file_path
+
+    @staticmethod
+    def pending_file_ids(task: NotificationTask) -> list[str]:
+        """Ключи всех файлов задачи в индексе: уведомление-пакет числится за каждым своим файлом"""
+        return [f.file_id for f in task.files]
+
     @abstractmethod
     async def save_user_notification(self, notification: UserNotification) -> None:
         """Сохраняет персональное уведомление пользователя"""
@@ -49,3 +70,27 @@ class NotificationRepositoryInterface(ABC):
     async def is_duplicate(self, user_id: int, task: NotificationTask) -> bool:
         """Проверяет, было ли уже отправлено уведомление о таком файле пользователю"""
         raise NotImplementedError
+
+    @abstractmethod
+    async def cancel_pending(self, file_ids: list[str], reason: str) -> int:
+        """
+        Отменяет ожидающие отправки уведомления о файлах
+
+        :param file_ids: ключи файлов (resource_id, а без него - путь)
+        :param reason: причина отмены, пишется в статус уведомления
+        :return: сколько уведомлений отменено
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def rewrite_pending(self, file_id: str, task: NotificationTask) -> int:
+        """
+        Переписывает ожидающие отправки уведомления о файле на новую задачу
+
+        Время отправки и получатели сохраняются, меняется только файл (путь, ссылки).
+
+        :param file_id: ключ прежнего файла
+        :param task: задача с новым расположением файла
+        :return: сколько уведомлений переписано
+        """
+        raise NotImplementedError
@@ -0,0 +1,40 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from bot.domain.entities.crawl import CrawlSnapshot
+
+
+class SnapshotCorruptedError(Exception):
+    """Файл снимка повреждён или записан другой версией формата"""
+
+
+class CrawlSnapshotRepositoryInterface(ABC):
+    BASE_SNAPSHOT = 'crawl-{root_hash}.snap'
+
+    def __init__(self, directory: str | None, max_age: int = 7 * 24 * 3600):
+        """
+        :param directory: каталог снимков (том /data); пустой - снимки выключены
+        :param max_age: снимок старше этого (с) не загружается
+        """
+        self.directory = directory or None
+        self.max_age = max_age
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    @abstractmethod
+    async def load(self, public_root_url: str) -> Optional[CrawlSnapshot]:
+        """
+        Загрузить снимок корневой папки
+
+        :return: снимок или None, если его нет, он устарел или снят для другой папки
+
+        :raise: SnapshotCorruptedError: Файл повреждён или другой версии формата
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def save(self, snapshot: CrawlSnapshot) -> None:
+        """Атомарно заменить снимок корневой папки"""
+        raise NotImplementedError
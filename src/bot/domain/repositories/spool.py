@@ -0,0 +1,60 @@
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable
+
+from bot.domain.entities.manifest import ManifestEntry
+from bot.domain.entities.spool import SpooledBatch
+
+
+class TaskSpoolRepositoryInterface(ABC):
+    BASE_SPOOL = 'tasks.spool'
+
+    def __init__(self, directory: str | None):
+        """
+        :param directory: каталог очереди на диске (том /data); пустой - очередь выключена
+        """
+        self.directory = directory or None
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    @abstractmethod
+    async def append(self, batch: SpooledBatch) -> None:
+        """
+        Дописать пакет в конец очереди на диске
+
+        Возвращается после fsync: пакет переживёт перезапуск процесса.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def pending(self) -> int:
+        """Сколько пакетов ждут повторной отправки"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def entries(self, public_root_url: str) -> dict[str, ManifestEntry]:
+        """
+        Записи манифеста из недосланных пакетов корня
+
+        Эти файлы уже сохранены на диск: обход сравнивает с ними листинг, чтобы не поставить
+        их в очередь второй раз, пока Redis их не принял.
+
+        :param public_root_url: публичная корневая ссылка
+        :return: resource_id -> запись из самого позднего пакета
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def replay(self, handler: Callable[[SpooledBatch], Awaitable[None]]) -> int:
+        """
+        Отдать пакеты handler по порядку записи
+
+        Пакет снимается с очереди только после успешного handler; ошибка handler прерывает
+        разбор и пробрасывается, пакет и следующие за ним останутся на диске. Процесс может
+        упасть между handler и снятием пакета - тогда пакет будет отдан повторно.
+
+        :param handler: запись пакета (в очередь задач Redis и манифест)
+        :return: сколько пакетов отдано (0 - очередь пуста или её разбирает другой процесс)
+        """
+        raise NotImplementedError
@@ -1,15 +1,18 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Optional
+from typing import Mapping, Optional
 
+from bot.domain.entities.statistics import DiskStats
 from redis.asyncio import Redis
 
 
 class StatisticsRepositoryInterface(ABC):
-    def __init__(self, redis: Redis, key_prefix: str, public_root_url: str):
+    BASE_DISK_STATS = 'stats:disk:{root_hash}'
+
+    def __init__(self, redis: Redis, key_prefix: str, public_root_urls: list[str]):
         self.redis = redis
         self.key_prefix = key_prefix.strip().rstrip(":") if key_prefix else ""
-        self.public_root_url = public_root_url
+        self.public_root_urls = public_root_urls
 
     @abstractmethod
     async def get_queue_len(self) -> int:
@@ -21,5 +24,31 @@ class StatisticsRepositoryInterface(ABC):
 
     @abstractmethod
     async def get_disk_group_counts(self) -> tuple[dict[str, int], int, Optional[datetime]]:
-        """Возвращает (groups, common, computed_at) по кэшу лонг-поллера. Если кэша нет - ( {}, 0, None )."""
+        """Возвращает (groups, common, computed_at) по статистике диска, суммарно по всем корням.
+        computed_at - самое старое из обновлений. Если статистика ещё не посчитана - ( {}, 0, None )."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_disk_stats(self) -> Optional[DiskStats]:
+        """Статистика файлов на диске суммарно по всем корням; None - ещё не посчитана ни для одного"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def has_disk_stats(self, public_root_url: str) -> bool:
+        """Посчитана ли статистика корневой папки полным пересчётом (есть база для изменений)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def apply_disk_delta(self, public_root_url: str, files: Mapping[str, int], sizes: Mapping[str, int]) -> None:
+        """
+        Прибавить изменения к статистике корневой папки
+
+        :param files: корзина -> изменение числа файлов
+        :param sizes: корзина -> изменение суммарного размера в байтах
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def replace_disk_stats(self, public_root_url: str, files: Mapping[str, int], sizes: Mapping[str, int]) -> None:
+        """Атомарно заменить статистику корневой папки полным пересчётом"""
         raise NotImplementedError
@@ -0,0 +1,51 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional
+
+from bot.domain.clients.yandex_disk import YandexDiskClientInterface
+from bot.domain.entities.notification import NotificationTask
+
+
+class DownloadLinkResolverInterface(ABC):
+    def __init__(
+        self,
+        disk_client: YandexDiskClientInterface,
+        ttl: int = 1800,
+        failure_ttl: int = 60,
+        concurrency: int = 4,
+    ):
+        """
+        Инициализация резолвера ссылок на скачивание
+
+        :param disk_client: клиент API Я.Диска
+        :param ttl: сколько секунд ссылка берётся из кэша (меньше срока жизни ссылки Я.Диска)
+        :param failure_ttl: сколько секунд не повторять запрос для файла, ссылку на который получить не удалось
+        :param concurrency: сколько ссылок запрашивать параллельно
+        """
+        self.disk_client = disk_client
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.concurrency = max(1, concurrency)
+
+    @staticmethod
+    def link_key(task: NotificationTask) -> Optional[tuple[str, str]]:
+        """Ключ файла для ссылки: публичная папка и путь; None - папка неизвестна, ссылку не получить"""
+        if not task.public_root_url or not task.file_path:
+            return None
+        return task.public_root_url, task.file_path
+
+    @staticmethod
+    def link_keys(task: NotificationTask) -> list[tuple[str, str]]:
+        """Ключи всех файлов задачи (у задачи-пакета - по ключу на файл)"""
+        if not task.public_root_url:
+            return []
+        return [(task.public_root_url, f.file_path) for f in task.files if f.file_path]
+
+    @abstractmethod
+    async def resolve_many(self, tasks: Iterable[NotificationTask]) -> dict[tuple[str, str], Optional[str]]:
+        """
+        Получить свежие ссылки на скачивание файлов задач: по одному запросу на файл
+
+        :param tasks: задачи уведомлений (один файл может встречаться много раз)
+        :return: ключ файла (link_key) -> ссылка или None, если её получить не удалось
+        """
+        raise NotImplementedError
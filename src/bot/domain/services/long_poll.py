@@ -1,36 +1,136 @@
+import asyncio
+import os
+import socket
+import uuid
 from abc import ABC, abstractmethod
 
-import aiohttp
 from aiogram import Bot
+from bot.common.utils.bundling import BundleHold
+from bot.common.utils.demand import CrawlDemand
+from bot.common.utils.poll_interval import AdaptivePollInterval
+from bot.domain.clients.yandex_disk import YandexDiskClientInterface
+from bot.domain.entities.crawl import CrawlStats
+from bot.domain.entities.lease import LeaderLease
+from bot.domain.repositories.crawl import CrawlStateRepositoryInterface
+from bot.domain.repositories.lease import LeaseRepositoryInterface
+from bot.domain.repositories.manifest import ManifestRepositoryInterface
+from bot.domain.repositories.snapshot import CrawlSnapshotRepositoryInterface
+from bot.domain.repositories.spool import TaskSpoolRepositoryInterface
+from bot.domain.repositories.statistics import StatisticsRepositoryInterface
 from bot.domain.services.notification import NotificationServiceInterface
 from bot.domain.services.user import UserServiceInterface
 from redis.asyncio import Redis
 
 
 class LongPollServiceInterface(ABC):
+    LEASE_NAME = "poller"
+
     def __init__(
         self,
         bot: Bot,
         user_service: UserServiceInterface,
         notification_service: NotificationServiceInterface,
-        http: aiohttp.ClientSession,
+        manifest_repository: ManifestRepositoryInterface,
+        crawl_state_repository: CrawlStateRepositoryInterface,
+        lease_repository: LeaseRepositoryInterface,
+        statistics_repository: StatisticsRepositoryInterface,
+        disk_client: YandexDiskClientInterface,
         redis: Redis,
-        public_root_url: str,
+        public_root_urls: list[str],
         poll_interval: int,
         http_timeout: float,
         key_prefix: str = "",
+        snapshot_repository: CrawlSnapshotRepositoryInterface | None = None,
+        task_spool: TaskSpoolRepositoryInterface | None = None,
+        crawl_concurrency: int = 8,
+        full_resync_every: int = 96,
+        warm_every: int = 12,
+        crawl_hot_days: int = 14,
+        crawl_warm_days: int = 180,
+        crawl_checkpoint_interval: float = 10.0,
+        crawl_frontier_max_age: int = 3600,
+        crawl_prune_unsubscribed: bool = True,
+        crawl_telemetry_cycles: int = 20,
+        crawl_telemetry_top: int = 10,
+        enqueue_batch_size: int = 200,
+        enqueue_flush_interval: float = 2.0,
+        spool_replay_interval: float = 30.0,
+        bundle_window: int = 900,
+        bundle_max_files: int = 10,
+        poll_interval_min: int | None = None,
+        poll_interval_max: int | None = None,
+        poll_backoff_factor: float = 1.5,
+        poll_hot_period: int = 3600,
+        poll_upload_hours: str | None = None,
+        leader_lease_ttl: int = 30,
     ):
         self.bot = bot
         self.user_service = user_service
         self.notification_service = notification_service
-        self.http = http
+        self.manifest_repository = manifest_repository
+        self.crawl_state_repository = crawl_state_repository
+        self.lease_repository = lease_repository
+        self.statistics_repository = statistics_repository
+        self.snapshot_repository = snapshot_repository
+        self.task_spool = task_spool
+        self.disk_client = disk_client
         self.redis = redis
-        self.public_root_url = public_root_url
+        if not public_root_urls:
+            raise ValueError("Не задано ни одной публичной папки для опроса")
+        self.public_root_urls = list(dict.fromkeys(public_root_urls))
         self.poll_interval = poll_interval
+        self.poll_schedule = AdaptivePollInterval(
+            base=poll_interval,
+            minimum=poll_interval_min or poll_interval,
+            maximum=poll_interval_max or poll_interval,
+            backoff_factor=poll_backoff_factor,
+            hot_period=poll_hot_period,
+            upload_hours=poll_upload_hours,
+        )
         self.http_timeout = http_timeout
         self.key_prefix = key_prefix.strip().rstrip(":") if key_prefix else ""
+        self.crawl_concurrency = max(1, crawl_concurrency)
+        self.full_resync_every = max(1, full_resync_every)
+        self.warm_every = max(1, warm_every)
+        self.crawl_hot_days = crawl_hot_days
+        self.crawl_warm_days = crawl_warm_days
+        self.crawl_checkpoint_interval = crawl_checkpoint_interval
+        self.crawl_frontier_max_age = crawl_frontier_max_age
+        self.crawl_prune_unsubscribed = crawl_prune_unsubscribed
+        self.crawl_telemetry_cycles = max(1, crawl_telemetry_cycles)
+        self.crawl_telemetry_top = max(1, crawl_telemetry_top)
+        self.enqueue_batch_size = max(1, enqueue_batch_size)
+        self.enqueue_flush_interval = enqueue_flush_interval
+        self.spool_replay_interval = spool_replay_interval
+        self.bundle_window = max(0, bundle_window)
+        self.bundle_max_files = max(1, bundle_max_files)
+        self._bundle_holds: dict[str, BundleHold] = {}  # Задачи, придержанные до конца загрузки, по корням
+        self.last_crawl_stats: dict[str, CrawlStats] = {}
+        self.last_demand: CrawlDemand | None = None
+        self._cycles = 1
         self._running = False
         self._task = None
+        self._spool_task = None
+
+        # Лидерство: диск опрашивает только держатель аренды, остальные экземпляры - резерв.
+        # Аренда продлевается каждые leader_lease_ttl / 3 секунд, поэтому резерв перехватывает
+        # её не позже чем через leader_lease_ttl + lease_renew_interval после падения лидера
+        self.instance_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.leader_lease_ttl = max(3, leader_lease_ttl)
+        self.lease_renew_interval = self.leader_lease_ttl / 3
+        self.lease: LeaderLease | None = None
+        self._lease_tokens: set[int] = set()  # Токены аренд этого экземпляра: по ним отбрасываются устаревшие пакеты с диска
+        self._lease_task = None
+        self._leadership = asyncio.Event()
+
+    @property
+    def public_root_url(self) -> str:
+        """Основная (первая) публичная папка"""
+        return self.public_root_urls[0]
+
+    @property
+    def is_leader(self) -> bool:
+        return self.lease is not None
 
     @abstractmethod
     async def start(self):
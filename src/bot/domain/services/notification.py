@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 
+from bot.domain.entities.lease import WriteFence
 from bot.domain.entities.notification import NotificationTask
 from bot.domain.repositories.notification import NotificationRepositoryInterface
 from bot.domain.services.user import UserServiceInterface
@@ -15,7 +17,7 @@ class NotificationServiceInterface(ABC):
         self.user_service = user_service
 
     @abstractmethod
-    async def enqueue_many(self, tasks: list[NotificationTask]) -> None:
+    async def enqueue_many(self, tasks: list[NotificationTask], fence: Optional[WriteFence] = None) -> None:
         """Добавляет задачи в общую очередь для обработки"""
         raise NotImplementedError
 
@@ -23,3 +25,13 @@ class NotificationServiceInterface(ABC):
     async def process_queue(self) -> int:
         """Обрабатывает очередь: распределяет уведомления по пользователям с учетом их настроек"""
         raise NotImplementedError
+
+    @abstractmethod
+    async def cancel_pending(self, file_ids: list[str], reason: str) -> int:
+        """Отменяет ожидающие отправки уведомления об удалённых или заменённых файлах"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def move_pending(self, moves: dict[str, NotificationTask]) -> int:
+        """Переписывает ожидающие отправки уведомления о перемещённых файлах (ключ прежнего файла -> новая задача)"""
+        raise NotImplementedError
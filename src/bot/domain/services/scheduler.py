@@ -8,6 +8,7 @@ from abc import ABC, abstractmethod
 
 from aiogram import Bot
 from bot.domain.repositories.notification import NotificationRepositoryInterface
+from bot.domain.services.download_links import DownloadLinkResolverInterface
 
 
 class SchedulerServiceInterface(ABC):
@@ -21,9 +22,14 @@ class SchedulerServiceInterface(ABC):
         bot: Bot,
         repository: NotificationRepositoryInterface,
         check_interval: int = 60,
+        link_resolver: DownloadLinkResolverInterface | None = None,
+        send_batch_size: int = 100,
     ):
         self.bot = bot
         self.repository = repository
+        # Ссылки на скачивание запрашиваются перед отправкой пакета; без резолвера - сохранённые в задаче
+        self.link_resolver = link_resolver
+        self.send_batch_size = max(1, send_batch_size)
         self._check_interval = check_interval
         self._running = False
         self._task = None
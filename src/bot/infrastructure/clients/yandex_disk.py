@@ -0,0 +1,227 @@
+import asyncio
+import json
+import random
+import time
+
+import aiohttp
+from bot.common.logs import logger
+from bot.domain.clients.yandex_disk import (
+    YandexDiskClientInterface,
+    YandexDiskError,
+    YandexDiskUnavailableError,
+)
+from bot.domain.entities.crawl import CrawlStats
+
+
+class TokenBucket:
+    """Ограничитель частоты запросов: rate токенов в секунду, не больше burst подряд"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = max(rate, 0.001)
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Дождаться свободного токена"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """
+    Предохранитель: после failure_threshold неудачных запросов подряд цепь размыкается на reset_timeout секунд
+
+    Неудачным считается запрос, исчерпавший повторы, а не каждая его попытка. По истечении таймаута
+    пропускается один пробный запрос без повторов: успех замыкает цепь, ошибка размыкает снова.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probe_in_flight = False
+
+    @property
+    def retry_in(self) -> float:
+        """Секунд до пробного запроса (0 - цепь замкнута или пора пробовать)"""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def before_request(self) -> bool:
+        """
+        Проверить, можно ли отправлять запрос
+
+        :return: True, если запрос пробный (его нужно завершить record_* или release_probe)
+        :raise: YandexDiskUnavailableError: если цепь разомкнута
+        """
+        if self._opened_at is None:
+            return False
+        retry_in = self.retry_in
+        if retry_in > 0 or self._probe_in_flight:
+            raise YandexDiskUnavailableError(retry_in or self.reset_timeout)
+        self._probe_in_flight = True
+        return True
+
+    def release_probe(self) -> None:
+        """Пробный запрос прерван без ответа (например, отменён): следующий запрос снова станет пробным"""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info("✅ API Я.Диска снова отвечает, цепь замкнута")
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        probe_failed = self._probe_in_flight
+        self._probe_in_flight = False
+        if probe_failed or (self._opened_at is None and self._failures >= self.failure_threshold):
+            self._opened_at = time.monotonic()
+            logger.warning(f"⛔ API Я.Диска не отвечает ({self._failures} неудачных запросов подряд), пауза {self.reset_timeout:.0f} с")
+
+
+class YandexDiskClient(YandexDiskClientInterface):
+    """
+    Клиент публичного API Я.Диска поверх общей aiohttp-сессии
+
+    Все запросы проходят через ограничитель частоты, повторяются с экспоненциальной
+    задержкой и джиттером (с учётом Retry-After) и защищены предохранителем.
+    """
+
+    API_URL = "https://cloud-api.yandex.net/v1/disk/public/resources"
+    DOWNLOAD_URL = f"{API_URL}/download"
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(
+        self,
+        http: aiohttp.ClientSession,
+        http_timeout: float,
+        rate_limit: float = 10.0,
+        rate_burst: int = 20,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        failure_threshold: int = 10,
+        reset_timeout: float = 120.0,
+    ):
+        self.http = http
+        self.timeout = aiohttp.ClientTimeout(total=http_timeout)
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.limiter = TokenBucket(rate_limit, rate_burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+    @property
+    def retry_in(self) -> float:
+        return self.breaker.retry_in
+
+    async def list_public_resources(
+        self,
+        public_key: str,
+        path: str | None,
+        *,
+        limit: int,
+        offset: int,
+        sort: str | None = None,
+        fields: str | None = None,
+        stats: CrawlStats | None = None,
+    ) -> bytes:
+        params: dict[str, str | int] = {"public_key": public_key, "limit": limit, "offset": offset}
+        if path:
+            params["path"] = path
+        if sort:
+            params["sort"] = sort
+        if fields:
+            params["fields"] = fields
+        return await self._get(self.API_URL, params, stats)
+
+    async def get_public_download_link(self, public_key: str, path: str) -> str:
+        body = await self._get(self.DOWNLOAD_URL, {"public_key": public_key, "path": path}, None)
+        try:
+            href = json.loads(body).get("href")
+        except (ValueError, AttributeError) as e:
+            raise YandexDiskError(f"Неверный ответ API для ссылки на {path}: {e}") from e
+        if not href:
+            raise YandexDiskError(f"Нет ссылки на скачивание {path}")
+        return href
+
+    async def _get(self, url: str, params: dict, stats: CrawlStats | None) -> bytes:
+        """GET с ограничением частоты, повторами и предохранителем"""
+        attempt = 0
+        while True:
+            probe = self.breaker.before_request()
+            try:
+                await self.limiter.acquire()
+                if stats:
+                    stats.requests += 1
+
+                retry_after: float | None = None
+                try:
+                    async with self.http.get(url, params=params, timeout=self.timeout) as resp:
+                        if resp.status < 400:
+                            body = await resp.read()
+                            self.breaker.record_success()
+                            return body
+
+                        if resp.status not in self.RETRY_STATUSES:
+                            # Ошибка запроса (например, 404) - не повод ни повторять, ни размыкать цепь
+                            self.breaker.record_success()
+                            raise YandexDiskError(f"HTTP {resp.status} для {params.get('path') or '/'}", status=resp.status)
+
+                        if resp.status == 429 and stats:
+                            stats.throttled += 1
+                        retry_after = self._parse_retry_after(resp.headers.get("Retry-After"))
+                        error: Exception = YandexDiskError(f"HTTP {resp.status} для {params.get('path') or '/'}", status=resp.status)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = e
+
+                # Предохранитель считает запросы, а не попытки: ошибка засчитывается, когда повторы
+                # исчерпаны; пробный запрос не повторяется - его ошибка сразу размыкает цепь
+                exhausted = probe or attempt >= self.max_retries
+                if exhausted:
+                    self.breaker.record_failure()
+            finally:
+                if probe:
+                    # Отмена, ошибка вне aiohttp: без этого цепь осталась бы разомкнутой до перезапуска
+                    self.breaker.release_probe()
+            if exhausted:
+                if isinstance(error, YandexDiskError):
+                    raise error
+                raise YandexDiskError(f"{type(error).__name__}: {error}") from error
+
+            delay = self._backoff(attempt, retry_after)
+            attempt += 1
+            if stats:
+                stats.retries += 1
+            logger.debug(f"🔁 Повтор запроса к Я.Диску через {delay:.1f} с (попытка {attempt}): {error}")
+            await asyncio.sleep(delay)
+
+    def _backoff(self, attempt: int, retry_after: float | None) -> float:
+        """Экспоненциальная задержка с полным джиттером; Retry-After - нижняя граница"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    @staticmethod
+    def _parse_retry_after(value: str | None) -> float | None:
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return None
@@ -0,0 +1,94 @@
+import json
+from typing import Optional
+
+from bot.common.utils.path_parser import public_root_hash
+from bot.domain.entities.crawl import CrawlFrontier, CrawlTelemetry, DirectoryState, FrontierDirectory, FrontierPages
+from bot.domain.repositories.crawl import CrawlStateRepositoryInterface
+
+
+class RedisCrawlStateRepository(CrawlStateRepositoryInterface):
+    """Состояние обходчика в Redis: отпечатки директорий и фронт прерванного обхода по корневой папке"""
+
+    CHUNK_SIZE = 1000
+
+    @staticmethod
+    def _to_str(v):
+        return v.decode() if isinstance(v, (bytes, bytearray)) else v
+
+    def _key(self, base: str) -> str:
+        return f'{self._prefix}:{base}' if self._prefix else base
+
+    def _directories_key(self, public_root_url: str) -> str:
+        return self._key(self.BASE_DIRECTORIES.format(root_hash=public_root_hash(public_root_url)))
+
+    def _telemetry_key(self, public_root_url: str) -> str:
+        return self._key(self.BASE_TELEMETRY.format(root_hash=public_root_hash(public_root_url)))
+
+    def _frontier_keys(self, public_root_url: str) -> tuple[str, str, str]:
+        root_hash = public_root_hash(public_root_url)
+        return (
+            self._key(self.BASE_FRONTIER.format(root_hash=root_hash)),
+            self._key(self.BASE_FRONTIER_DIRECTORIES.format(root_hash=root_hash)),
+            self._key(self.BASE_FRONTIER_PAGES.format(root_hash=root_hash)),
+        )
+
+    async def load_directories(self, public_root_url: str) -> dict[str, DirectoryState]:
+        raw = await self.redis.hgetall(self._directories_key(public_root_url))
+        states: dict[str, DirectoryState] = {}
+        for k, v in raw.items():
+            path = self._to_str(k)
+            states[path] = DirectoryState(path=path, **json.loads(self._to_str(v)))
+        return states
+
+    async def save_directories(self, public_root_url: str, states: dict[str, DirectoryState]) -> None:
+        key = self._directories_key(public_root_url)
+        items = list(states.values())
+        pipeline = self.redis.pipeline(transaction=True)
+        pipeline.delete(key)
+        for i in range(0, len(items), self.CHUNK_SIZE):
+            chunk = items[i:i + self.CHUNK_SIZE]
+            pipeline.hset(key, mapping={s.path: s.model_dump_json(exclude={'path'}) for s in chunk})
+        await pipeline.execute()
+
+    async def load_frontier(self, public_root_url: str) -> Optional[CrawlFrontier]:
+        meta_key, dirs_key, pages_key = self._frontier_keys(public_root_url)
+        raw = await self.redis.get(meta_key)
+        if not raw:
+            return None
+        frontier = CrawlFrontier.model_validate_json(self._to_str(raw))
+        for k, v in (await self.redis.hgetall(dirs_key)).items():
+            path = self._to_str(k)
+            frontier.directories[path] = FrontierDirectory(path=path, **json.loads(self._to_str(v)))
+        for k, v in (await self.redis.hgetall(pages_key)).items():
+            path = self._to_str(k)
+            frontier.pages[path] = FrontierPages(path=path, **json.loads(self._to_str(v)))
+        return frontier
+
+    async def save_frontier(self, public_root_url: str, frontier: CrawlFrontier, ttl: int) -> None:
+        meta_key, dirs_key, pages_key = self._frontier_keys(public_root_url)
+        directories = list(frontier.directories.values())
+        pipeline = self.redis.pipeline(transaction=True)
+        for i in range(0, len(directories), self.CHUNK_SIZE):
+            chunk = directories[i:i + self.CHUNK_SIZE]
+            pipeline.hset(dirs_key, mapping={d.path: d.model_dump_json(exclude={'path'}) for d in chunk})
+        pipeline.delete(pages_key)
+        if frontier.pages:
+            pipeline.hset(pages_key, mapping={p.path: p.model_dump_json(exclude={'path'}) for p in frontier.pages.values()})
+        pipeline.set(meta_key, frontier.model_dump_json(exclude={'directories', 'pages'}), ex=ttl)
+        pipeline.expire(dirs_key, ttl)
+        pipeline.expire(pages_key, ttl)
+        await pipeline.execute()
+
+    async def clear_frontier(self, public_root_url: str) -> None:
+        await self.redis.delete(*self._frontier_keys(public_root_url))
+
+    async def save_telemetry(self, public_root_url: str, telemetry: CrawlTelemetry, keep: int) -> None:
+        key = self._telemetry_key(public_root_url)
+        pipeline = self.redis.pipeline(transaction=True)
+        pipeline.lpush(key, telemetry.model_dump_json())
+        pipeline.ltrim(key, 0, max(1, keep) - 1)
+        await pipeline.execute()
+
+    async def load_telemetry(self, public_root_url: str, limit: int) -> list[CrawlTelemetry]:
+        raw = await self.redis.lrange(self._telemetry_key(public_root_url), 0, max(1, limit) - 1)
+        return [CrawlTelemetry.model_validate_json(self._to_str(v)) for v in raw]
@@ -0,0 +1,100 @@
+from datetime import datetime
+from typing import Optional
+
+from bot.domain.entities.lease import LeaderLease, WriteFence
+from bot.domain.repositories.lease import LeaseRepositoryInterface
+
+
+class RedisLeaseRepository(LeaseRepositoryInterface):
+    """
+    Аренда лидерства в Redis: HASH с TTL и счётчик токенов ограждения
+
+    Захват, продление и освобождение - Lua-скрипты, атомарные относительно других экземпляров.
+    """
+
+    # KEYS: аренда, счётчик токенов; ARGV: holder, now, ttl_ms
+    _ACQUIRE = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return nil
+end
+local token = redis.call('INCR', KEYS[2])
+redis.call('HSET', KEYS[1], 'holder', ARGV[1], 'token', token, 'acquired_at', ARGV[2], 'renewed_at', ARGV[2])
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return token
+"""
+
+    # KEYS: аренда; ARGV: token, now, ttl_ms
+    _RENEW = """
+if redis.call('HGET', KEYS[1], 'token') ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'renewed_at', ARGV[2])
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+    # KEYS: аренда; ARGV: token
+    _RELEASE = """
+if redis.call('HGET', KEYS[1], 'token') == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+    @staticmethod
+    def _to_str(v):
+        return v.decode() if isinstance(v, (bytes, bytearray)) else v
+
+    def _key(self, base: str) -> str:
+        return f'{self._prefix}:{base}' if self._prefix else base
+
+    def _lease_key(self, name: str) -> str:
+        return self._key(self.BASE_LEASE.format(name=name))
+
+    def _token_key(self, name: str) -> str:
+        return self._key(self.BASE_TOKEN.format(name=name))
+
+    async def acquire(self, name: str, holder: str, ttl: int) -> Optional[LeaderLease]:
+        now = datetime.now()
+        token = await self.redis.eval(
+            self._ACQUIRE, 2, self._lease_key(name), self._token_key(name), holder, now.isoformat(), int(ttl * 1000)
+        )
+        if token is None:
+            return None
+        return LeaderLease(holder=holder, token=int(token), acquired_at=now, renewed_at=now, ttl_ms=int(ttl * 1000))
+
+    async def renew(self, name: str, lease: LeaderLease, ttl: int) -> bool:
+        now = datetime.now()
+        renewed = await self.redis.eval(self._RENEW, 1, self._lease_key(name), str(lease.token), now.isoformat(), int(ttl * 1000))
+        if not renewed:
+            return False
+        lease.renewed_at = now
+        lease.ttl_ms = int(ttl * 1000)
+        return True
+
+    async def release(self, name: str, lease: LeaderLease) -> None:
+        await self.redis.eval(self._RELEASE, 1, self._lease_key(name), str(lease.token))
+
+    async def is_held(self, name: str, lease: LeaderLease) -> bool:
+        token = await self.redis.hget(self._lease_key(name), 'token')
+        return token is not None and self._to_str(token) == str(lease.token)
+
+    def fence(self, name: str, lease: LeaderLease) -> WriteFence:
+        return WriteFence(lease_key=self._lease_key(name), token=lease.token)
+
+    async def current(self, name: str) -> Optional[LeaderLease]:
+        key = self._lease_key(name)
+        pipeline = self.redis.pipeline(transaction=True)
+        pipeline.hgetall(key)
+        pipeline.pttl(key)
+        raw, ttl_ms = await pipeline.execute()
+        if not raw:
+            return None
+        data = {self._to_str(k): self._to_str(v) for k, v in raw.items()}
+        return LeaderLease(
+            holder=data['holder'],
+            token=int(data['token']),
+            acquired_at=datetime.fromisoformat(data['acquired_at']),
+            renewed_at=datetime.fromisoformat(data['renewed_at']),
+            ttl_ms=ttl_ms if ttl_ms and ttl_ms > 0 else None,
+        )
@@ -0,0 +1,78 @@
+import json
+from typing import Optional
+
+from bot.common.utils.path_parser import public_root_hash
+from bot.domain.entities.lease import WriteFence
+from bot.domain.entities.manifest import ManifestEntry
+from bot.domain.repositories.lease import LeadershipLostError
+from bot.domain.repositories.manifest import ManifestRepositoryInterface
+
+
+class RedisManifestRepository(ManifestRepositoryInterface):
+    """Манифест файлов в Redis: один HASH на корневую папку, поле - resource_id"""
+
+    CHUNK_SIZE = 1000
+
+    # KEYS: манифест, аренда лидерства; ARGV: токен ограждения, затем пары resource_id, запись
+    _FENCED_UPSERT = """
+if redis.call('HGET', KEYS[2], 'token') ~= ARGV[1] then
+    return -1
+end
+for i = 2, #ARGV, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+return (#ARGV - 1) / 2
+"""
+
+    @staticmethod
+    def _to_str(v):
+        return v.decode() if isinstance(v, (bytes, bytearray)) else v
+
+    def _key(self, base: str) -> str:
+        return f'{self._prefix}:{base}' if self._prefix else base
+
+    def _manifest_key(self, public_root_url: str) -> str:
+        return self._key(self.BASE_MANIFEST.format(root_hash=public_root_hash(public_root_url)))
+
+    async def load(self, public_root_url: str) -> dict[str, ManifestEntry]:
+        raw = await self.redis.hgetall(self._manifest_key(public_root_url))
+        manifest: dict[str, ManifestEntry] = {}
+        for k, v in raw.items():
+            resource_id = self._to_str(k)
+            data = json.loads(self._to_str(v))
+            manifest[resource_id] = ManifestEntry(resource_id=resource_id, **data)
+        return manifest
+
+    @staticmethod
+    def _dump(entry: ManifestEntry) -> str:
+        return json.dumps(entry.to_dict(), ensure_ascii=False, separators=(',', ':'))
+
+    async def upsert_many(
+        self, public_root_url: str, entries: list[ManifestEntry], fence: Optional[WriteFence] = None
+    ) -> None:
+        if not entries:
+            return
+        key = self._manifest_key(public_root_url)
+        if fence:
+            # Каждая пачка проверяет токен сама: бывший лидер не допишет манифест после перехвата аренды
+            for i in range(0, len(entries), self.CHUNK_SIZE):
+                args = [str(fence.token)]
+                for e in entries[i:i + self.CHUNK_SIZE]:
+                    args += (e.resource_id, self._dump(e))
+                if int(await self.redis.eval(self._FENCED_UPSERT, 2, key, fence.lease_key, *args)) < 0:
+                    raise LeadershipLostError(f"манифест не записан: токен ограждения {fence.token} больше не действует")
+            return
+        pipeline = self.redis.pipeline(transaction=False)
+        for i in range(0, len(entries), self.CHUNK_SIZE):
+            chunk = entries[i:i + self.CHUNK_SIZE]
+            pipeline.hset(key, mapping={e.resource_id: self._dump(e) for e in chunk})
+        await pipeline.execute()
+
+    async def delete_many(self, public_root_url: str, resource_ids: list[str]) -> None:
+        if not resource_ids:
+            return
+        key = self._manifest_key(public_root_url)
+        pipeline = self.redis.pipeline(transaction=False)
+        for i in range(0, len(resource_ids), self.CHUNK_SIZE):
+            pipeline.hdel(key, *resource_ids[i:i + self.CHUNK_SIZE])
+        await pipeline.execute()
@@ -1,14 +1,61 @@
 import json
 import uuid
 from datetime import datetime
-from typing import AsyncIterator
+from typing import AsyncIterator, Optional
 
+from bot.domain.entities.lease import WriteFence
 from bot.domain.entities.mappings import NotificationStatus
 from bot.domain.entities.notification import NotificationTask, UserNotification
+from bot.domain.repositories.lease import LeadershipLostError
 from bot.domain.repositories.notification import NotificationRepositoryInterface
 
 
 class RedisNotificationRepository(NotificationRepositoryInterface):
+    """
+    Уведомления в Redis: общая очередь, ZSET уведомлений пользователя по времени отправки
+
+    Индекс ожидающих уведомлений - HASH на файл (notification_id -> элемент ZSET): по нему
+    уведомления об удалённом или перемещённом файле отменяются и переписываются без скана ZSET.
+    Уведомление-пакет числится в индексе каждого своего файла.
+    """
+
+    # KEYS: ZSET пользователя, затем индексы файлов прежнего элемента и индексы файлов нового
+    # ARGV: старый элемент, новый элемент ('' - только удалить), notification_id, TTL индекса, число прежних индексов
+    # Уведомление, которое планировщик уже забрал на отправку, не возвращается
+    _REPLACE = """
+local old_keys = tonumber(ARGV[5])
+for i = 2, old_keys + 1 do
+    redis.call('HDEL', KEYS[i], ARGV[3])
+end
+local score = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if not score then
+    return 0
+end
+redis.call('ZREM', KEYS[1], ARGV[1])
+if ARGV[2] == '' then
+    return 1
+end
+redis.call('ZADD', KEYS[1], score, ARGV[2])
+for i = old_keys + 2, #KEYS do
+    redis.call('HSET', KEYS[i], ARGV[3], ARGV[2])
+    redis.call('EXPIRE', KEYS[i], ARGV[4])
+end
+return 1
+"""
+
+    # KEYS: очередь, аренда лидерства; ARGV: токен ограждения, затем задачи
+    _FENCED_PUSH = """
+if redis.call('HGET', KEYS[2], 'token') ~= ARGV[1] then
+    return -1
+end
+for i = 2, #ARGV do
+    redis.call('RPUSH', KEYS[1], ARGV[i])
+end
+return #ARGV - 1
+"""
+
+    PENDING_TTL = 86400 * 30  # Индекс живёт не дольше отложенной отправки с запасом
+
     @staticmethod
     def _to_str(v):
         return v.decode() if isinstance(v, (bytes, bytearray)) else v
@@ -28,11 +75,21 @@ class RedisNotificationRepository(NotificationRepositoryInterface):
     def _status_key(self, notification_id: str) -> str:
         return self._key(self.BASE_STATUS.format(notification_id=notification_id))
 
-    async def push_to_queue(self, tasks: list[NotificationTask]) -> None:
+    def _pending_key(self, file_id: str) -> str:
+        return self._key(self.BASE_PENDING.format(file_id=file_id))
+
+    async def push_to_queue(self, tasks: list[NotificationTask], fence: Optional[WriteFence] = None) -> None:
         if not tasks:
             return
-        pipeline = self.redis.pipeline()
         q = self._queue_key()
+        if fence:
+            pushed = await self.redis.eval(
+                self._FENCED_PUSH, 2, q, fence.lease_key, str(fence.token), *(task.model_dump_json() for task in tasks)
+            )
+            if int(pushed) < 0:
+                raise LeadershipLostError(f"задачи не приняты: токен ограждения {fence.token} больше не действует")
+            return
+        pipeline = self.redis.pipeline()
         for task in tasks:
             pipeline.rpush(q, task.model_dump_json())
         await pipeline.execute()
@@ -51,7 +108,14 @@ class RedisNotificationRepository(NotificationRepositoryInterface):
             notification.notification_id = str(uuid.uuid4())
         key = self._user_key(notification.user_id)
         score = notification.scheduled_at.timestamp() if notification.scheduled_at else datetime.now().timestamp()
-        await self.redis.zadd(key, {notification.model_dump_json(): score})
+        member = notification.model_dump_json()
+        pipeline = self.redis.pipeline()
+        pipeline.zadd(key, {member: score})
+        for file_id in self.pending_file_ids(notification.task):
+            pending_key = self._pending_key(file_id)
+            pipeline.hset(pending_key, notification.notification_id, member)
+            pipeline.expire(pending_key, self.PENDING_TTL)
+        await pipeline.execute()
 
     async def get_due_notifications(self, before: datetime, limit: int = 100) -> AsyncIterator[UserNotification]:
         cursor = 0
@@ -62,8 +126,13 @@ class RedisNotificationRepository(NotificationRepositoryInterface):
                 k = self._to_str(key)
                 members = await self.redis.zrangebyscore(k, min=0, max=before.timestamp(), start=0, num=limit)
                 for m in members:
+                    # Уведомление забирает тот, чей ZREM его удалил: отменённое или переписанное не отправится
+                    if not await self.redis.zrem(k, m):
+                        continue
                     n = UserNotification.model_validate(json.loads(self._to_str(m)))
-                    await self.redis.zrem(k, m)
+                    if n.notification_id:
+                        for file_id in self.pending_file_ids(n.task):
+                            await self.redis.hdel(self._pending_key(file_id), n.notification_id)
                     yield n
             if cursor == 0:
                 break
@@ -78,11 +147,59 @@ class RedisNotificationRepository(NotificationRepositoryInterface):
         await self.redis.hset(key, mapping={'status': NotificationStatus.FAILED, 'error': error, 'failed_at': datetime.now().isoformat()})
         await self.redis.expire(key, 86400 * 7)
 
+    async def cancel_pending(self, file_ids: list[str], reason: str) -> int:
+        cancelled = 0
+        now = datetime.now().isoformat()
+        for file_id in file_ids:
+            pending = await self.redis.hgetall(self._pending_key(file_id))
+            pipeline = self.redis.pipeline()
+            for notification_id, m in pending.items():
+                notification_id, old = self._to_str(notification_id), self._to_str(m)
+                n = UserNotification.model_validate(json.loads(old))
+                # Из уведомления-пакета убирается только этот файл, остальные уйдут как были
+                task = n.task.without_file(file_id) if n.task.bundle else None
+                if not await self._replace(n, old, task, notification_id) or task is not None:
+                    continue  # Уже забрано планировщиком или осталось с другими файлами
+                status_key = self._status_key(notification_id)
+                pipeline.hset(status_key, mapping={'status': NotificationStatus.CANCELLED, 'error': reason, 'cancelled_at': now})
+                pipeline.expire(status_key, 86400 * 7)
+                cancelled += 1
+            await pipeline.execute()
+        return cancelled
+
+    async def rewrite_pending(self, file_id: str, task: NotificationTask) -> int:
+        pending = await self.redis.hgetall(self._pending_key(file_id))
+        rewritten = 0
+        for notification_id, m in pending.items():
+            old = self._to_str(m)
+            n = UserNotification.model_validate(json.loads(old))
+            rewritten += await self._replace(n, old, n.task.replace_file(file_id, task), self._to_str(notification_id))
+        return rewritten
+
+    async def _replace(self, notification: UserNotification, old: str, task: NotificationTask | None, notification_id: str) -> int:
+        """
+        Заменить задачу ожидающего уведомления вместе с индексом его файлов
+
+        :param task: новая задача; None - удалить уведомление
+        :return: 1 - заменено, 0 - уведомление уже забрано на отправку
+        """
+        old_keys = [self._pending_key(f) for f in self.pending_file_ids(notification.task)]
+        new_keys = [self._pending_key(f) for f in self.pending_file_ids(task)] if task else []
+        member = notification.model_copy(update={'task': task}).model_dump_json() if task else ''
+        return await self.redis.eval(
+            self._REPLACE, 1 + len(old_keys) + len(new_keys), self._user_key(notification.user_id), *old_keys, *new_keys,
+            old, member, notification_id, self.PENDING_TTL, len(old_keys),
+        )
+
     async def is_duplicate(self, user_id: int, task: NotificationTask) -> bool:
         key = self._sent_key(user_id)
-        file_id = task.md5 or task.resource_id or f'{task.file_path}:{task.modified_iso}'
-        exists = await self.redis.sismember(key, file_id)
+        # Пакет - повтор, только если отправлены все его файлы
+        file_ids = [f.md5 or f.resource_id or f'{f.file_path}:{f.modified_iso}' for f in task.files]
+        pipeline = self.redis.pipeline()
+        for file_id in file_ids:
+            pipeline.sismember(key, file_id)
+        exists = all(await pipeline.execute())
         if not exists:
-            await self.redis.sadd(key, file_id)
+            await self.redis.sadd(key, *file_ids)
             await self.redis.expire(key, 86400 * 30)  # Храним информацию об отправленных файлах 30 дней
         return bool(exists)
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import mmap
+import os
+import struct
+import zlib
+from datetime import datetime
+from typing import Optional
+
+from bot.common.logs import logger
+from bot.common.utils.path_parser import parse_datetime, public_root_hash
+from bot.domain.entities.crawl import CrawlSnapshot, DirectoryState
+from bot.domain.entities.manifest import ManifestEntry
+from bot.domain.repositories.snapshot import CrawlSnapshotRepositoryInterface, SnapshotCorruptedError
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:  # orjson - необязательное ускорение (extra "speedups")
+    _json_loads = json.loads
+
+    def _json_dumps(value) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FileCrawlSnapshotRepository(CrawlSnapshotRepositoryInterface):
+    """
+    Снимки обхода в файлах: crawl-<root_hash>.snap в каталоге тома
+
+    Формат: заголовок (сигнатура, версия, crc32 и длина данных), за ним JSON в zlib.
+    Манифест и директории хранятся таблицами (колонки + строки), без имён полей в каждой записи.
+    Файл читается через mmap, запись - во временный файл с заменой через os.replace.
+    """
+
+    MAGIC = b"YDLPSNAP"
+    VERSION = 2
+    HEADER = struct.Struct("<8sHxxIQ")  # сигнатура, версия, crc32 данных, длина данных
+    COMPRESS_LEVEL = 6
+
+    MANIFEST_COLUMNS = ("resource_id", "path", "md5", "modified", "size")
+    DIRECTORY_COLUMNS = tuple(DirectoryState.model_fields)
+
+    def __init__(self, directory: str | None, max_age: int = 7 * 24 * 3600):
+        super().__init__(directory, max_age)
+        if self.directory and not os.path.isdir(self.directory):
+            # Локальный запуск без тома: снимки просто не пишутся
+            logger.warning(f"📦 Каталог снимков {self.directory} не найден, снимки обхода выключены")
+            self.directory = None
+
+    def _path(self, public_root_url: str) -> str:
+        return os.path.join(self.directory, self.BASE_SNAPSHOT.format(root_hash=public_root_hash(public_root_url)))
+
+    async def load(self, public_root_url: str) -> Optional[CrawlSnapshot]:
+        if not self.enabled:
+            return None
+        data = await asyncio.to_thread(self._read, self._path(public_root_url))
+        if data is None:
+            return None
+
+        try:
+            saved_at = parse_datetime(data["saved_at"])
+            if saved_at is None:
+                raise ValueError("нет времени снимка")
+            if data["root"] != public_root_url:
+                logger.warning(f"📦 Снимок {self._path(public_root_url)} снят для другой папки, пропускаем")
+                return None
+            if (datetime.now() - saved_at).total_seconds() > self.max_age:
+                logger.info(f"📦 Снимок от {saved_at.isoformat()} устарел, обход начнётся с нуля")
+                return None
+
+            manifest_columns = data["manifest"]["columns"]
+            manifest = {}
+            for row in data["manifest"]["rows"]:
+                entry = ManifestEntry(**dict(zip(manifest_columns, row)))
+                manifest[entry.resource_id] = entry
+            directory_columns = data["directories"]["columns"]
+            directories = {}
+            for row in data["directories"]["rows"]:
+                state = DirectoryState.model_validate(dict(zip(directory_columns, row)))
+                directories[state.path] = state
+            return CrawlSnapshot(
+                public_root_url=public_root_url,
+                saved_at=saved_at,
+                checkpoint=parse_datetime(data.get("checkpoint")),
+                manifest=manifest,
+                directories=directories,
+            )
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            raise SnapshotCorruptedError(f"неверная структура снимка: {e}") from e
+
+    async def save(self, snapshot: CrawlSnapshot) -> None:
+        if not self.enabled:
+            return
+        data = {
+            "root": snapshot.public_root_url,
+            "saved_at": snapshot.saved_at.isoformat(),
+            "checkpoint": snapshot.checkpoint.isoformat() if snapshot.checkpoint else None,
+            "manifest": {
+                "columns": self.MANIFEST_COLUMNS,
+                "rows": [[getattr(e, c) for c in self.MANIFEST_COLUMNS] for e in snapshot.manifest.values()],
+            },
+            "directories": {
+                "columns": self.DIRECTORY_COLUMNS,
+                "rows": [
+                    [state[c] for c in self.DIRECTORY_COLUMNS]
+                    for state in (s.model_dump(mode="json") for s in snapshot.directories.values())
+                ],
+            },
+        }
+        await asyncio.to_thread(self._write, self._path(snapshot.public_root_url), data)
+
+    def _read(self, path: str) -> dict | None:
+        """Прочитать и проверить файл снимка; None - файла нет"""
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        with f:
+            if os.fstat(f.fileno()).st_size < self.HEADER.size:
+                raise SnapshotCorruptedError("файл короче заголовка")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                magic, version, crc, length = self.HEADER.unpack_from(mm, 0)
+                if magic != self.MAGIC:
+                    raise SnapshotCorruptedError("неизвестная сигнатура")
+                if version != self.VERSION:
+                    raise SnapshotCorruptedError(f"версия формата {version}, ожидается {self.VERSION}")
+                if self.HEADER.size + length != len(mm):
+                    raise SnapshotCorruptedError("длина данных не совпадает с размером файла")
+                # Данные проверяются и распаковываются прямо из отображения, без копии в памяти
+                with memoryview(mm) as view, view[self.HEADER.size:] as payload:
+                    if zlib.crc32(payload) != crc:
+                        raise SnapshotCorruptedError("контрольная сумма не совпадает")
+                    try:
+                        raw = zlib.decompress(payload)
+                    except zlib.error as e:
+                        raise SnapshotCorruptedError(f"не удалось распаковать: {e}") from e
+        try:
+            return _json_loads(raw)
+        except ValueError as e:
+            raise SnapshotCorruptedError(f"не удалось разобрать JSON: {e}") from e
+
+    def _write(self, path: str, data: dict) -> None:
+        """Записать снимок атомарно: временный файл, fsync и замена"""
+        payload = zlib.compress(_json_dumps(data), self.COMPRESS_LEVEL)
+        header = self.HEADER.pack(self.MAGIC, self.VERSION, zlib.crc32(payload), len(payload))
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
@@ -0,0 +1,232 @@
+import asyncio
+import json
+import os
+import zlib
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Iterator
+
+from bot.common.logs import logger
+from bot.domain.entities.manifest import ManifestEntry
+from bot.domain.entities.notification import NotificationTask
+from bot.domain.entities.spool import SpooledBatch
+from bot.domain.repositories.spool import TaskSpoolRepositoryInterface
+
+try:
+    import fcntl
+except ImportError:  # Windows: блокировки между процессами нет, очередь на диске - только для одного процесса
+    fcntl = None
+
+
+class FileTaskSpoolRepository(TaskSpoolRepositoryInterface):
+    """
+    Очередь задач на диске: tasks.spool в каталоге тома, только дозапись
+
+    Строка файла - один пакет: crc32 (8 hex-символов), пробел, JSON пакета, перевод строки.
+    Разобранная часть файла отмечается смещением в tasks.spool.offset (запись через
+    временный файл и os.replace); когда разобрано всё, файл обрезается. Оборванная при
+    падении последняя строка отбрасывается при следующей дозаписи, строка с неверной
+    контрольной суммой пропускается с предупреждением.
+
+    Файлы защищены flock: с общим томом очередь разбирает один процесс за раз.
+    """
+
+    READ_CHUNK = 64 * 1024
+
+    def __init__(self, directory: str | None):
+        super().__init__(directory)
+        if self.directory and not os.path.isdir(self.directory):
+            # Локальный запуск без тома: задачи, не принятые Redis, не сохраняются
+            logger.warning(f"📮 Каталог очереди задач {self.directory} не найден, очередь на диске выключена")
+            self.directory = None
+        self._lock = asyncio.Lock()  # Дозапись и разбор внутри процесса (flock - между процессами)
+
+    @property
+    def _path(self) -> str:
+        return os.path.join(self.directory, self.BASE_SPOOL)
+
+    @property
+    def _offset_path(self) -> str:
+        return f"{self._path}.offset"
+
+    async def append(self, batch: SpooledBatch) -> None:
+        payload = json.dumps(
+            {
+                "root": batch.public_root_url,
+                "tasks": [t.model_dump(mode="json") for t in batch.tasks],
+                "entries": [{"resource_id": e.resource_id, **e.to_dict()} for e in batch.entries],
+                "token": batch.token,
+            },
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode()
+        line = b"%08x %s\n" % (zlib.crc32(payload), payload)
+        async with self._lock:
+            await asyncio.to_thread(self._append, line)
+
+    async def pending(self) -> int:
+        if not self.enabled:
+            return 0
+        async with self._lock:
+            return await asyncio.to_thread(self._count)
+
+    async def entries(self, public_root_url: str) -> dict[str, ManifestEntry]:
+        if not self.enabled:
+            return {}
+        async with self._lock:
+            return await asyncio.to_thread(self._entries, public_root_url)
+
+    async def replay(self, handler: Callable[[SpooledBatch], Awaitable[None]]) -> int:
+        if not self.enabled:
+            return 0
+        replayed = 0
+        async with self._lock:
+            with self._locked(blocking=False) as locked:
+                if not locked:
+                    return 0  # Очередь разбирает другой процесс
+                offset = await asyncio.to_thread(self._read_offset)
+                while True:
+                    line, end = await asyncio.to_thread(self._read_line, offset)
+                    if line is None:
+                        break
+                    batch = self._parse(line, offset)
+                    if batch is not None:
+                        await handler(batch)
+                        replayed += 1
+                    offset = end
+                    await asyncio.to_thread(self._write_offset, offset)
+                if offset:
+                    await asyncio.to_thread(self._compact, offset)
+        return replayed
+
+    @contextmanager
+    def _locked(self, blocking: bool = True) -> Iterator[bool]:
+        """flock на файл блокировки; False - файл занят, а ждать не нужно"""
+        if fcntl is None:
+            yield True
+            return
+        with open(f"{self._path}.lock", "a") as f:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _append(self, line: bytes) -> None:
+        """Дописать строку и дождаться fsync; оборванный хвост от прошлого падения обрезается"""
+        with self._locked(), open(self._path, "ab+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size:
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    f.truncate(self._last_line_end(f, size))
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _last_line_end(self, f, size: int) -> int:
+        """Позиция сразу за последним переводом строки (0 - его нет)"""
+        pos = size
+        while pos > 0:
+            start = max(0, pos - self.READ_CHUNK)
+            f.seek(start)
+            idx = f.read(pos - start).rfind(b"\n")
+            if idx >= 0:
+                return start + idx + 1
+            pos = start
+        return 0
+
+    def _read_offset(self) -> int:
+        try:
+            with open(self._offset_path) as f:
+                offset = int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+        except ValueError:
+            logger.warning(f"📮 Смещение очереди задач {self._offset_path} повреждено, разбор начнётся с начала")
+            return 0
+        try:
+            size = os.path.getsize(self._path)
+        except FileNotFoundError:
+            return 0
+        # Смещение за концом файла - файл обрезан после разбора: начинаем с начала
+        return offset if offset <= size else 0
+
+    def _write_offset(self, offset: int) -> None:
+        tmp_path = f"{self._offset_path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._offset_path)
+
+    def _read_line(self, offset: int) -> tuple[bytes | None, int]:
+        """Полная строка с позиции offset и позиция за ней; None - полных строк больше нет"""
+        try:
+            f = open(self._path, "rb")
+        except FileNotFoundError:
+            return None, offset
+        with f:
+            f.seek(offset)
+            line = f.readline()
+        if not line.endswith(b"\n"):
+            return None, offset
+        return line, offset + len(line)
+
+    def _count(self) -> int:
+        offset = self._read_offset()
+        try:
+            f = open(self._path, "rb")
+        except FileNotFoundError:
+            return 0
+        with f:
+            f.seek(offset)
+            return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(self.READ_CHUNK), b""))
+
+    def _entries(self, public_root_url: str) -> dict[str, ManifestEntry]:
+        """Записи манифеста корня из полных строк после смещения разбора"""
+        entries: dict[str, ManifestEntry] = {}
+        offset = self._read_offset()
+        try:
+            f = open(self._path, "rb")
+        except FileNotFoundError:
+            return entries
+        with f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                batch = self._parse(line, offset)
+                if batch is not None and batch.public_root_url == public_root_url:
+                    entries.update((entry.resource_id, entry) for entry in batch.entries)
+                offset += len(line)
+        return entries
+
+    def _compact(self, offset: int) -> None:
+        """Обрезать файл, если всё до offset разобрано (вызывается под flock разбора)"""
+        if os.path.getsize(self._path) != offset:
+            return
+        # Сначала смещение, потом файл: при падении между ними пакеты отдадутся повторно, но не потеряются
+        self._write_offset(0)
+        with open(self._path, "r+b") as f:
+            f.truncate(0)
+            os.fsync(f.fileno())
+
+    def _parse(self, line: bytes, offset: int) -> SpooledBatch | None:
+        crc, _, payload = line.rstrip(b"\n").partition(b" ")
+        try:
+            if int(crc, 16) != zlib.crc32(payload):
+                raise ValueError("контрольная сумма не совпадает")
+            data = json.loads(payload)
+            return SpooledBatch(
+                public_root_url=data["root"],
+                tasks=[NotificationTask(**t) for t in data["tasks"]],
+                entries=[ManifestEntry(**e) for e in data["entries"]],
+                token=data.get("token"),
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"📮 Повреждённый пакет в очереди задач ({self._path}, смещение {offset}) пропущен: {e}")
+            return None
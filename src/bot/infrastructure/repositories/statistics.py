@@ -1,12 +1,22 @@
-import json
 from datetime import datetime
-from hashlib import sha256
-from typing import Optional
+from typing import Mapping, Optional
 
+from bot.common.utils.disk_stats import COMMON
+from bot.common.utils.path_parser import parse_datetime, public_root_hash
+from bot.domain.entities.statistics import DiskStats
 from bot.domain.repositories.statistics import StatisticsRepositoryInterface
 
 
 class RedisStatisticsRepository(StatisticsRepositoryInterface):
+    """Статистика в Redis; статистика диска - HASH на корневую папку: files:<корзина>, bytes:<корзина>"""
+
+    FIELD_UPDATED_AT = "updated_at"
+    FIELD_REBUILT_AT = "rebuilt_at"
+
+    @staticmethod
+    def _to_str(v):
+        return v.decode() if isinstance(v, (bytes, bytearray)) else v
+
     def _key(self, base: str) -> str:
         return f"{self.key_prefix}:{base}" if self.key_prefix else base
 
@@ -16,9 +26,8 @@ class RedisStatisticsRepository(StatisticsRepositoryInterface):
     def _users_pattern(self) -> str:
         return self._key("notifications:user:*")
 
-    def _group_counts_cache_key(self) -> str:
-        url_hash = sha256(self.public_root_url.encode()).hexdigest()[:12]
-        return self._key(f"stats:group_counts:{url_hash}")
+    def _disk_stats_key(self, public_root_url: str) -> str:
+        return self._key(self.BASE_DISK_STATS.format(root_hash=public_root_hash(public_root_url)))
 
     async def get_queue_len(self) -> int:
         try:
@@ -36,20 +45,73 @@ class RedisStatisticsRepository(StatisticsRepositoryInterface):
         return total
 
     async def get_disk_group_counts(self) -> tuple[dict[str, int], int, Optional[datetime]]:
+        stats = await self.get_disk_stats()
+        if stats is None:
+            return {}, 0, None
+        groups = {code: count for code, (count, _) in stats.dimension("group").items()}
+        return groups, max(0, stats.files.get(COMMON, 0)), stats.updated_at
+
+    async def get_disk_stats(self) -> Optional[DiskStats]:
+        files: dict[str, int] = {}
+        sizes: dict[str, int] = {}
+        updated_at: Optional[datetime] = None
+        found = False
+        for public_root_url in self.public_root_urls:
+            loaded = await self._load_disk_stats(public_root_url)
+            if loaded is None:
+                continue
+            found = True
+            for bucket, count in loaded.files.items():
+                files[bucket] = files.get(bucket, 0) + count
+            for bucket, size in loaded.bytes.items():
+                sizes[bucket] = sizes.get(bucket, 0) + size
+            if loaded.updated_at and (updated_at is None or loaded.updated_at < updated_at):
+                updated_at = loaded.updated_at
+        if not found:
+            return None
+        return DiskStats(files=files, bytes=sizes, updated_at=updated_at)
+
+    async def has_disk_stats(self, public_root_url: str) -> bool:
+        return bool(await self.redis.hexists(self._disk_stats_key(public_root_url), self.FIELD_REBUILT_AT))
+
+    async def apply_disk_delta(self, public_root_url: str, files: Mapping[str, int], sizes: Mapping[str, int]) -> None:
+        key = self._disk_stats_key(public_root_url)
+        pipeline = self.redis.pipeline(transaction=True)
+        for bucket, count in files.items():
+            if count:
+                pipeline.hincrby(key, f"files:{bucket}", count)
+        for bucket, size in sizes.items():
+            if size:
+                pipeline.hincrby(key, f"bytes:{bucket}", size)
+        pipeline.hset(key, self.FIELD_UPDATED_AT, datetime.now().isoformat())
+        await pipeline.execute()
+
+    async def replace_disk_stats(self, public_root_url: str, files: Mapping[str, int], sizes: Mapping[str, int]) -> None:
+        key = self._disk_stats_key(public_root_url)
+        now = datetime.now().isoformat()
+        mapping: dict[str, str | int] = {self.FIELD_UPDATED_AT: now, self.FIELD_REBUILT_AT: now}
+        mapping.update({f"files:{bucket}": count for bucket, count in files.items() if count})
+        mapping.update({f"bytes:{bucket}": size for bucket, size in sizes.items() if size})
+        pipeline = self.redis.pipeline(transaction=True)
+        pipeline.delete(key)
+        pipeline.hset(key, mapping=mapping)
+        await pipeline.execute()
+
+    async def _load_disk_stats(self, public_root_url: str) -> Optional[DiskStats]:
+        """Статистика одной корневой папки; None - ещё не было полного пересчёта"""
         try:
-            raw = await self.redis.get(self._group_counts_cache_key())
-            if not raw:
-                return {}, 0, None
-            data = json.loads(raw if isinstance(raw, str) else raw.decode())
-            groups = {str(k): int(v) for k, v in (data.get("groups") or {}).items()}
-            common = int(data.get("common") or 0)
-            computed_at_raw = data.get("computed_at")
-            computed_at = None
-            if computed_at_raw:
-                try:
-                    computed_at = datetime.fromisoformat(str(computed_at_raw).replace("Z", "+00:00")).replace(tzinfo=None)
-                except Exception:
-                    computed_at = None
-            return groups, common, computed_at
+            raw = await self.redis.hgetall(self._disk_stats_key(public_root_url))
         except Exception:
-            return {}, 0, None
+            return None
+        data = {self._to_str(k): self._to_str(v) for k, v in raw.items()}
+        if self.FIELD_REBUILT_AT not in data:
+            return None
+        files: dict[str, int] = {}
+        sizes: dict[str, int] = {}
+        for field, value in data.items():
+            kind, _, bucket = field.partition(":")
+            if kind == "files":
+                files[bucket] = int(value)
+            elif kind == "bytes":
+                sizes[bucket] = int(value)
+        return DiskStats(files=files, bytes=sizes, updated_at=parse_datetime(data.get(self.FIELD_UPDATED_AT)))
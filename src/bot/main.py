@@ -5,7 +5,8 @@ from aiogram.fsm.storage.redis import RedisStorage
 from bot.application.handlers.base import setup_handlers, set_bot_commands
 from bot.application.services.long_poll import YandexDiskPollingService
 from bot.common.logs import logger
-from bot.core.config import NotificationsConfig
+from bot.common.utils.subject_matcher import configure_subject_aliases
+from bot.core.config import NotificationsConfig, YandexDiskConfig
 from bot.core.di import create_container
 from bot.domain.services.notification import NotificationServiceInterface
 from bot.domain.services.scheduler import SchedulerServiceInterface
@@ -40,6 +41,11 @@ async def main():
         await set_bot_commands(bot, user_service)
         logger.info("✅ Команды бота установлены")
 
+        # Псевдонимы папок предметов из настроек - до первого разбора путей
+        disk_conf = await container.get(YandexDiskConfig)
+        if disk_conf.subject_aliases:
+            configure_subject_aliases(disk_conf.subject_aliases)
+
         # Запускаем long-poll сервис
         polling_service = await container.get(YandexDiskPollingService)
         await polling_service.start()